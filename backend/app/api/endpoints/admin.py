@@ -0,0 +1,82 @@
+from fastapi import APIRouter, HTTPException
+from app.config import settings
+from app.services.admission import admission_stats
+from app.services.lazy import import_seconds, lazy_module, loaded
+from app.services.result_cache import get_result_cache
+
+# Imports cryptography, so only loaded once a session endpoint is called
+session_cache = lazy_module("app.services.session_cache")
+
+router = APIRouter()
+
+@router.get("/admin/cache")
+async def result_cache_stats():
+    """Return hit/miss counters and sizes for the extraction result cache."""
+    return get_result_cache().stats()
+
+@router.delete("/admin/cache")
+async def clear_result_cache():
+    """Drop every cached extraction result."""
+    removed = get_result_cache().invalidate()
+    return {"status": "success", "removed": removed}
+
+@router.delete("/admin/cache/{cache_key}")
+async def invalidate_result(cache_key: str):
+    """Drop a single cached extraction result by its cache key."""
+    removed = get_result_cache().invalidate(cache_key)
+    if not removed:
+        raise HTTPException(status_code=404, detail=f"Cache entry '{cache_key}' not found")
+    return {"status": "success", "removed": removed}
+
+@router.get("/admin/ocr")
+async def ocr_pool_stats():
+    """Return the selected OCR engine and usage of the engine pool."""
+    if not settings.DOCUMENT_AUTOMATION_ENABLED:
+        raise HTTPException(status_code=404, detail="Document automation is disabled")
+    ocr_engine = loaded("app.services.ocr_engine")
+    stats = ocr_engine.ocr_pool_stats() if ocr_engine is not None else None
+    if stats is None:
+        # No OCR has run since the server started; don't start the engines just to report on them
+        return {"initialized": False}
+    return {"initialized": True, "engine": ocr_engine.engine_version(), **stats}
+
+@router.get("/admin/sessions")
+async def session_cache_stats():
+    """Return counters for the cached logged-in browser sessions."""
+    cache = session_cache.get_session_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@router.delete("/admin/sessions")
+async def clear_session_cache():
+    """Forget every cached browser session, forcing fresh logins."""
+    cache = session_cache.get_session_cache()
+    return {"status": "success", "removed": cache.clear() if cache is not None else 0}
+
+@router.get("/admin/admission")
+async def admission_control_stats():
+    """Return in-flight requests, queue depth, wait times and rejections per endpoint kind."""
+    return {"enabled": settings.ADMISSION_ENABLED, "endpoints": admission_stats()}
+
+@router.get("/admin/exports")
+async def export_stats():
+    """Return queue depth and per-sink counters for result exports."""
+    exports = loaded("app.services.exports")
+    stats = exports.export_stats() if exports is not None else None
+    if stats is None:
+        # Nothing has been exported since the server started
+        return {"active": False}
+    return {"active": True, **stats}
+
+@router.get("/admin/modules")
+async def service_modules():
+    """Return which subsystems are enabled and how long each lazily loaded service took to import."""
+    return {
+        "enabled": {
+            "web": settings.WEB_AUTOMATION_ENABLED,
+            "desktop": settings.DESKTOP_AUTOMATION_ENABLED,
+            "document": settings.DOCUMENT_AUTOMATION_ENABLED,
+        },
+        "import_seconds": import_seconds(),
+    }
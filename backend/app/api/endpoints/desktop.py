@@ -1,14 +1,43 @@
 from fastapi import APIRouter, HTTPException
-from typing import Optional, Literal
-from pydantic import BaseModel
-from app.services import desktop_automation
+from typing import List, Optional, Literal
+from pydantic import BaseModel, Field
+from app.services.lazy import lazy_module
+from app.services.admission import AdmissionRejected, admitted, check_backlog
+from app.services.app_registry import get_app_registry
+from app.services.jobs import get_job_manager
+import logging
+
+logger = logging.getLogger(__name__)
+
+desktop_automation = lazy_module("app.services.desktop_automation")
 
 router = APIRouter()
 
+TypingStrategy = Literal['auto', 'paste', 'batched', 'per_key']
+
 class DesktopAutomationRequest(BaseModel):
     appName: Literal['notepad', 'wordpad', 'calculator', 'paint', 'chrome', 'firefox', 'edge']
     action: Literal['type', 'open', 'close', 'press']
     text: Optional[str] = None
+    typingStrategy: TypingStrategy = 'auto'
+    pause: Optional[float] = Field(None, ge=0, le=5)  # seconds after each input call
+
+class MacroStep(BaseModel):
+    action: Literal['open', 'focus', 'type', 'press', 'hotkey', 'wait_for_window']
+    text: Optional[str] = None  # type
+    strategy: Optional[TypingStrategy] = None  # type
+    key: Optional[str] = None  # press
+    keys: Optional[List[str]] = None  # hotkey, e.g. ["ctrl", "s"]
+    title: Optional[str] = None  # focus / wait_for_window, defaults to the app's window title
+    timeout: Optional[float] = Field(None, gt=0)  # wait_for_window, seconds
+
+class DesktopMacroRequest(BaseModel):
+    appName: Literal['notepad', 'wordpad', 'calculator', 'paint', 'chrome', 'firefox', 'edge']
+    steps: List[MacroStep] = Field(..., min_length=1)
+    pause: Optional[float] = Field(None, ge=0, le=5)
+
+def macro_steps(payload: DesktopMacroRequest) -> List[dict]:
+    return [step.model_dump(exclude_none=True) for step in payload.steps]
 
 @router.post("/desktop-automate")
 async def desktop_automate(payload: DesktopAutomationRequest):
@@ -16,24 +45,93 @@ async def desktop_automate(payload: DesktopAutomationRequest):
     Perform desktop automation tasks like opening apps and typing text.
     """
     try:
-        print(payload)  # Debug line
+        logger.debug("Desktop automation request", extra={"app_name": payload.appName, "action": payload.action})
 
         if payload.action == 'type' and not payload.text:
             raise HTTPException(status_code=400, detail="Text is required for 'type' action")
 
-        result = desktop_automation.automate_desktop(
-            app_name=payload.appName,
-            action=payload.action,
-            text=payload.text
-        )
+        async with admitted("desktop"):
+            result = await get_job_manager().run(
+                "desktop",
+                desktop_automation.automate_desktop,
+                app_name=payload.appName,
+                action=payload.action,
+                text=payload.text,
+                typing_strategy=payload.typingStrategy,
+                pause=payload.pause
+            )
 
         if result.get("status") == "error":
             raise HTTPException(status_code=400, detail=result.get("message", "Desktop automation failed"))
 
         return result  # ✅ Actual response from service
 
-    except HTTPException:
+    except (HTTPException, AdmissionRejected):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.post("/desktop-automate/jobs", status_code=202)
+async def submit_desktop_automation(payload: DesktopAutomationRequest):
+    """
+    Queue a desktop automation action and return its job id immediately.
+    """
+    if payload.action == 'type' and not payload.text:
+        raise HTTPException(status_code=400, detail="Text is required for 'type' action")
+
+    check_backlog("desktop", get_job_manager().pending("desktop"))
+    job = get_job_manager().submit(
+        "desktop",
+        desktop_automation.automate_desktop,
+        app_name=payload.appName,
+        action=payload.action,
+        text=payload.text,
+        typing_strategy=payload.typingStrategy,
+        pause=payload.pause
+    )
+    return job.to_dict()
+
+
+@router.post("/desktop-automate/macro")
+async def desktop_macro(payload: DesktopMacroRequest):
+    """
+    Run several desktop steps against one application session and return
+    per-step timings.
+    """
+    async with admitted("desktop"):
+        result = await get_job_manager().run(
+            "desktop",
+            desktop_automation.run_macro,
+            app_name=payload.appName,
+            steps=macro_steps(payload),
+            pause=payload.pause
+        )
+    if result.get("status") == "error":
+        # Keep the per-step results so the caller can see which step failed
+        raise HTTPException(status_code=400, detail=result)
+    return result
+
+
+@router.post("/desktop-automate/macro/jobs", status_code=202)
+async def submit_desktop_macro(payload: DesktopMacroRequest):
+    """
+    Queue a desktop macro and return its job id immediately.
+    """
+    check_backlog("desktop", get_job_manager().pending("desktop"))
+    job = get_job_manager().submit(
+        "desktop",
+        desktop_automation.run_macro,
+        app_name=payload.appName,
+        steps=macro_steps(payload),
+        pause=payload.pause
+    )
+    return job.to_dict()
+
+
+@router.get("/desktop-automate/apps")
+async def list_desktop_apps():
+    """
+    Applications the server opened or adopted, with their pids.
+    """
+    return {"apps": get_app_registry().list()}
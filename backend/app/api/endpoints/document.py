@@ -1,54 +1,211 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.services import document_automation
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Any, Dict, Iterator, Optional
+from app.services.admission import AdmissionRejected, Ticket, admit, check_backlog, document_priority, release, release_after
+from app.services.lazy import lazy_module
+from app.services.jobs import get_job_manager
+from app.services.uploads import DocumentBuffer, UploadTooLarge
 from app.config import settings
 
-import threading
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# cv2, fitz and pytesseract are only imported once a request needs them
+document_automation = lazy_module("app.services.document_automation")
+exports = lazy_module("app.services.exports")
 
 router = APIRouter()
 
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE} bytes"
+    )
+
+def check_upload(file: UploadFile) -> None:
+    """Reject an upload by its type and reported size, before anything is read."""
+    if file.content_type not in settings.ALLOWED_FILE_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type. Allowed types: {', '.join(settings.ALLOWED_FILE_TYPES)}"
+        )
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+        raise _too_large()
+
+async def read_validated_upload(file: UploadFile) -> DocumentBuffer:
+    """
+    Read an upload in chunks, checking it against the type and size limits.
+
+    ``UploadLimitMiddleware`` has already refused bodies far above
+    ``MAX_UPLOAD_SIZE``; this enforces the exact limit on the file itself.
+    Anything above ``UPLOAD_SPOOL_THRESHOLD`` is spooled to a temp file.
+    """
+    check_upload(file)
+    buffer = DocumentBuffer(
+        max_size=settings.MAX_UPLOAD_SIZE,
+        spool_threshold=settings.UPLOAD_SPOOL_THRESHOLD
+    )
+    try:
+        while True:
+            chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer.write(chunk)
+    except UploadTooLarge:
+        buffer.close()
+        raise _too_large()
+    except Exception:
+        buffer.close()
+        raise
+    return buffer
+
+def export_sink(name: Optional[str]) -> Optional[str]:
+    """Resolve a request's `export` parameter, rejecting sinks this server does not offer."""
+    try:
+        return exports.resolve_sink(name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def admit_upload(file: UploadFile, request: Request) -> Optional[Ticket]:
+    """
+    Admit an upload before it is copied into a buffer, small documents
+    first. The size is the one the form parser recorded, else the request's
+    Content-Length; uploads of unknown size queue as large ones.
+    """
+    check_upload(file)
+    size = file.size
+    if size is None:
+        declared = request.headers.get("content-length", "")
+        size = int(declared) if declared.isdigit() else settings.MAX_UPLOAD_SIZE
+    return await admit("document", document_priority(size))
+
+def extract_and_release(
+    buffer: DocumentBuffer,
+    content_type: str,
+    preset: Optional[str] = None,
+    filename: Optional[str] = None,
+    sink: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run text extraction, release the upload buffer and queue the text for ``sink``."""
+    with buffer:
+        result = document_automation.extract_text_from_document(
+            file_data=buffer,
+            content_type=content_type,
+            preset=preset,
+            filename=filename
+        )
+    if sink is None:
+        return result
+    metadata = {"filename": filename, "content_type": content_type}
+    return {**result, "export": exports.export_result(sink, result, metadata)}
+
 @router.post("/document/extract-text")
 async def extract_text_from_document(
-    file: UploadFile = File(...)
+    request: Request,
+    file: UploadFile = File(...),
+    preset: Optional[str] = None,
+    export: Optional[str] = None
 ):
+    """
+    Extract text from an uploaded PDF or image.
+
+    - **preset**: Image preprocessing preset (`default`, `fast` or `accurate`)
+    - **export**: Also send the text to a sink: `directory`, `desktop` (opens it in Notepad),
+      `webhook` or `none` (defaults to `EXPORT_DEFAULT_SINK`)
+    """
     try:
-        file_contents = await file.read()
-        
-        if len(file_contents) > settings.MAX_UPLOAD_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE} bytes"
-            )
-        
-        content_type = file.content_type
-        if content_type not in settings.ALLOWED_FILE_TYPES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported file type. Allowed types: {', '.join(settings.ALLOWED_FILE_TYPES)}"
-            )
-        
+        sink = export_sink(export)
+        ticket = await admit_upload(file, request)
+
         # Call the main document automation function
-        result = document_automation.extract_text_from_document(
-            file_data=file_contents,
-            content_type=content_type
-        )
-        
+        try:
+            buffer = await read_validated_upload(file)
+            result = await get_job_manager().run(
+                "document",
+                extract_and_release,
+                buffer=buffer,
+                content_type=file.content_type,
+                preset=preset,
+                filename=file.filename,
+                sink=sink
+            )
+        finally:
+            release(ticket)
+
         if result.get("status") == "error":
             raise HTTPException(status_code=400, detail=result.get("message", "Text extraction failed"))
 
-        extracted_text = result.get("extracted_text", "")
-
-        # Open extracted text in Notepad in a background thread
-        def open_notepad():
-            try:
-                document_automation.open_text_in_notepad(extracted_text)
-            except Exception as e:
-                print(f"Failed to open Notepad: {e}")
-
-        threading.Thread(target=open_notepad).start()
-        
         return result
 
-    except HTTPException:
+    except (HTTPException, AdmissionRejected):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/document/extract-text/jobs", status_code=202)
+async def submit_text_extraction(
+    file: UploadFile = File(...),
+    preset: Optional[str] = None,
+    export: Optional[str] = None
+):
+    """
+    Queue a text extraction and return its job id immediately.
+
+    - **export**: Sink the text is sent to once the job finishes (see `/document/extract-text`)
+    """
+    sink = export_sink(export)
+    check_backlog("document", get_job_manager().pending("document"))
+    buffer = await read_validated_upload(file)
+    try:
+        job = get_job_manager().submit(
+            "document",
+            extract_and_release,
+            buffer=buffer,
+            content_type=file.content_type,
+            preset=preset,
+            filename=file.filename,
+            sink=sink
+        )
+    except BaseException:
+        # The job would have released it; nothing else will
+        buffer.close()
+        raise
+    return job.to_dict()
+
+@router.post("/document/extract-text/stream")
+async def stream_text_extraction(
+    request: Request,
+    file: UploadFile = File(...),
+    parallel: bool = True,
+    preset: Optional[str] = None
+):
+    """
+    Extract text page by page and stream the results as NDJSON.
+
+    Each line is a page record (`page`, `text`, `elapsed_ms`), in completion
+    order when `parallel` is set. The last line is a summary with `status`.
+    """
+    ticket = await admit_upload(file, request)
+    try:
+        buffer = await read_validated_upload(file)
+    except BaseException:
+        release(ticket)
+        raise
+    content_type = file.content_type
+
+    def ndjson() -> Iterator[str]:
+        with buffer:
+            for record in document_automation.stream_text_from_document(
+                file_data=buffer,
+                content_type=content_type,
+                parallel=parallel,
+                preset=preset
+            ):
+                yield json.dumps(record) + "\n"
+
+    return StreamingResponse(
+        release_after(ndjson(), ticket), media_type="application/x-ndjson", background=BackgroundTask(release, ticket)
+    )
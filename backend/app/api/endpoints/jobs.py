@@ -0,0 +1,56 @@
+import asyncio
+import json
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.services.jobs import Job, get_job_manager
+
+router = APIRouter()
+
+def get_job_or_404(job_id: str) -> Job:
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+@router.get("/jobs")
+async def list_jobs(kind: Optional[str] = None):
+    """List recent jobs, newest first."""
+    jobs = get_job_manager().list(kind=kind)
+    return {
+        "jobs": [job.to_dict(include_result=False) for job in reversed(jobs)],
+        **get_job_manager().stats()
+    }
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Poll the status of a job; the result is included once it has finished."""
+    return get_job_or_404(job_id).to_dict()
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Stream job status and progress as Server-Sent Events.
+
+    The stream ends with a ``result`` event carrying the finished job.
+    """
+    job = get_job_or_404(job_id)
+
+    async def event_stream():
+        seq = 0
+        while True:
+            finished = job.done
+            for event in job.events_since(seq):
+                seq = event["seq"] + 1
+                yield f"id: {event['seq']}\nevent: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+            if finished:
+                yield f"event: result\ndata: {json.dumps(job.to_dict(), default=str)}\n\n"
+                return
+            await asyncio.sleep(settings.JOB_EVENTS_POLL_INTERVAL)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
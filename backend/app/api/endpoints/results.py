@@ -0,0 +1,78 @@
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from typing import Literal, Optional
+from app.config import settings
+from app.services.lazy import lazy_module
+
+# sqlite3 is only imported once a results endpoint is called
+result_store = lazy_module("app.services.result_store")
+
+router = APIRouter()
+
+def require_store():
+    store = result_store.get_result_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="The result store is disabled")
+    return store
+
+@router.get("/results/search")
+async def search_results(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    sort: Literal["relevance", "recent"] = "relevance",
+    before: Optional[int] = Query(None, ge=1)
+):
+    """
+    Full-text search over the pages of every extracted document.
+
+    - **q**: Keywords (all must match); `"quoted phrases"` match exactly and `term*` matches a prefix
+    - **sort**: `relevance` (paged with `offset`) or `recent` (paged by passing `next_before` back as `before`)
+
+    Hits are pages with a snippet marking matches in `[brackets]`. Use
+    `recent` for very common terms: it does not score every match.
+    """
+    if offset > settings.RESULT_STORE_SEARCH_MAX_OFFSET:
+        raise HTTPException(
+            status_code=400,
+            detail=f"offset can be at most {settings.RESULT_STORE_SEARCH_MAX_OFFSET}; refine the query instead"
+        )
+    store = require_store()
+    return await run_in_threadpool(
+        store.search, q, limit, offset, settings.RESULT_STORE_SNIPPET_TOKENS, sort, before
+    )
+
+@router.get("/results")
+async def list_results(
+    limit: int = Query(20, ge=1, le=100),
+    before: Optional[int] = Query(None, ge=1)
+):
+    """List stored documents, newest first. Pass `next_before` back as `before` for the next page."""
+    store = require_store()
+    return await run_in_threadpool(store.list_documents, limit, before)
+
+@router.get("/results/stats")
+async def result_store_stats():
+    """Return write counters and the queue depth of the result store."""
+    store = result_store.get_result_store()
+    if store is None:
+        return {"enabled": False}
+    return {"enabled": True, **store.stats()}
+
+@router.get("/results/{document_id}")
+async def get_result(document_id: int):
+    """Metadata of a stored document."""
+    store = require_store()
+    document = await run_in_threadpool(store.get_document, document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail=f"Document {document_id} not found")
+    return document
+
+@router.get("/results/{document_id}/pages/{page}")
+async def get_result_page(document_id: int, page: int):
+    """Stored text of one page (0-based) of a document."""
+    store = require_store()
+    record = await run_in_threadpool(store.get_page, document_id, page)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Page {page} of document {document_id} not found")
+    return record
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.services.tracing import get_trace_store
+
+router = APIRouter()
+
+@router.get("/traces")
+async def list_traces(limit: int = Query(50, ge=1, le=500)):
+    """List recent request traces, newest first, without their spans."""
+    traces = get_trace_store().list(limit)
+    return {"traces": [trace.to_dict(include_spans=False) for trace in traces]}
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """
+    Span timeline of a recent request. The id is returned in the
+    ``X-Trace-Id`` response header and on jobs started by the request.
+    """
+    trace = get_trace_store().get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"Trace '{trace_id}' not found")
+    return trace.to_dict()
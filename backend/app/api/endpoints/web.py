@@ -1,7 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional
-from pydantic import BaseModel
-from app.services import web_automation
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Any, Dict, Iterator, List, Literal, Optional
+from pydantic import BaseModel, Field
+from app.config import settings
+from app.services import browser_profiles, web_extraction
+from app.services.admission import AdmissionRejected, admit, admitted, check_backlog, release, release_after
+from app.services.lazy import lazy_module
+from app.services.jobs import get_job_manager
+
+import json
+
+# Selenium and webdriver_manager are only imported once a request needs them
+web_automation = lazy_module("app.services.web_automation")
+web_batch = lazy_module("app.services.web_batch")
 
 router = APIRouter()
 
@@ -10,6 +22,32 @@ class WebAutomationRequest(BaseModel):
     username: Optional[str] = None
     password: Optional[str] = None
     search_query: Optional[str] = None
+    wait_timeouts: Optional[Dict[str, float]] = None
+    engine: Optional[Literal["auto", "http", "browser"]] = None
+    browser_profile: Optional[str] = None
+    extract: Optional[Dict[str, Any]] = None
+
+class WebExtractRequest(BaseModel):
+    url: str
+    item: str
+    fields: Dict[str, Any] = Field(..., min_length=1)
+    next_page: Optional[str] = None
+    limit: Optional[int] = Field(None, ge=1)
+    max_pages: Optional[int] = Field(None, ge=1)
+    engine: Optional[Literal["auto", "http", "browser"]] = None
+    browser_profile: Optional[str] = None
+
+class WebBatchRequest(BaseModel):
+    targets: List[str] = Field(..., min_length=1)
+    username: Optional[str] = None
+    password: Optional[str] = None
+    search_query: Optional[str] = None
+    wait_timeouts: Optional[Dict[str, float]] = None
+    engine: Optional[Literal["auto", "http", "browser"]] = None
+    browser_profile: Optional[str] = None
+    extract: Optional[Dict[str, Any]] = None
+    concurrency: Optional[int] = Field(None, ge=1)
+    per_host_limit: Optional[int] = Field(None, ge=1)
 
 @router.post("/web-automate")
 async def web_automate(request: WebAutomationRequest):
@@ -20,18 +58,160 @@ async def web_automate(request: WebAutomationRequest):
     - **username**: Username for login (if required)
     - **password**: Password for login (if required)
     - **search_query**: Text to search for (if any)
+    - **wait_timeouts**: Per-step wait timeouts in seconds (e.g. `{"login_submit": 5}`)
+    - **engine**: `http` (no browser), `browser`, or `auto` to use plain HTTP unless the page needs JavaScript
+    - **browser_profile**: Browser profile for browser runs (e.g. `lean`); defaults per host, then `BROWSER_PROFILE_DEFAULT`
+    - **extract**: Extraction schema; search results then include typed records (see `/web-automate/extract`)
     """
     try:
-        result = web_automation.automate_web_interaction(
-            url=request.url,
-            username=request.username,
-            password=request.password,
-            search_query=request.search_query
-        )
+        async with admitted("web"):
+            result = await get_job_manager().run(
+                "web",
+                web_automation.automate_web_interaction,
+                url=request.url,
+                username=request.username,
+                password=request.password,
+                search_query=request.search_query,
+                wait_timeouts=request.wait_timeouts,
+                engine=request.engine,
+                browser_profile=request.browser_profile,
+                extract=request.extract
+            )
         
         if result.get("status") == "error":
             raise HTTPException(status_code=400, detail=result.get("message", "Web automation failed"))
             
         return result
+    except (HTTPException, AdmissionRejected):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/web-automate/jobs", status_code=202)
+async def submit_web_automation(request: WebAutomationRequest):
+    """
+    Queue a web automation run and return its job id immediately.
+
+    Poll `/api/jobs/{job_id}` or stream `/api/jobs/{job_id}/events` for progress.
+    """
+    check_backlog("web", get_job_manager().pending("web"))
+    job = get_job_manager().submit(
+        "web",
+        web_automation.automate_web_interaction,
+        url=request.url,
+        username=request.username,
+        password=request.password,
+        search_query=request.search_query,
+        wait_timeouts=request.wait_timeouts,
+        engine=request.engine,
+        browser_profile=request.browser_profile,
+        extract=request.extract
+    )
+    return job.to_dict()
+
+@router.post("/web-automate/extract")
+async def web_extract(request: WebExtractRequest):
+    """
+    Extract typed records from a page and stream one NDJSON line per page.
+
+    - **item**: CSS selector of the nodes that become records
+    - **fields**: Field name to `{"selector", "attr", "type", "all"}`, or just a selector for the text
+    - **next_page**: CSS selector of the next-page link or button to follow
+    - **limit**: Stop after this many records
+    - **max_pages**: Stop after this many pages (capped by `EXTRACT_MAX_PAGES`)
+
+    Each page is read in one script call. The last line is a summary with `status`.
+    """
+    schema = {"item": request.item, "fields": request.fields, "next_page": request.next_page}
+    try:
+        web_extraction.compile_schema(schema)
+        if request.engine in (None, "auto", "browser"):
+            browser_profiles.resolve_profile(request.url, request.browser_profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def ndjson() -> Iterator[str]:
+        pages = records = 0
+        try:
+            for page in web_automation.iter_extraction(
+                request.url,
+                schema,
+                limit=request.limit,
+                max_pages=request.max_pages,
+                engine=request.engine,
+                browser_profile=request.browser_profile
+            ):
+                pages += 1
+                records += len(page["records"])
+                yield json.dumps(page) + "\n"
+            summary = {"status": "success"}
+        except Exception as e:
+            summary = {"status": "error", "message": str(e)}
+        yield json.dumps({**summary, "pages": pages, "records": records}) + "\n"
+
+    ticket = await admit("web")
+    return StreamingResponse(
+        release_after(ndjson(), ticket), media_type="application/x-ndjson", background=BackgroundTask(release, ticket)
+    )
+
+@router.post("/web-automate/batch")
+async def web_automate_batch(request: WebBatchRequest):
+    """
+    Run the same login/search scenario against many URLs concurrently and
+    stream one NDJSON record per target as it finishes.
+
+    - **concurrency**: Targets run at once for this batch (capped by `WEB_BATCH_MAX_CONCURRENCY`)
+    - **per_host_limit**: Targets run at once against one host
+
+    Identical targets that are already running are not run twice. The last
+    line is a summary with `status`.
+    """
+    if len(request.targets) > settings.WEB_BATCH_MAX_TARGETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can have at most {settings.WEB_BATCH_MAX_TARGETS} targets"
+        )
+    scenario = {
+        "username": request.username,
+        "password": request.password,
+        "search_query": request.search_query,
+        "wait_timeouts": request.wait_timeouts,
+        "engine": request.engine,
+        "browser_profile": request.browser_profile,
+        "extract": request.extract
+    }
+
+    def ndjson() -> Iterator[str]:
+        for record in web_batch.iter_batch(
+            request.targets,
+            scenario,
+            concurrency=request.concurrency,
+            per_host_limit=request.per_host_limit
+        ):
+            yield json.dumps(record) + "\n"
+
+    # The batch holds one slot per target it runs at once
+    ticket = await admit("web", weight=web_batch.effective_concurrency(request.concurrency, len(request.targets)))
+    return StreamingResponse(
+        release_after(ndjson(), ticket), media_type="application/x-ndjson", background=BackgroundTask(release, ticket)
+    )
+
+@router.get("/web-automate/pool")
+async def web_driver_pool_stats():
+    """Return usage statistics for the pooled browser sessions, per browser profile."""
+    return web_automation.get_driver_pool_stats()
+
+@router.get("/web-automate/profiles")
+async def web_browser_profiles():
+    """Return the browser profiles and the requests and bytes each one used and saved."""
+    return {
+        "default": settings.BROWSER_PROFILE_DEFAULT,
+        "by_host": settings.BROWSER_PROFILE_BY_HOST,
+        "profiles": {name: profile.to_dict() for name, profile in browser_profiles.get_profiles().items()},
+        "traffic": browser_profiles.get_profile_ledger().stats()
+    }
+
+@router.get("/web-automate/waits")
+async def web_wait_stats():
+    """Return observed wait durations and the adaptive timeouts derived per host."""
+    return web_automation.get_wait_stats()
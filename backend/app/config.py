@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+import os
+import tempfile
+from typing import Any, Dict
 from typing import List
 
 
@@ -16,13 +18,176 @@ class Settings(BaseSettings):
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000"]
 
+    # Subsystems; a disabled one has no routes and its modules are never imported
+    WEB_AUTOMATION_ENABLED: bool = True
+    DESKTOP_AUTOMATION_ENABLED: bool = True
+    DOCUMENT_AUTOMATION_ENABLED: bool = True
+
+    # Production server (python -m app.serve)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0  # 0 = one per CPU, at most 4; each worker has its own pools
+    SERVER_PRELOAD: bool = True  # import enabled services and warm their pools before serving
+    SERVER_GRACEFUL_TIMEOUT: float = 30.0  # seconds in-flight requests get on shutdown
+
     
     # File upload settings
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024  # 64KB
+    UPLOAD_SPOOL_THRESHOLD: int = 1024 * 1024  # larger uploads are spooled to disk
+    UPLOAD_MULTIPART_OVERHEAD: int = 64 * 1024  # allowance for form fields and boundaries on top of MAX_UPLOAD_SIZE
+
+    # Page-parallel PDF extraction
+    PDF_PROCESS_WORKERS: int = 0  # 0 = one per CPU; each worker OCRs with one engine and its share of the CPUs
+    PDF_PARALLEL_MIN_PAGES: int = 16  # smaller documents are extracted in-process
+    PDF_PARALLEL_MIN_SCANNED_PAGES: int = 2  # smaller documents with fewer scanned pages are OCR'd in-process
+    PDF_PAGES_PER_TASK: int = 8
+
+    # OCR for PDF pages without a text layer
+    PDF_OCR_ENABLED: bool = True
+    PDF_OCR_MIN_TEXT_CHARS: int = 20  # pages with less embedded text are OCR candidates
+    PDF_OCR_DPI: int = 300
     ALLOWED_FILE_TYPES: list[str] = ["application/pdf", "image/jpeg", "image/png"]
     
     # Tesseract OCR path (update this to your Tesseract installation path)
     TESSERACT_CMD: str = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+    OCR_LANGUAGE: str = "eng"
+    OCR_ENGINE: str = "auto"  # auto, tesserocr or pytesseract
+    OCR_POOL_SIZE: int = 2  # long-lived engines; each gets cpu_count // size OpenMP threads
+    OCR_POOL_PREWARM: bool = True
+    TESSDATA_PATH: str = ""  # tessdata directory for tesserocr, empty for the default
+
+    # Image preprocessing before OCR
+    PREPROCESS_DEFAULT_PRESET: str = "default"  # default, fast or accurate
+    PREPROCESS_ASSUMED_DPI: int = 300  # source resolution assumed for uploaded images
+
+    # Tiled OCR for very large images
+    OCR_TILE_MIN_PIXELS: int = 12_000_000  # tile images at least this large, 0 disables
+    OCR_TILE_HEIGHT: int = 1600  # rows per tile
+    OCR_TILE_OVERLAP: int = 100  # rows shared by tiles cut through text
+    OCR_TILE_MIN_GAP: int = 8  # blank rows that separate text bands
+    OCR_TILE_WORKERS: int = 0  # 0 = Python's default thread count
+
+    # Extraction result cache
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MEMORY_ENTRIES: int = 256
+    RESULT_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), "automation_dashboard", "results")
+    RESULT_CACHE_DISK_MAX_BYTES: int = 512 * 1024 * 1024  # 512MB, 0 disables the disk tier
+
+    # Searchable store of every extraction result (SQLite with FTS5)
+    RESULT_STORE_ENABLED: bool = True
+    RESULT_STORE_PATH: str = os.path.join(tempfile.gettempdir(), "automation_dashboard", "results.db")
+    RESULT_STORE_BATCH_SIZE: int = 64  # results committed per transaction at most
+    RESULT_STORE_FLUSH_INTERVAL: float = 0.5  # seconds the writer waits to fill a batch
+    RESULT_STORE_QUEUE_SIZE: int = 1000  # results beyond this are dropped rather than blocking
+    RESULT_STORE_SEARCH_MAX_OFFSET: int = 1000  # deeper paging gets slower; refine the query instead
+    RESULT_STORE_SNIPPET_TOKENS: int = 16
+
+    # Export of extraction results to a sink chosen per request ('directory',
+    # 'desktop' or 'webhook'); sinks run on a small worker pool in batches
+    EXPORT_DEFAULT_SINK: str = ""  # sink used when a request names none; empty means no export
+    EXPORT_WORKERS: int = 2
+    EXPORT_QUEUE_SIZE: int = 256  # exports beyond this are dropped rather than blocking
+    EXPORT_BATCH_SIZE: int = 16
+    EXPORT_BATCH_WINDOW: float = 0.2  # seconds a worker waits to fill a batch
+    EXPORT_DIR: str = os.path.join(tempfile.gettempdir(), "automation_dashboard", "exports")
+    EXPORT_DIR_MAX_FILES: int = 1000  # oldest exported files are removed beyond this
+    EXPORT_OPEN_COMMAND: List[str] = []  # viewer for the desktop sink; empty picks notepad, open or xdg-open
+    EXPORT_OPEN_RETENTION: float = 300.0  # seconds a file opened on the desktop is kept before it is deleted
+    EXPORT_WEBHOOK_URL: str = ""  # the webhook sink is unavailable while this is empty
+    EXPORT_WEBHOOK_TIMEOUT: float = 10.0
+
+    # Web automation driver pool
+    DRIVER_HEADLESS: bool = False
+    DRIVER_POOL_SIZE: int = 2
+    DRIVER_POOL_PREWARM: int = 1  # sessions started at application startup
+    DRIVER_POOL_MAX_USES: int = 50  # recycle a session after this many leases
+    DRIVER_POOL_IDLE_TIMEOUT: float = 300.0  # seconds
+    DRIVER_POOL_ACQUIRE_TIMEOUT: float = 60.0  # seconds
+
+    # Browser profiles; each profile gets its own driver pool of DRIVER_POOL_SIZE
+    BROWSER_PROFILE_DEFAULT: str = "default"  # built in: default, lean
+    BROWSER_PROFILE_BY_HOST: Dict[str, str] = {}  # hostname -> profile
+    BROWSER_PROFILES: Dict[str, Dict[str, Any]] = {}  # extra or overriding profiles, name -> BrowserProfile options
+    BROWSER_DISK_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), "automation_dashboard", "chrome-cache")
+
+    # Logged-in browser state reused across web runs (needs the 'cryptography' package)
+    SESSION_CACHE_ENABLED: bool = True
+    SESSION_CACHE_TTL: float = 1800.0  # seconds
+    SESSION_CACHE_MAX_ENTRIES: int = 256
+    SESSION_CACHE_DIR: str = ""  # persist encrypted sessions here; empty keeps them in memory
+
+    # Plain-HTTP engine for pages that do not need a browser (needs 'beautifulsoup4')
+    WEB_ENGINE_DEFAULT: str = "auto"  # auto, http or browser
+    WEB_ENGINE_PROBE_TTL: float = 3600.0  # seconds a host's http/browser verdict is reused in auto mode
+    HTTP_TIMEOUT: float = 15.0  # seconds per request
+    HTTP_POOL_CONNECTIONS: int = 16  # hosts with pooled connections
+    HTTP_POOL_MAXSIZE: int = 16  # connections kept per host
+    HTTP_USER_AGENT: str = "Mozilla/5.0 (compatible; automation-dashboard)"
+
+    # Structured extraction
+    EXTRACT_MAX_PAGES: int = 20  # pages followed per extraction at most
+
+    # Batch web runs; browser concurrency is still bounded by DRIVER_POOL_SIZE
+    WEB_BATCH_CONCURRENCY: int = 4  # default per batch
+    WEB_BATCH_MAX_CONCURRENCY: int = 8  # across all batches
+    WEB_BATCH_PER_HOST_LIMIT: int = 2
+    WEB_BATCH_MAX_TARGETS: int = 500
+    WEB_BATCH_TIMEOUT: float = 900.0  # seconds a batch waits for its targets; the rest are reported as timed out
+
+    # Admission control: requests running at once per endpoint kind, plus a
+    # bounded wait queue; beyond that requests get 429 with Retry-After
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_LIMIT_WEB: int = 4  # browser runs also queue for DRIVER_POOL_SIZE sessions
+    ADMISSION_QUEUE_WEB: int = 16
+    ADMISSION_LIMIT_DESKTOP: int = 1  # desktop input is global state
+    ADMISSION_QUEUE_DESKTOP: int = 8
+    ADMISSION_LIMIT_DOCUMENT: int = 4
+    ADMISSION_QUEUE_DOCUMENT: int = 32
+    ADMISSION_MAX_WAIT: float = 30.0  # seconds in the queue before a request is rejected
+    ADMISSION_SMALL_DOCUMENT_BYTES: int = 512 * 1024  # uploads up to this size are admitted first
+
+    # Background job workers (per job kind)
+    JOB_WORKERS_WEB: int = 2
+    JOB_WORKERS_DESKTOP: int = 1  # desktop input is global state, keep it serial
+    JOB_WORKERS_DOCUMENT: int = 4
+    JOB_HISTORY_SIZE: int = 500
+    JOB_EVENTS_POLL_INTERVAL: float = 0.25  # seconds between SSE polls
+
+    # Condition-based waits in web flows (seconds)
+    WAIT_DEFAULT_TIMEOUT: float = 10.0  # used until a host has enough samples
+    WAIT_MIN_TIMEOUT: float = 2.0
+    WAIT_MAX_TIMEOUT: float = 30.0
+    WAIT_ADAPTIVE_FACTOR: float = 3.0  # adaptive timeout = observed p95 * factor
+    WAIT_HISTORY_SIZE: int = 50
+    WAIT_MIN_SAMPLES: int = 5
+    WAIT_POLL_INTERVAL: float = 0.1
+    WAIT_DOM_QUIET_PERIOD: float = 0.3
+    WAIT_SETTLE_GRACE: float = 1.5  # best-effort DOM settles give up this long after the quiet period
+    WAIT_NETWORK_IDLE_PERIOD: float = 0.5
+
+    # Desktop input
+    DESKTOP_INPUT_PAUSE: float = 0.5  # default pause after each input call, overridable per request
+    TYPING_PASTE_MIN_CHARS: int = 200  # 'auto' pastes text at least this long
+    TYPING_PER_KEY_INTERVAL: float = 0.1  # seconds between keys in 'per_key' mode
+    TYPING_PER_KEY_APPS: List[str] = []  # apps that drop keystrokes unless typed slowly
+
+    # Desktop application registry
+    DESKTOP_APP_READY_TIMEOUT: float = 15.0  # seconds to wait for a launched app's window
+    DESKTOP_APP_CLOSE_TIMEOUT: float = 5.0  # seconds before a process that ignores terminate is killed
+
+    # Desktop macros
+    DESKTOP_WINDOW_TIMEOUT: float = 10.0  # default for wait_for_window steps (seconds)
+    DESKTOP_WINDOW_POLL_INTERVAL: float = 0.1
+
+    # Prometheus metrics served at /metrics
+    METRICS_ENABLED: bool = True
+
+    # Structured logging and request traces
+    LOG_LEVEL: str = "INFO"
+    LOG_QUEUE_SIZE: int = 10000  # records beyond this are dropped rather than blocking
+    TRACE_HISTORY_SIZE: int = 200  # recent request traces kept for /api/traces
+    TRACE_MAX_SPANS: int = 1000  # per trace
     
     class Config:
         case_sensitive = True
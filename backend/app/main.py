@@ -1,10 +1,25 @@
-from fastapi import FastAPI, HTTPException
+import time
+
+# Cold start is measured from here, so it includes the framework imports
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 import uvicorn
+import logging
 import os
+from typing import Any, Awaitable, Callable, Dict
 from .config import settings
-from .api.endpoints import web, desktop, document
+from .api.endpoints import jobs, admin, traces, results
+from .services.jobs import shutdown_job_manager
+from .services.admission import AdmissionRejected
+from .services import lazy, metrics, tracing
+from .services.logs import setup_logging, shutdown_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 # Create FastAPI app
 app = FastAPI(
@@ -26,10 +41,137 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Request count, latency and concurrency per route template."""
+    if not settings.METRICS_ENABLED:
+        return await call_next(request)
+    metrics.HTTP_REQUESTS_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep the series count bounded
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        metrics.HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=request.method, route=path)
+        metrics.HTTP_REQUESTS.inc(method=request.method, route=path, status=str(status))
+        metrics.HTTP_REQUESTS_IN_FLIGHT.dec()
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Open a trace for every request and return its id in ``X-Trace-Id``."""
+    token = tracing.start_trace(f"{request.method} {request.url.path}", request.headers.get("x-trace-id"))
+    trace_id = tracing.current_trace_id()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Trace-Id"] = trace_id
+        return response
+    finally:
+        logger.info(
+            "Request handled",
+            extra={
+                "method": request.method,
+                "path": request.url.path,
+                "status": status,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            }
+        )
+        tracing.end_trace(token, status)
+
+class UploadLimitMiddleware:
+    """
+    Reject request bodies above ``max_body`` bytes before they are received.
+
+    Starlette parses and spools a whole multipart body before the endpoint
+    runs, so the endpoint's own size check comes too late to save the
+    transfer. Bodies that declare a larger ``Content-Length`` are refused
+    up front; bodies without one are cut off as soon as the running byte
+    count passes the limit.
+
+    Args:
+        app: The ASGI app to wrap
+        max_body: Largest accepted body in bytes
+        path_prefix: Only requests under this path are checked
+        detail: Error message returned with the 400 response
+    """
+
+    def __init__(self, app: Any, max_body: int, path_prefix: str, detail: str):
+        self.app = app
+        self.max_body = max_body
+        self.path_prefix = path_prefix
+        self.detail = detail
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable[[], Awaitable[Dict[str, Any]]], send: Any) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        declared = headers.get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > self.max_body:
+            await JSONResponse({"detail": self.detail}, status_code=400)(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+        refused = False
+
+        async def limited_receive() -> Dict[str, Any]:
+            nonlocal received, refused
+            if refused:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body and not response_started:
+                    # Raising here would not reach the client: FastAPI turns any
+                    # error while parsing the body into its own 400. Answer
+                    # directly, then end the body as if the client had left.
+                    refused = True
+                    await JSONResponse({"detail": self.detail}, status_code=400)(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message: Dict[str, Any]) -> None:
+            nonlocal response_started
+            if refused:
+                # The app's own response to the cut-off body
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
+
+# Refuse oversized uploads before Starlette receives and spools them
+app.add_middleware(
+    UploadLimitMiddleware,
+    max_body=settings.MAX_UPLOAD_SIZE + settings.UPLOAD_MULTIPART_OVERHEAD,
+    path_prefix="/api/document/",
+    detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE} bytes"
+)
+
 # Include API routers
-app.include_router(web.router, prefix="/api", tags=["web"])
-app.include_router(desktop.router, prefix="/api", tags=["desktop"])
-app.include_router(document.router, prefix="/api", tags=["document"])
+# Endpoint modules are light; their services are imported on first use
+if settings.WEB_AUTOMATION_ENABLED:
+    from .api.endpoints import web
+    app.include_router(web.router, prefix="/api", tags=["web"])
+if settings.DESKTOP_AUTOMATION_ENABLED:
+    from .api.endpoints import desktop
+    app.include_router(desktop.router, prefix="/api", tags=["desktop"])
+if settings.DOCUMENT_AUTOMATION_ENABLED:
+    from .api.endpoints import document
+    app.include_router(document.router, prefix="/api", tags=["document"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
+app.include_router(admin.router, prefix="/api", tags=["admin"])
+app.include_router(traces.router, prefix="/api", tags=["traces"])
+app.include_router(results.router, prefix="/api", tags=["results"])
 
 @app.get("/")
 async def root():
@@ -40,30 +182,142 @@ async def root():
         "docs": "/docs",
         "endpoints": [
             {"path": "/api/web-automate", "method": "POST", "description": "Web automation endpoint"},
+            {"path": "/api/web-automate/batch", "method": "POST", "description": "Run a web scenario against many URLs, streamed as NDJSON"},
+            {"path": "/api/web-automate/extract", "method": "POST", "description": "Typed records extracted page by page, streamed as NDJSON"},
+            {"path": "/api/web-automate/pool", "method": "GET", "description": "Browser session pool statistics"},
+            {"path": "/api/web-automate/profiles", "method": "GET", "description": "Browser profiles and the traffic they saved"},
             {"path": "/api/desktop-automate", "method": "POST", "description": "Desktop automation endpoint"},
-            {"path": "/api/document/extract-text", "method": "POST", "description": "Document text extraction endpoint"}
+            {"path": "/api/desktop-automate/macro", "method": "POST", "description": "Run several desktop steps in one app session"},
+            {"path": "/api/desktop-automate/apps", "method": "GET", "description": "Applications opened by the server"},
+            {"path": "/api/document/extract-text", "method": "POST", "description": "Document text extraction endpoint"},
+            {"path": "/api/document/extract-text/stream", "method": "POST", "description": "Per-page text extraction streamed as NDJSON"},
+            {"path": "/api/results/search", "method": "GET", "description": "Full-text search over extracted documents"},
+            {"path": "/api/results/{document_id}", "method": "GET", "description": "Stored document metadata and page text"},
+            {"path": "/api/{web-automate|desktop-automate|document/extract-text}/jobs", "method": "POST", "description": "Queue an automation job"},
+            {"path": "/api/jobs/{job_id}", "method": "GET", "description": "Job status and result"},
+            {"path": "/api/jobs/{job_id}/events", "method": "GET", "description": "Job progress as Server-Sent Events"},
+            {"path": "/api/admin/cache", "method": "GET, DELETE", "description": "Extraction cache statistics and invalidation"},
+            {"path": "/api/admin/admission", "method": "GET", "description": "Admission control queues and rejections per endpoint"},
+            {"path": "/api/traces/{trace_id}", "method": "GET", "description": "Span timeline of a recent request"},
+            {"path": "/metrics", "method": "GET", "description": "Prometheus metrics"}
         ]
     }
 
+def enabled_service_modules() -> list:
+    """Service modules of the enabled subsystems, in the order they are preloaded."""
+    modules = []
+    if settings.WEB_AUTOMATION_ENABLED:
+        modules += ["app.services.web_automation", "app.services.web_batch"]
+    if settings.DESKTOP_AUTOMATION_ENABLED:
+        modules += ["app.services.desktop_automation"]
+    if settings.DOCUMENT_AUTOMATION_ENABLED:
+        modules += ["app.services.document_automation"]
+    return modules
+
+@app.on_event("startup")
+async def warm_up():
+    """
+    Import the enabled services and start their pools before the first
+    request arrives, unless ``SERVER_PRELOAD`` leaves everything lazy.
+    """
+    metrics.STARTUP_SECONDS.set(_import_ready - _import_started, phase="import")
+    if settings.SERVER_PRELOAD:
+        started = time.perf_counter()
+        for name in enabled_service_modules():
+            try:
+                await run_in_threadpool(lazy.load, name)
+            except Exception as e:
+                logger.error("Failed to preload %s: %s", name, e)
+        metrics.STARTUP_SECONDS.set(time.perf_counter() - started, phase="preload")
+
+        started = time.perf_counter()
+        if settings.WEB_AUTOMATION_ENABLED:
+            try:
+                web_automation = lazy.load("app.services.web_automation")
+                count = await run_in_threadpool(web_automation.warm_driver_pool)
+                logger.info("Pre-warmed %d browser session(s)", count)
+            except Exception as e:
+                logger.error("Failed to pre-warm browser sessions: %s", e)
+        if settings.DOCUMENT_AUTOMATION_ENABLED:
+            try:
+                ocr_engine = lazy.load("app.services.ocr_engine")
+                count = await run_in_threadpool(ocr_engine.warm_ocr_pool)
+                logger.info("Pre-warmed %d OCR engine(s)", count)
+            except Exception as e:
+                logger.error("Failed to pre-warm OCR engines: %s", e)
+        metrics.STARTUP_SECONDS.set(time.perf_counter() - started, phase="warm_up")
+    total = time.perf_counter() - _import_started
+    metrics.STARTUP_SECONDS.set(total, phase="total")
+    logger.info(
+        "Worker ready",
+        extra={"pid": os.getpid(), "cold_start_ms": round(total * 1000, 3), "module_import_seconds": lazy.import_seconds()}
+    )
+
+# Only modules that were actually imported have anything to release
+_SHUTDOWN_HOOKS = [
+    ("app.services.app_registry", "shutdown_app_registry"),
+    ("app.services.web_automation", "shutdown_driver_pool"),
+    ("app.services.http_engine", "shutdown_http_adapter"),
+    ("app.services.document_automation", "shutdown_process_pool"),
+    ("app.services.tiling", "shutdown_tile_executor"),
+    ("app.services.ocr_engine", "shutdown_ocr_pool"),
+    ("app.services.exports", "shutdown_export_manager"),
+    # Last, so pages handed over by the hooks above are still written
+    ("app.services.result_store", "shutdown_result_store"),
+]
+
+@app.on_event("shutdown")
+async def shut_down():
+    """Let queued jobs finish, then release pooled resources."""
+    await run_in_threadpool(shutdown_job_manager)
+    for name, hook in _SHUTDOWN_HOOKS:
+        module = lazy.loaded(name)
+        if module is None:
+            continue
+        try:
+            await run_in_threadpool(getattr(module, hook))
+        except Exception as e:
+            logger.error("Shutdown hook %s.%s failed: %s", name, hook, e)
+    shutdown_logging()
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring."""
     return {"status": "healthy"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Request and per-stage service metrics in the Prometheus text format."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
+
 # Error handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None),
+    )
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request, exc):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "reason": exc.reason, "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
     )
 
+_import_ready = time.perf_counter()
+
 if __name__ == "__main__":
+    # Development server; use `python -m app.serve` in production
     uvicorn.run(
         "app.main:app",
-        host="0.0.0.0",
-        port=8000,
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
         reload=True,
         workers=1
     )
@@ -0,0 +1,53 @@
+"""
+Production server entry point.
+
+Run from the backend directory:
+
+    python -m app.serve                  # SERVER_HOST, SERVER_PORT, SERVER_WORKERS from settings
+    python -m app.serve --workers 8 --port 9000
+
+Each worker is a separate process that imports the enabled services and
+warms their pools on startup (``SERVER_PRELOAD``), so the first request
+does not pay for it. On SIGTERM/SIGINT workers stop accepting connections,
+give in-flight requests ``SERVER_GRACEFUL_TIMEOUT`` seconds, let queued
+jobs finish and release browsers, OCR engines and process pools.
+"""
+import argparse
+import os
+import uvicorn
+from app.config import settings
+
+MAX_DEFAULT_WORKERS = 4
+
+
+def worker_count(requested: int) -> int:
+    """``requested`` workers, or one per CPU (at most ``MAX_DEFAULT_WORKERS``) when 0."""
+    if requested > 0:
+        return requested
+    # Every worker keeps its own browser, OCR and process pools, so more
+    # workers multiply memory rather than just adding request capacity
+    return max(1, min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the automation dashboard API")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS, help="0 = one per CPU")
+    parser.add_argument("--graceful-timeout", type=float, default=settings.SERVER_GRACEFUL_TIMEOUT)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=worker_count(args.workers),
+        timeout_graceful_shutdown=int(args.graceful_timeout),
+        # Requests are already logged as JSON by the trace middleware
+        access_log=False,
+        proxy_headers=True
+    )
+
+
+if __name__ == "__main__":
+    main()
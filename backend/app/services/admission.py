@@ -0,0 +1,279 @@
+import asyncio
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from app.config import settings
+from app.services.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED, ADMISSION_WAIT
+
+# Lower values are admitted first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+
+class AdmissionRejected(Exception):
+    """The endpoint is at capacity; the client should retry after ``retry_after`` seconds."""
+
+    def __init__(self, kind: str, reason: str, retry_after: int):
+        super().__init__(f"Too many {kind} requests ({reason}); retry in {retry_after}s")
+        self.kind = kind
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """
+    An admitted request holding ``weight`` slots; ``release`` is idempotent
+    and may be called from any thread.
+    """
+
+    def __init__(self, controller: "AdmissionController", loop: asyncio.AbstractEventLoop, weight: int = 1):
+        self._controller = controller
+        self._loop = loop
+        self.weight = weight
+        self._admitted_at = time.monotonic()
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        held = time.monotonic() - self._admitted_at
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._controller._release(held, self.weight)
+        elif not self._loop.is_closed():
+            # e.g. a streaming generator finishing on a worker thread
+            self._loop.call_soon_threadsafe(self._controller._release, held, self.weight)
+
+
+class AdmissionController:
+    """
+    Concurrency limit plus a bounded priority wait queue for one endpoint kind.
+
+    At most ``limit`` slots are held at once; a request holds one, or
+    ``weight`` when it fans out into several concurrent runs. Up to
+    ``queue_size`` more requests wait, lower ``priority`` values first and
+    FIFO within a priority; anything beyond that, or a request that waited
+    ``max_wait`` seconds, is rejected with an estimate of when capacity will
+    free up. State is only touched on the event loop; tickets hop back to it
+    to release.
+    """
+
+    def __init__(self, kind: str, limit: int, queue_size: int, max_wait: float = 30.0):
+        if limit < 1:
+            raise ValueError("Admission limit must be at least 1")
+        self.kind = kind
+        self.limit = limit
+        self.queue_size = max(0, queue_size)
+        self.max_wait = max_wait
+        self._active = 0
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        # Exponentially weighted average time a request holds its slot
+        self._avg_hold = 0.0
+        self._stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_wait_timeout": 0,
+                       "rejected_backlog_full": 0, "wait_time_total": 0.0, "max_wait_time": 0.0}
+
+    def retry_after(self) -> int:
+        """Seconds until a request joining now would likely be admitted."""
+        ahead = len(self._waiters) + 1
+        estimate = (self._avg_hold or 1.0) * ahead / self.limit
+        return max(1, min(60, math.ceil(estimate)))
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL, weight: int = 1) -> Ticket:
+        # A request never needs more than every slot, or it could never be admitted
+        weight = max(1, min(weight, self.limit))
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        if self._active + weight <= self.limit and not self._waiters:
+            self._active += weight
+            self._admitted(started, priority, queued=False)
+            return Ticket(self, loop, weight)
+        if len(self._waiters) >= self.queue_size:
+            self._reject("queue_full")
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), weight, future))
+        self._publish()
+        try:
+            # The slots are handed over by _admit_waiters, which already counts them as active
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Admitted just as we gave up: pass the slots on
+                self._release(None, weight)
+            else:
+                future.cancel()
+                self._remove_waiter(future)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._reject("wait_timeout")
+        self._admitted(started, priority, queued=True)
+        return Ticket(self, loop, weight)
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_NORMAL, weight: int = 1) -> AsyncIterator[Ticket]:
+        ticket = await self.acquire(priority, weight)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        waited = stats.pop("wait_time_total")
+        stats.update({
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "active": self._active,
+            "queue_depth": len(self._waiters),
+            "avg_wait_time": waited / stats["queued"] if stats["queued"] else 0.0,
+            "avg_hold_time": self._avg_hold,
+            "retry_after": self.retry_after(),
+        })
+        return stats
+
+    def _release(self, held: Optional[float], weight: int = 1) -> None:
+        if held is not None:
+            self._avg_hold = held if not self._avg_hold else 0.8 * self._avg_hold + 0.2 * held
+        self._active -= weight
+        self._admit_waiters()
+
+    def _admit_waiters(self) -> None:
+        """
+        Hand free slots to waiters in queue order. A waiter that needs more
+        slots than are free holds back the ones behind it, so heavy requests
+        are not starved by a stream of light ones.
+        """
+        while self._waiters:
+            _, _, weight, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self._active + weight > self.limit:
+                break
+            heapq.heappop(self._waiters)
+            self._active += weight
+            future.set_result(None)
+        self._publish()
+
+    def _remove_waiter(self, future: asyncio.Future) -> None:
+        self._waiters = [w for w in self._waiters if w[3] is not future]
+        heapq.heapify(self._waiters)
+        # The waiter may have been holding back lighter ones behind it
+        self._admit_waiters()
+
+    def _admitted(self, started: float, priority: int, queued: bool) -> None:
+        waited = time.monotonic() - started
+        self._stats["admitted"] += 1
+        if queued:
+            self._stats["queued"] += 1
+            self._stats["wait_time_total"] += waited
+            self._stats["max_wait_time"] = max(self._stats["max_wait_time"], waited)
+        if settings.METRICS_ENABLED:
+            ADMISSION_WAIT.observe(waited, endpoint=self.kind, priority=str(priority))
+        self._publish()
+
+    def _reject(self, reason: str) -> None:
+        self._stats[f"rejected_{reason}"] += 1
+        if settings.METRICS_ENABLED:
+            ADMISSION_REJECTED.inc(endpoint=self.kind, reason=reason)
+        raise AdmissionRejected(self.kind, reason, self.retry_after())
+
+    def _publish(self) -> None:
+        if settings.METRICS_ENABLED:
+            ADMISSION_QUEUE_DEPTH.set(len(self._waiters), endpoint=self.kind)
+            ADMISSION_IN_FLIGHT.set(self._active, endpoint=self.kind)
+
+
+_controllers: Dict[str, AdmissionController] = {}
+_controllers_lock = threading.Lock()
+
+
+def _limits(kind: str) -> Tuple[int, int]:
+    name = kind.upper()
+    return getattr(settings, f"ADMISSION_LIMIT_{name}"), getattr(settings, f"ADMISSION_QUEUE_{name}")
+
+
+def get_admission_controller(kind: str) -> AdmissionController:
+    """Return the process-wide controller for ``kind`` (web, desktop or document)."""
+    with _controllers_lock:
+        controller = _controllers.get(kind)
+        if controller is None:
+            limit, queue_size = _limits(kind)
+            controller = _controllers[kind] = AdmissionController(
+                kind, limit, queue_size, max_wait=settings.ADMISSION_MAX_WAIT
+            )
+        return controller
+
+
+@asynccontextmanager
+async def admitted(kind: str, priority: int = PRIORITY_NORMAL, weight: int = 1) -> AsyncIterator[Optional[Ticket]]:
+    """Hold ``weight`` admission slots for ``kind`` for the duration of the block."""
+    if not settings.ADMISSION_ENABLED:
+        yield None
+        return
+    async with get_admission_controller(kind).slot(priority, weight) as ticket:
+        yield ticket
+
+
+async def admit(kind: str, priority: int = PRIORITY_NORMAL, weight: int = 1) -> Optional[Ticket]:
+    """
+    Acquire ``weight`` slots the caller releases itself, e.g. once a
+    streamed response has been fully sent. ``weight`` is the number of runs
+    the request starts at once. None when admission control is off.
+    """
+    if not settings.ADMISSION_ENABLED:
+        return None
+    return await get_admission_controller(kind).acquire(priority, weight)
+
+
+def check_backlog(kind: str, pending: int) -> None:
+    """
+    Reject a queued-job submission once ``pending`` unfinished jobs of
+    ``kind`` already fill the concurrency limit and the wait queue.
+
+    Jobs return immediately, so they cannot wait for a slot; the job pools
+    bound how many run and this bounds how many may pile up.
+    """
+    if not settings.ADMISSION_ENABLED:
+        return
+    controller = get_admission_controller(kind)
+    if pending >= controller.limit + controller.queue_size:
+        controller._reject("backlog_full")
+
+
+def admission_stats() -> Dict[str, Dict[str, Any]]:
+    with _controllers_lock:
+        controllers = dict(_controllers)
+    return {kind: controller.stats() for kind, controller in controllers.items()}
+
+
+def document_priority(size: int) -> int:
+    """Small documents jump the queue: they finish fast and free the slot quickly."""
+    return PRIORITY_HIGH if size <= settings.ADMISSION_SMALL_DOCUMENT_BYTES else PRIORITY_NORMAL
+
+
+def release(ticket: Optional[Ticket]) -> None:
+    if ticket is not None:
+        ticket.release()
+
+
+def release_after(chunks: Iterator[str], ticket: Optional[Ticket]) -> Iterator[str]:
+    """
+    Yield a streamed response's chunks and release ``ticket`` once they are
+    exhausted or the client goes away. Pair it with a background
+    ``release`` for streams that are closed before they start.
+    """
+    try:
+        yield from chunks
+    finally:
+        release(ticket)
@@ -0,0 +1,380 @@
+import itertools
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from app.config import settings
+from app.services.input_backend import InputBackend, get_input_backend
+
+logger = logging.getLogger(__name__)
+
+
+class AppSpec:
+    """How to launch, find and recognise one desktop application."""
+
+    def __init__(self, name: str, executable: str, process_name: str, window_title: str):
+        self.name = name
+        self.executable = executable
+        self.process_name = process_name
+        self.window_title = window_title
+
+
+APPS: Dict[str, AppSpec] = {
+    'notepad': AppSpec('notepad', 'notepad.exe', 'notepad.exe', 'Notepad'),
+    'wordpad': AppSpec('wordpad', 'wordpad.exe', 'wordpad.exe', 'WordPad'),
+    'calculator': AppSpec('calculator', 'calc.exe', 'calculator.exe', 'Calculator'),
+    'paint': AppSpec('paint', 'mspaint.exe', 'mspaint.exe', 'Paint'),
+    'chrome': AppSpec('chrome', 'chrome.exe', 'chrome.exe', 'Chrome'),
+    'firefox': AppSpec('firefox', 'firefox.exe', 'firefox.exe', 'Firefox'),
+    'edge': AppSpec('edge', 'msedge.exe', 'msedge.exe', 'Edge'),
+}
+
+
+class ProcessLauncher:
+    """Starts, finds and stops application processes."""
+
+    name = "base"
+
+    def launch(self, spec: AppSpec) -> Optional[int]:
+        """Start the app and return its pid, or None when the OS does not report one."""
+        raise NotImplementedError
+
+    def is_running(self, pid: int) -> bool:
+        raise NotImplementedError
+
+    def find(self, spec: AppSpec) -> List[int]:
+        """Pids of running instances of the app, including ones we did not start."""
+        raise NotImplementedError
+
+    def terminate(self, pid: int, timeout: float) -> None:
+        """Ask the process to exit, killing it if it is still running after ``timeout``."""
+        raise NotImplementedError
+
+
+class SystemLauncher(ProcessLauncher):
+    """Real processes, via ``subprocess`` (``tasklist``/``taskkill`` on Windows)."""
+
+    name = "system"
+
+    def __init__(self):
+        self._processes: Dict[int, subprocess.Popen] = {}
+        self._lock = threading.Lock()
+
+    def launch(self, spec: AppSpec) -> Optional[int]:
+        try:
+            process = subprocess.Popen([spec.executable])
+        except FileNotFoundError:
+            # Apps registered under "App Paths" (chrome, msedge) are not on PATH
+            if not hasattr(os, "startfile"):
+                raise
+            os.startfile(spec.executable)
+            return None
+        with self._lock:
+            self._processes[process.pid] = process
+        return process.pid
+
+    def is_running(self, pid: int) -> bool:
+        with self._lock:
+            process = self._processes.get(pid)
+        if process is not None:
+            return process.poll() is None
+        if sys.platform == "win32":
+            output = subprocess.run(
+                ["tasklist", "/FI", f"PID eq {pid}", "/FO", "CSV", "/NH"],
+                capture_output=True, text=True
+            ).stdout
+            return f'"{pid}"' in output
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            return False
+        return True
+
+    def find(self, spec: AppSpec) -> List[int]:
+        if sys.platform == "win32":
+            output = subprocess.run(
+                ["tasklist", "/FI", f"IMAGENAME eq {spec.process_name}", "/FO", "CSV", "/NH"],
+                capture_output=True, text=True
+            ).stdout
+            pids = []
+            for line in output.splitlines():
+                fields = [field.strip('"') for field in line.split('","')]
+                if len(fields) > 1 and fields[1].isdigit():
+                    pids.append(int(fields[1]))
+            return pids
+        name = os.path.splitext(spec.process_name)[0]
+        output = subprocess.run(["pgrep", "-x", name], capture_output=True, text=True).stdout
+        return [int(pid) for pid in output.split()]
+
+    def terminate(self, pid: int, timeout: float) -> None:
+        with self._lock:
+            process = self._processes.pop(pid, None)
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            return
+        if sys.platform == "win32":
+            subprocess.run(["taskkill", "/pid", str(pid)], capture_output=True)
+        else:
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + timeout
+        while self.is_running(pid) and time.monotonic() < deadline:
+            time.sleep(settings.DESKTOP_WINDOW_POLL_INTERVAL)
+        if self.is_running(pid):
+            if sys.platform == "win32":
+                subprocess.run(["taskkill", "/f", "/pid", str(pid)], capture_output=True)
+            else:
+                os.kill(pid, signal.SIGKILL)
+
+
+class FakeLauncher(ProcessLauncher):
+    """
+    Stand-in launcher that starts no processes.
+
+    Launched apps get sequential fake pids. When a ``RecordingBackend`` is
+    given, the app's window appears on it (after ``window_delay`` seconds)
+    and disappears when the app is stopped.
+    """
+
+    name = "fake"
+
+    def __init__(self, backend: Optional[InputBackend] = None, window_delay: float = 0.0):
+        self.backend = backend
+        self.window_delay = window_delay
+        self.launches: List[str] = []
+        self.running: Dict[int, AppSpec] = {}
+        self._pids = itertools.count(1000)
+        self._lock = threading.Lock()
+
+    def launch(self, spec: AppSpec) -> Optional[int]:
+        pid = next(self._pids)
+        with self._lock:
+            self.launches.append(spec.name)
+            self.running[pid] = spec
+        if self.backend is not None:
+            if self.window_delay:
+                threading.Timer(self.window_delay, self.backend.add_window, (spec.window_title,)).start()
+            else:
+                self.backend.add_window(spec.window_title)
+        return pid
+
+    def is_running(self, pid: int) -> bool:
+        with self._lock:
+            return pid in self.running
+
+    def find(self, spec: AppSpec) -> List[int]:
+        with self._lock:
+            return [pid for pid, running in self.running.items() if running.name == spec.name]
+
+    def terminate(self, pid: int, timeout: float) -> None:
+        with self._lock:
+            spec = self.running.pop(pid, None)
+        if spec is not None and self.backend is not None and not self.find(spec):
+            self.backend.remove_window(spec.window_title)
+
+
+class TrackedApp:
+    def __init__(self, spec: AppSpec, pid: Optional[int], launched: bool):
+        self.spec = spec
+        self.pid = pid
+        self.launched = launched  # False when we adopted an instance that was already running
+        self.started_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "app": self.spec.name,
+            "pid": self.pid,
+            "window_title": self.spec.window_title,
+            "launched": self.launched,
+            "started_at": self.started_at,
+        }
+
+
+class AppRegistry:
+    """
+    Tracks the desktop applications this server opened.
+
+    ``open`` reuses and focuses an instance that is already running (one we
+    launched, or one found by process name) and otherwise launches the app
+    and polls until its window appears, instead of sleeping a fixed time.
+    ``close`` only stops the instance the registry tracks, and ``shutdown``
+    stops every process the registry launched. Each app has its own lock,
+    so a slow launch only holds up calls for that app.
+
+    Args:
+        launcher: Platform layer that starts and stops processes
+        backend: Input backend used to find and focus windows; defaults to
+            the active backend
+    """
+
+    def __init__(self, launcher: ProcessLauncher, backend: Optional[InputBackend] = None):
+        self.launcher = launcher
+        self._backend = backend
+        self._apps: Dict[str, TrackedApp] = {}
+        self._app_locks: Dict[str, threading.Lock] = {name: threading.Lock() for name in APPS}
+        # Guards _apps only; never held while launching or polling
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> InputBackend:
+        return self._backend or get_input_backend()
+
+    def _has_window(self, spec: AppSpec) -> Optional[bool]:
+        """None when the backend cannot look up windows on this platform."""
+        try:
+            return self.backend.has_window(spec.window_title)
+        except NotImplementedError:
+            return None
+
+    def _is_alive(self, tracked: TrackedApp) -> bool:
+        if tracked.pid is not None and self.launcher.is_running(tracked.pid):
+            return True
+        # Some launchers hand off to another process and exit (e.g. Notepad on Windows 11)
+        return bool(self._has_window(tracked.spec))
+
+    def _wait_ready(self, spec: AppSpec, pid: Optional[int], timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            has_window = self._has_window(spec)
+            if has_window:
+                return True
+            if has_window is None:
+                # No window lookup: a live process is the best signal available
+                if pid is None or self.launcher.is_running(pid):
+                    return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(settings.DESKTOP_WINDOW_POLL_INTERVAL)
+
+    def _focus(self, spec: AppSpec) -> None:
+        try:
+            self.backend.focus_window(spec.window_title)
+        except NotImplementedError:
+            pass
+
+    def open(self, app_name: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Focus a running instance of the app or launch one and wait until it is ready."""
+        spec = APPS.get(app_name.lower())
+        if spec is None:
+            return {"status": "error", "message": f"Application '{app_name}' is not supported"}
+        timeout = settings.DESKTOP_APP_READY_TIMEOUT if timeout is None else timeout
+        started = time.perf_counter()
+
+        with self._app_locks[spec.name]:
+            with self._lock:
+                tracked = self._apps.get(spec.name)
+            if tracked is not None and not self._is_alive(tracked):
+                tracked = None
+                with self._lock:
+                    self._apps.pop(spec.name, None)
+            if tracked is None:
+                running = self.launcher.find(spec)
+                if running and self._has_window(spec) is not False:
+                    tracked = TrackedApp(spec, running[0], launched=False)
+                    with self._lock:
+                        self._apps[spec.name] = tracked
+            if tracked is not None:
+                self._focus(spec)
+                return {
+                    "status": "success",
+                    "message": f"{app_name} is already running",
+                    "reused": True,
+                    "pid": tracked.pid,
+                }
+
+            pid = self.launcher.launch(spec)
+            if not self._wait_ready(spec, pid, timeout):
+                if pid is not None:
+                    self.launcher.terminate(pid, settings.DESKTOP_APP_CLOSE_TIMEOUT)
+                return {"status": "error", "message": f"{app_name} did not open within {timeout}s"}
+            if pid is None:
+                # Started through the shell: follow the one new instance, if it can be told apart
+                new_pids = [found for found in self.launcher.find(spec) if found not in running]
+                pid = new_pids[0] if len(new_pids) == 1 else None
+            with self._lock:
+                self._apps[spec.name] = TrackedApp(spec, pid, launched=True)
+            self._focus(spec)
+
+        logger.info("Opened application", extra={"app": spec.name, "pid": pid})
+        return {
+            "status": "success",
+            "message": f"Successfully opened {app_name}",
+            "reused": False,
+            "pid": pid,
+            "ready_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def close(self, app_name: str) -> Dict[str, Any]:
+        """
+        Stop the tracked instance of the app. Instances the registry neither
+        opened nor adopted are left alone.
+        """
+        spec = APPS.get(app_name.lower())
+        if spec is None:
+            return {"status": "error", "message": f"Application '{app_name}' is not supported"}
+        with self._app_locks[spec.name]:
+            with self._lock:
+                tracked = self._apps.pop(spec.name, None)
+            if tracked is None:
+                return {"status": "success", "message": f"{app_name} is not running", "closed": False}
+            if tracked.pid is None:
+                # Stopping it by process name could hit instances the registry did not start
+                return {
+                    "status": "success",
+                    "message": f"{app_name} has no known pid and was left running",
+                    "closed": False,
+                }
+            self.launcher.terminate(tracked.pid, settings.DESKTOP_APP_CLOSE_TIMEOUT)
+        return {"status": "success", "message": f"Successfully closed {app_name}", "closed": True}
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            apps = list(self._apps.values())
+        return [tracked.to_dict() for tracked in apps]
+
+    def shutdown(self) -> None:
+        """Stop the processes the registry launched; adopted instances are left running."""
+        with self._lock:
+            apps, self._apps = list(self._apps.values()), {}
+        for tracked in apps:
+            if not tracked.launched or tracked.pid is None:
+                continue
+            try:
+                self.launcher.terminate(tracked.pid, settings.DESKTOP_APP_CLOSE_TIMEOUT)
+            except Exception as e:
+                logger.error("Failed to stop %s (pid %s): %s", tracked.spec.name, tracked.pid, e)
+
+
+_app_registry: Optional[AppRegistry] = None
+_app_registry_lock = threading.Lock()
+
+
+def get_app_registry() -> AppRegistry:
+    """Return the process-wide app registry, creating it on first use."""
+    global _app_registry
+    with _app_registry_lock:
+        if _app_registry is None:
+            _app_registry = AppRegistry(SystemLauncher())
+        return _app_registry
+
+
+def set_app_registry(registry: Optional[AppRegistry]) -> None:
+    """Install a registry (e.g. one with a ``FakeLauncher`` in tests); None restores the default."""
+    global _app_registry
+    with _app_registry_lock:
+        _app_registry = registry
+
+
+def shutdown_app_registry() -> None:
+    global _app_registry
+    with _app_registry_lock:
+        registry, _app_registry = _app_registry, None
+    if registry is not None:
+        registry.shutdown()
@@ -0,0 +1,216 @@
+import json
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from app.config import settings
+
+# URL patterns (Network.setBlockedURLs wildcards) for each blockable resource type
+RESOURCE_PATTERNS: Dict[str, List[str]] = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav", "*.m4a", "*.mov", "*.m3u8"],
+    "stylesheet": ["*.css"],
+}
+
+# Analytics, ad and tag-manager hosts our flows never depend on
+THIRD_PARTY_SCRIPT_PATTERNS: List[str] = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*googlesyndication.com*",
+    "*doubleclick.net*",
+    "*connect.facebook.net*",
+    "*hotjar.com*",
+    "*segment.io*",
+    "*cdn.segment.com*",
+    "*newrelic.com*",
+    "*nr-data.net*",
+]
+
+# Name of the profile other profiles' traffic is compared against
+BASELINE_PROFILE = "default"
+
+
+class BrowserProfile:
+    """
+    Chrome settings a pooled browser session is started with.
+
+    Args:
+        name: Profile name, used to select it and to key its driver pool
+        headless: Run Chrome without a window
+        page_load_strategy: 'normal', 'eager' (return at DOMContentLoaded) or 'none'
+        block_resources: Resource types from ``RESOURCE_PATTERNS`` to block
+        block_patterns: Extra URL wildcards to block (e.g. third-party scripts)
+        disk_cache_dir: Chrome disk cache directory, empty for Chrome's default
+        viewport: Window size as (width, height)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        headless: bool = True,
+        page_load_strategy: str = "normal",
+        block_resources: Optional[List[str]] = None,
+        block_patterns: Optional[List[str]] = None,
+        disk_cache_dir: str = "",
+        viewport: Tuple[int, int] = (1920, 1080)
+    ):
+        if page_load_strategy not in ("normal", "eager", "none"):
+            raise ValueError(f"Unknown page load strategy '{page_load_strategy}'")
+        unknown = set(block_resources or ()) - set(RESOURCE_PATTERNS)
+        if unknown:
+            raise ValueError(
+                f"Unknown resource types {sorted(unknown)}. Available: {', '.join(RESOURCE_PATTERNS)}"
+            )
+        self.name = name
+        self.headless = headless
+        self.page_load_strategy = page_load_strategy
+        self.block_resources = list(block_resources or ())
+        self.block_patterns = list(block_patterns or ())
+        self.disk_cache_dir = disk_cache_dir
+        self.viewport = tuple(viewport)
+
+    @property
+    def blocked_urls(self) -> List[str]:
+        urls = [pattern for kind in self.block_resources for pattern in RESOURCE_PATTERNS[kind]]
+        return urls + self.block_patterns
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "headless": self.headless,
+            "page_load_strategy": self.page_load_strategy,
+            "block_resources": self.block_resources,
+            "block_patterns": self.block_patterns,
+            "disk_cache_dir": self.disk_cache_dir,
+            "viewport": list(self.viewport),
+        }
+
+
+def _builtin_profiles() -> Dict[str, BrowserProfile]:
+    return {
+        # What init_driver always did before profiles existed
+        "default": BrowserProfile("default", headless=settings.DRIVER_HEADLESS),
+        "lean": BrowserProfile(
+            "lean",
+            headless=True,
+            page_load_strategy="eager",
+            block_resources=["image", "font", "media"],
+            block_patterns=THIRD_PARTY_SCRIPT_PATTERNS,
+            disk_cache_dir=settings.BROWSER_DISK_CACHE_DIR,
+            viewport=(1280, 800)
+        ),
+    }
+
+
+def get_profiles() -> Dict[str, BrowserProfile]:
+    """Built-in profiles, overridden or extended by ``BROWSER_PROFILES``."""
+    profiles = _builtin_profiles()
+    for name, options in settings.BROWSER_PROFILES.items():
+        profiles[name] = BrowserProfile(name, **options)
+    return profiles
+
+
+def resolve_profile(url: str, name: Optional[str] = None) -> BrowserProfile:
+    """
+    The profile for a run: ``name`` if given, else the one configured for
+    the URL's host in ``BROWSER_PROFILE_BY_HOST``, else ``BROWSER_PROFILE_DEFAULT``.
+    """
+    profiles = get_profiles()
+    if not name:
+        host = urlparse(url).hostname or ""
+        name = settings.BROWSER_PROFILE_BY_HOST.get(host, settings.BROWSER_PROFILE_DEFAULT)
+    if name not in profiles:
+        raise ValueError(f"Unknown browser profile '{name}'. Available: {', '.join(profiles)}")
+    return profiles[name]
+
+
+def drain_network_log(driver: Any) -> None:
+    """Discard network events left over from before this run (e.g. the pool's reset)."""
+    try:
+        driver.get_log("performance")
+    except Exception:
+        pass
+
+
+def read_network_log(driver: Any) -> Dict[str, int]:
+    """
+    Count requests, bytes received and blocked requests since the last read.
+
+    Built from Chrome's performance log, so it covers every document the run
+    navigated through rather than only the current one.
+    """
+    requests = bytes_received = blocked = 0
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return {"requests": 0, "bytes": 0, "blocked_requests": 0}
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        method = message.get("method")
+        if method == "Network.requestWillBeSent":
+            requests += 1
+        elif method == "Network.loadingFinished":
+            bytes_received += int(message["params"].get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and message["params"].get("blockedReason"):
+            blocked += 1
+    return {"requests": requests - blocked, "bytes": bytes_received, "blocked_requests": blocked}
+
+
+class ProfileLedger:
+    """
+    Traffic per (profile, host), used to report what each profile saved.
+
+    Savings for a run are the baseline profile's average requests and bytes
+    for the same host minus the run's own; they are unknown until the
+    baseline profile has visited that host.
+    """
+
+    def __init__(self, baseline: str = BASELINE_PROFILE):
+        self.baseline = baseline
+        self._totals: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(
+            lambda: {"runs": 0, "requests": 0, "bytes": 0, "blocked_requests": 0}
+        )
+        self._saved: Dict[str, Dict[str, float]] = defaultdict(lambda: {"requests": 0, "bytes": 0})
+        self._lock = threading.Lock()
+
+    def record(self, profile: str, url: str, traffic: Dict[str, int]) -> Dict[str, Any]:
+        """Add one run's traffic and return its savings against the baseline."""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            totals = self._totals[(profile, host)]
+            totals["runs"] += 1
+            for key in ("requests", "bytes", "blocked_requests"):
+                totals[key] += traffic[key]
+            baseline = self._totals.get((self.baseline, host))
+            if profile == self.baseline or not baseline or not baseline["runs"]:
+                return {"requests": None, "bytes": None}
+            saved = {
+                "requests": round(baseline["requests"] / baseline["runs"] - traffic["requests"], 1),
+                "bytes": round(baseline["bytes"] / baseline["runs"] - traffic["bytes"]),
+            }
+            self._saved[profile]["requests"] += saved["requests"]
+            self._saved[profile]["bytes"] += saved["bytes"]
+            return saved
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            stats: Dict[str, Dict[str, Any]] = {}
+            for (profile, host), totals in self._totals.items():
+                entry = stats.setdefault(profile, {
+                    "runs": 0, "requests": 0, "bytes": 0, "blocked_requests": 0, "hosts": {}
+                })
+                for key in ("runs", "requests", "bytes", "blocked_requests"):
+                    entry[key] += totals[key]
+                entry["hosts"][host] = dict(totals)
+            for profile, saved in self._saved.items():
+                stats[profile]["saved_requests"] = round(saved["requests"], 1)
+                stats[profile]["saved_bytes"] = saved["bytes"]
+        return stats
+
+
+_ledger = ProfileLedger()
+
+
+def get_profile_ledger() -> ProfileLedger:
+    return _ledger
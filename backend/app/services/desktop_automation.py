@@ -1,49 +1,33 @@
-import os
 import time
-import subprocess
-import pyautogui
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from app.config import settings
+from app.services.app_registry import APPS, get_app_registry
+from app.services.input_backend import get_input_backend
+from app.services.jobs import report_progress
+from app.services.metrics import instrument, sleep
+from app.services.tracing import span
 
-# Set a small delay between PyAutoGUI actions
-pyautogui.PAUSE = 0.5
-pyautogui.FAILSAFE = True
+MACRO_ACTIONS = ('open', 'focus', 'type', 'press', 'hotkey', 'wait_for_window')
 
+TYPING_STRATEGIES = ('auto', 'paste', 'batched', 'per_key')
+
+@instrument("open_application")
 def open_application(app_name: str) -> Dict[str, Any]:
     """
-    Open a desktop application.
+    Open a desktop application, or focus it if it is already running.
     
     Args:
-        app_name: Name of the application to open (e.g., 'notepad', 'wordpad', 'calc')
+        app_name: Name of the application to open (e.g., 'notepad', 'wordpad', 'calculator')
         
     Returns:
         Dict containing the result of the operation
     """
     try:
-        app_paths = {
-            'notepad': 'notepad.exe',
-            'wordpad': 'wordpad.exe',
-            'calculator': 'calc.exe',
-            'paint': 'mspaint.exe',
-            'chrome': 'chrome.exe',
-            'firefox': 'firefox.exe',
-            'edge': 'msedge.exe'
-        }
-        
-        app = app_paths.get(app_name.lower())
-        if not app:
-            return {"status": "error", "message": f"Application '{app_name}' is not supported"}
-        
-        # Close the application if it's already running
-        close_application(app_name)
-        
-        # Open the application
-        os.startfile(app)
-        time.sleep(2)  # Wait for the application to open
-        
-        return {"status": "success", "message": f"Successfully opened {app_name}"}
+        return get_app_registry().open(app_name)
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@instrument("close_application")
 def close_application(app_name: str) -> Dict[str, Any]:
     """
     Close a running application.
@@ -55,41 +39,90 @@ def close_application(app_name: str) -> Dict[str, Any]:
         Dict containing the result of the operation
     """
     try:
-        app_names = {
-            'notepad': 'notepad.exe',
-            'wordpad': 'wordpad.exe',
-            'calculator': 'calculator.exe',
-            'paint': 'mspaint.exe',
-            'chrome': 'chrome.exe',
-            'firefox': 'firefox.exe',
-            'edge': 'msedge.exe'
-        }
-        
-        process_name = app_names.get(app_name.lower())
-        if not process_name:
-            return {"status": "error", "message": f"Application '{app_name}' is not supported"}
-        
-        # Kill the process
-        subprocess.call(f'taskkill /f /im {process_name}', shell=True)
-        time.sleep(1)  # Wait for the process to close
-        
-        return {"status": "success", "message": f"Successfully closed {app_name}"}
+        return get_app_registry().close(app_name)
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-def type_text(text: str) -> Dict[str, Any]:
+def choose_typing_strategy(text: str, app_name: Optional[str] = None) -> str:
+    """
+    Pick how to enter ``text``: per-key for apps listed in
+    ``TYPING_PER_KEY_APPS``, clipboard paste for long or non-ASCII text
+    (PyAutoGUI cannot type characters outside the keyboard layout), and
+    batched keystrokes otherwise.
+    """
+    if app_name and app_name.lower() in settings.TYPING_PER_KEY_APPS:
+        return 'per_key'
+    if len(text) >= settings.TYPING_PASTE_MIN_CHARS or not text.isascii():
+        return 'paste'
+    return 'batched'
+
+def _paste_text(text: str) -> None:
+    backend = get_input_backend()
+    try:
+        previous = backend.get_clipboard()
+    except Exception:
+        previous = None
+    backend.set_clipboard(text)
+    backend.paste()
+    if previous is not None:
+        # Give the target app time to read the clipboard before restoring it
+        sleep(0.1, "clipboard_restore")
+        backend.set_clipboard(previous)
+
+@instrument("type_text")
+def type_text(
+    text: str,
+    strategy: str = 'auto',
+    pause: Optional[float] = None,
+    app_name: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Type text at the current cursor position.
     
     Args:
         text: Text to type
+        strategy: 'paste' (clipboard), 'batched' (keystrokes with no
+            interval), 'per_key' (``TYPING_PER_KEY_INTERVAL`` between keys)
+            or 'auto' to choose from the text and app
+        pause: Seconds to pause after each input call for this request
+        app_name: Target application, used by 'auto'
         
     Returns:
         Dict containing the result of the operation
     """
     try:
-        pyautogui.write(text, interval=0.1)
-        return {"status": "success", "message": f"Successfully typed {len(text)} characters"}
+        if strategy not in TYPING_STRATEGIES:
+            return {"status": "error", "message": f"Unsupported typing strategy: {strategy}"}
+        if strategy == 'auto':
+            strategy = choose_typing_strategy(text, app_name)
+
+        started = time.perf_counter()
+        backend = get_input_backend()
+        fallback = None
+        with backend.pausing(pause):
+            if strategy == 'paste':
+                try:
+                    _paste_text(text)
+                except Exception as e:
+                    if not text.isascii():
+                        raise
+                    # No clipboard access (e.g. no xclip on Linux): type it instead
+                    fallback = f"paste failed: {e}"
+                    strategy = 'batched'
+                    backend.write(text, interval=0.0)
+            elif strategy == 'batched':
+                backend.write(text, interval=0.0)
+            else:
+                backend.write(text, interval=settings.TYPING_PER_KEY_INTERVAL)
+        result = {
+            "status": "success",
+            "message": f"Successfully typed {len(text)} characters",
+            "strategy": strategy,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+        if fallback:
+            result["fallback"] = fallback
+        return result
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -104,18 +137,23 @@ def press_key(key: str) -> Dict[str, Any]:
         Dict containing the result of the operation
     """
     try:
-        pyautogui.press(key)
+        get_input_backend().press(key)
         return {"status": "success", "message": f"Successfully pressed {key} key"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@instrument("automate_desktop")
 def automate_desktop(
     app_name: str,
     action: str,
-    text: Optional[str] = None
+    text: Optional[str] = None,
+    typing_strategy: str = 'auto',
+    pause: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Main function to handle desktop automation.
+
+    ``typing_strategy`` and ``pause`` apply to the 'type' action, see ``type_text``.
     """
     try:
         result = {}
@@ -123,6 +161,8 @@ def automate_desktop(
         if not app_name:
             return {"status": "error", "message": "Application name is required"}
 
+        report_progress(f"Running '{action}' on {app_name}")
+
         if action == 'open':
             result = open_application(app_name)
         elif action == 'close':
@@ -133,12 +173,13 @@ def automate_desktop(
             open_result = open_application(app_name)
             if open_result.get("status") == "error":
                 return open_result
-            time.sleep(1)
-            result = type_text(text)
+            report_progress(f"Typing {len(text)} characters")
+            result = type_text(text, strategy=typing_strategy, pause=pause, app_name=app_name)
         elif action == 'press':
             if not text:
                 return {"status": "error", "message": "Key is required for 'press' action"}
-            result = press_key(text)
+            with get_input_backend().pausing(pause):
+                result = press_key(text)
         else:
             return {"status": "error", "message": f"Unsupported action: {action}"}
 
@@ -146,3 +187,103 @@ def automate_desktop(
     except Exception as e:
         return {"status": "error", "message": f"Unexpected backend error: {str(e)}"}
 
+
+def _validate_macro_step(index: int, step: Dict[str, Any]) -> Optional[str]:
+    action = step.get("action")
+    if action not in MACRO_ACTIONS:
+        return f"Step {index}: unsupported action '{action}'"
+    if action == 'type' and not step.get("text"):
+        return f"Step {index}: text is required for 'type'"
+    if action == 'type' and step.get("strategy", 'auto') not in TYPING_STRATEGIES:
+        return f"Step {index}: unsupported typing strategy '{step['strategy']}'"
+    if action == 'press' and not step.get("key"):
+        return f"Step {index}: key is required for 'press'"
+    if action == 'hotkey' and not step.get("keys"):
+        return f"Step {index}: keys are required for 'hotkey'"
+    return None
+
+def _run_macro_step(app_name: str, step: Dict[str, Any], session: Dict[str, Any]) -> Dict[str, Any]:
+    action = step["action"]
+    backend = get_input_backend()
+    spec = APPS.get(app_name.lower())
+    title = step.get("title") or (spec.window_title if spec else app_name)
+
+    if action == 'open':
+        if session["opened"]:
+            return {"status": "success", "message": f"{app_name} is already open"}
+        result = open_application(app_name)
+        session["opened"] = result.get("status") == "success"
+        return result
+    if action == 'focus':
+        if backend.focus_window(title):
+            return {"status": "success", "message": f"Focused '{title}'"}
+        return {"status": "error", "message": f"No window matching '{title}'"}
+    if action == 'wait_for_window':
+        timeout = step.get("timeout") or settings.DESKTOP_WINDOW_TIMEOUT
+        if backend.wait_for_window(title, timeout, settings.DESKTOP_WINDOW_POLL_INTERVAL):
+            return {"status": "success", "message": f"Window '{title}' is open"}
+        return {"status": "error", "message": f"Timed out after {timeout}s waiting for '{title}'"}
+    if action == 'type':
+        return type_text(step["text"], strategy=step.get("strategy", 'auto'), app_name=app_name)
+    if action == 'press':
+        return press_key(step["key"])
+    backend.hotkey(*step["keys"])
+    return {"status": "success", "message": f"Pressed {'+'.join(step['keys'])}"}
+
+@instrument("run_macro")
+def run_macro(app_name: str, steps: List[Dict[str, Any]], pause: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Run an ordered list of desktop steps against one application session.
+
+    Each step is a dict with an ``action`` (open, focus, type, press, hotkey,
+    wait_for_window) and its arguments (``text``, ``strategy``, ``key``,
+    ``keys``, ``title``, ``timeout``). The application is opened at most
+    once, so later steps work on the same window. Execution stops at the
+    first failing step. ``pause`` overrides the pause after each input call.
+
+    Returns:
+        Dict with the overall status and per-step results and timings
+    """
+    if not app_name:
+        return {"status": "error", "message": "Application name is required"}
+    if not steps:
+        return {"status": "error", "message": "At least one step is required"}
+    for index, step in enumerate(steps):
+        error = _validate_macro_step(index, step)
+        if error:
+            return {"status": "error", "message": error}
+
+    session = {"opened": False}
+    results = []
+    started = time.perf_counter()
+    for index, step in enumerate(steps):
+        report_progress(f"Step {index + 1}/{len(steps)}: {step['action']}", step=index)
+        step_started = time.perf_counter()
+        with span("macro_step", index=index, action=step["action"]):
+            try:
+                with get_input_backend().pausing(pause):
+                    result = _run_macro_step(app_name, step, session)
+            except Exception as e:
+                result = {"status": "error", "message": str(e)}
+        results.append({
+            "index": index,
+            "action": step["action"],
+            "status": result.get("status"),
+            "message": result.get("message"),
+            "elapsed_ms": round((time.perf_counter() - step_started) * 1000, 3)
+        })
+        if result.get("status") == "error":
+            return {
+                "status": "error",
+                "message": f"Step {index} ({step['action']}) failed: {result.get('message')}",
+                "failed_step": index,
+                "steps": results,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+            }
+
+    return {
+        "status": "success",
+        "message": f"Ran {len(steps)} steps on {app_name}",
+        "steps": results,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+    }
@@ -1,118 +1,445 @@
+import multiprocessing
 import os
+import threading
+import time
 import pytesseract
-import cv2
 import numpy as np
-from typing import Dict, Any
-import tempfile
-from PIL import Image
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, Iterator, List, Optional, Union
 import fitz  # PyMuPDF for PDF handling
 from app.config import settings
+from app.services.jobs import report_progress
+from app.services.metrics import instrument, observe_bytes, timed
+from app.services.ocr_engine import configure_worker_process, engine_version, get_ocr_pool, worker_thread_budget
+from app.services.preprocessing import Pipeline
+from app.services.tiling import ocr_tiled, should_tile
+from app.services.result_cache import cache_key_for_hash, content_hash, get_result_cache
+from app.services.result_store import get_result_store
+from app.services.uploads import DocumentBuffer, DocumentSource
 
 # Uncomment and update this if needed to specify Tesseract path
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
-def preprocess_image(image_data: bytes) -> np.ndarray:
+SUPPORTED_TYPES = {
+    'application/pdf': 'pdf',
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/jpg': 'jpg'
+}
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the process pool used for page-parallel extraction."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            workers = settings.PDF_PROCESS_WORKERS or os.cpu_count() or 1
+            _process_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                # Fresh interpreters: a forked worker would inherit this process's
+                # OCR engines and its OpenMP thread limit
+                mp_context=multiprocessing.get_context("spawn"),
+                # One engine per worker, with the OCR threads split between workers
+                initializer=configure_worker_process,
+                initargs=(1, worker_thread_budget(workers))
+            )
+        return _process_pool
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+def _as_bytes_like(source: DocumentSource) -> Union[bytes, memoryview]:
+    """Return a zero-copy bytes-like view of a document source."""
+    if isinstance(source, DocumentBuffer):
+        return source.view()
+    return source
+
+def _source_size(source: DocumentSource) -> int:
+    if isinstance(source, DocumentBuffer):
+        return source.size
+    return len(source)
+
+def open_pdf(source: DocumentSource) -> fitz.Document:
+    """
+    Open a PDF without writing another copy of it.
+
+    Spooled uploads are opened from their temp file and in-memory ones from
+    the buffer itself.
+    """
+    if isinstance(source, DocumentBuffer):
+        if source.spooled:
+            source.flush()
+            return fitz.open(source.path, filetype="pdf")
+        # In-memory uploads are below the spool threshold, so this copy is small
+        source = source.getvalue()
+    return fitz.open(stream=source, filetype="pdf")
+
+def preprocess_image(image_data: DocumentSource, preset: Optional[str] = None) -> np.ndarray:
     """
     Preprocess the image for better OCR results.
     """
     try:
-        nparr = np.frombuffer(image_data, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
-        kernel = np.ones((1, 1), np.uint8)
-        gray = cv2.dilate(gray, kernel, iterations=1)
-        gray = cv2.erode(gray, kernel, iterations=1)
-        return gray
+        with timed("preprocess"):
+            processed_img, _ = Pipeline.preset(preset).run(_as_bytes_like(image_data))
+        return processed_img
     except Exception as e:
         raise Exception(f"Error preprocessing image: {str(e)}")
 
-def extract_text_from_image(image_data: bytes) -> str:
+def ocr_image(processed_img: np.ndarray) -> str:
     """
-    Extract text from an image using Tesseract OCR.
+    Run an already preprocessed image through the pooled OCR engines.
+
+    Images of ``OCR_TILE_MIN_PIXELS`` or more are split into tiles that are
+    recognised in parallel.
+    """
+    pool = get_ocr_pool()
+    with timed("ocr"):
+        if should_tile(processed_img):
+            return ocr_tiled(processed_img, pool.recognize).strip()
+        return pool.recognize(processed_img).strip()
+
+@instrument("extract_image")
+def extract_image(image_data: DocumentSource, preset: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract text from an image, returning the text and per-stage preprocessing timings.
     """
     try:
-        processed_img = preprocess_image(image_data)
-        text = pytesseract.image_to_string(processed_img)
-        return text.strip()
+        pipeline = Pipeline.preset(preset)
+        with timed("preprocess"):
+            processed_img, timings = pipeline.run(_as_bytes_like(image_data))
+        return {
+            "text": ocr_image(processed_img),
+            "preprocessing": {"preset": pipeline.name, "stages": timings}
+        }
     except Exception as e:
         raise Exception(f"Error extracting text from image: {str(e)}")
 
-def extract_text_from_pdf(pdf_data: bytes) -> str:
+def extract_text_from_image(image_data: DocumentSource, preset: Optional[str] = None) -> str:
     """
-    Extract text from PDF using PyMuPDF.
+    Extract text from an image using Tesseract OCR.
     """
-    tmp_pdf_path = None
+    return extract_image(image_data, preset)["text"]
+
+def _open_worker_pdf(source: Union[str, bytes]) -> fitz.Document:
+    if isinstance(source, str):
+        return fitz.open(source, filetype="pdf")
+    return fitz.open(stream=source, filetype="pdf")
+
+def _worker_source(pdf_data: DocumentSource) -> Union[str, bytes]:
+    """A picklable handle workers can open the document from."""
+    if isinstance(pdf_data, DocumentBuffer):
+        if not pdf_data.spooled:
+            return pdf_data.getvalue()
+        pdf_data.flush()
+        return pdf_data.path
+    return bytes(pdf_data)
+
+def needs_ocr(page: fitz.Page, text: str) -> bool:
+    """A page without a usable text layer that carries images is treated as a scan."""
+    if not settings.PDF_OCR_ENABLED:
+        return False
+    return len(text.strip()) < settings.PDF_OCR_MIN_TEXT_CHARS and bool(page.get_images(full=False))
+
+def ocr_pdf_page(page: fitz.Page, preset: Optional[str] = None) -> str:
+    """Render a page at ``PDF_OCR_DPI`` and OCR it through the image preprocessing path."""
+    with timed("pdf_render"):
+        pix = page.get_pixmap(dpi=settings.PDF_OCR_DPI, colorspace=fitz.csGRAY, alpha=False)
+    gray = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+    with timed("preprocess"):
+        processed_img, _ = Pipeline.preset(preset).run(gray, dpi=settings.PDF_OCR_DPI)
+    return ocr_image(processed_img)
+
+def _extract_page(
+    doc: fitz.Document,
+    index: int,
+    allow_ocr: bool = True,
+    preset: Optional[str] = None
+) -> Dict[str, Any]:
+    started = time.perf_counter()
+    with timed("pdf_parse"):
+        page = doc[index]
+        text = page.get_text()
+    method = "text"
+    if needs_ocr(page, text):
+        method = "ocr"
+        if allow_ocr:
+            text = ocr_pdf_page(page, preset)
+    return {
+        "page": index,
+        "text": text,
+        "method": method,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+    }
+
+def _extract_pages(
+    source: Union[str, bytes],
+    pages: List[int],
+    preset: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Extract the given pages; runs in a worker process.
+
+    ``source`` is a file path or the raw PDF bytes, so each worker opens its
+    own document handle.
+    """
+    with _open_worker_pdf(source) as doc:
+        return [_extract_page(doc, index, preset=preset) for index in pages]
+
+def iter_pdf_pages(
+    pdf_data: DocumentSource,
+    parallel: bool = True,
+    preset: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one record per page (``page``, ``text``, ``method``, ``elapsed_ms``).
+
+    Pages with a usable text layer use ``get_text()``; pages that look like
+    scans are rendered and OCR'd (``method`` is ``"ocr"``). Documents with at
+    least ``PDF_PARALLEL_MIN_PAGES`` pages are split into ranges of
+    ``PDF_PAGES_PER_TASK`` pages on the process pool. Smaller documents are
+    read in-process, and their scanned pages only go to the pool when there
+    are at least ``PDF_PARALLEL_MIN_SCANNED_PAGES`` of them. Records are
+    yielded in completion order, not page order.
+    """
+    futures = []
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_pdf:
-            tmp_pdf.write(pdf_data)
-            tmp_pdf_path = tmp_pdf.name
-        
-        text = ""
-        with fitz.open(tmp_pdf_path) as doc:
-            for page in doc:
-                text += page.get_text()
-        
-        return text.strip()
-    except Exception as e:
-        raise Exception(f"Error extracting text from PDF: {str(e)}")
+        with open_pdf(pdf_data) as doc:
+            page_count = doc.page_count
+            if not parallel or page_count < settings.PDF_PARALLEL_MIN_PAGES:
+                scanned = []
+                for index in range(page_count):
+                    record = _extract_page(doc, index, allow_ocr=not parallel, preset=preset)
+                    if parallel and record["method"] == "ocr":
+                        scanned.append(index)
+                    else:
+                        yield record
+                if not scanned:
+                    return
+                if len(scanned) < settings.PDF_PARALLEL_MIN_SCANNED_PAGES:
+                    # Starting the worker processes would cost more than OCR'ing these here
+                    for index in scanned:
+                        yield _extract_page(doc, index, allow_ocr=True, preset=preset)
+                    return
+                pool = get_process_pool()
+                worker_source = _worker_source(pdf_data)
+                futures = [pool.submit(_extract_pages, worker_source, [index], preset) for index in scanned]
+
+        if not futures:
+            pool = get_process_pool()
+            worker_source = _worker_source(pdf_data)
+            step = max(1, settings.PDF_PAGES_PER_TASK)
+            futures = [
+                pool.submit(_extract_pages, worker_source, list(range(start, min(start + step, page_count))), preset)
+                for start in range(0, page_count, step)
+            ]
+        for future in as_completed(futures):
+            yield from future.result()
     finally:
-        if tmp_pdf_path and os.path.exists(tmp_pdf_path):
-            os.remove(tmp_pdf_path)
+        for future in futures:
+            future.cancel()
 
-def process_document(file_data: bytes, file_extension: str) -> Dict[str, Any]:
+def join_page_texts(texts: List[str]) -> str:
     """
-    Process a document and extract text depending on file type.
+    Join page texts in page order, ending each page with a newline.
+
+    Text-layer pages already end in one; OCR'd pages are stripped, and would
+    otherwise run into the first word of the next page.
+    """
+    return "".join(text if text.endswith("\n") else text + "\n" for text in texts).strip()
+
+@instrument("extract_pdf")
+def extract_pdf(pdf_data: DocumentSource, preset: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract text from PDF using PyMuPDF, OCR'ing pages that have no text layer.
+
+    Returns the joined text and the method used for each page.
     """
     try:
-        if file_extension.lower() == 'pdf':
-            text = extract_text_from_pdf(file_data)
-        else:
-            text = extract_text_from_image(file_data)
-        
+        pages = sorted(iter_pdf_pages(pdf_data, preset=preset), key=lambda record: record["page"])
+        return {
+            "text": join_page_texts([record["text"] for record in pages]),
+            "page_texts": [record["text"] for record in pages],
+            "pages": [
+                {"page": record["page"], "method": record["method"], "characters": len(record["text"])}
+                for record in pages
+            ]
+        }
+    except Exception as e:
+        raise Exception(f"Error extracting text from PDF: {str(e)}")
+
+def extract_text_from_pdf(pdf_data: DocumentSource, preset: Optional[str] = None) -> str:
+    """
+    Extract text from PDF using PyMuPDF.
+    """
+    return extract_pdf(pdf_data, preset)["text"]
+
+def extraction_params(file_extension: str, preset: Optional[str] = None) -> Dict[str, Any]:
+    """Parameters that change the extraction output, used in cache keys."""
+    ocr = {
+        "preprocess": Pipeline.preset(preset).describe(),
+        "ocr_language": settings.OCR_LANGUAGE,
+        "engine": engine_version(),
+        "tiling": [settings.OCR_TILE_MIN_PIXELS, settings.OCR_TILE_HEIGHT, settings.OCR_TILE_OVERLAP],
+    }
+    if file_extension == 'pdf':
+        params = {"type": "pdf", "engine": f"pymupdf-{fitz.VersionBind}"}
+        if settings.PDF_OCR_ENABLED:
+            params["ocr"] = {
+                **ocr,
+                "dpi": settings.PDF_OCR_DPI,
+                "min_text_chars": settings.PDF_OCR_MIN_TEXT_CHARS,
+            }
+        return params
+    return {"type": "image", **ocr}
+
+def _extract(file_data: DocumentSource, file_extension: str, preset: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract without the cache. PDF results also carry the text of each page
+    in ``page_texts``, cached along with them for the result store but not
+    returned to callers.
+    """
+    if file_extension == 'pdf':
+        extracted = extract_pdf(file_data, preset)
         return {
             "status": "success",
-            "extracted_text": text,
-            "characters_extracted": len(text)
+            "extracted_text": extracted["text"],
+            "characters_extracted": len(extracted["text"]),
+            "pages": extracted["pages"],
+            "page_texts": extracted["page_texts"]
         }
+
+    extracted = extract_image(file_data, preset)
+    return {
+        "status": "success",
+        "extracted_text": extracted["text"],
+        "characters_extracted": len(extracted["text"]),
+        "preprocessing": extracted["preprocessing"]
+    }
+
+def process_document(
+    file_data: DocumentSource,
+    file_extension: str,
+    preset: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Process a document and extract text depending on file type.
+
+    Results are cached by content hash and extraction parameters, so a
+    document that was already processed is not extracted again. Successful
+    results are queued for the searchable result store together with
+    ``metadata`` (e.g. ``filename``).
+    """
+    try:
+        report_progress("Extracting text", file_type=file_extension)
+        file_extension = file_extension.lower()
+        size = _source_size(file_data)
+        observe_bytes(file_extension, size)
+        store = get_result_store()
+        if not settings.RESULT_CACHE_ENABLED and store is None:
+            result = _extract(file_data, file_extension, preset)
+            result.pop("page_texts", None)
+            return result
+
+        document_hash = content_hash(_as_bytes_like(file_data))
+        key = cache_key_for_hash(document_hash, extraction_params(file_extension, preset))
+        if settings.RESULT_CACHE_ENABLED:
+            result, hit = get_result_cache().get_or_compute(
+                key, lambda: _extract(file_data, file_extension, preset)
+            )
+            result = {**result, "cache_key": key, "cache_hit": hit}
+        else:
+            result = _extract(file_data, file_extension, preset)
+        # Taken from the (cached) result, so cache hits and merged requests
+        # store the same pages as the call that extracted them
+        page_texts = result.pop("page_texts", None)
+
+        if store is not None and result.get("status") == "success":
+            store.submit(key, document_hash, result, page_texts, {
+                **(metadata or {}),
+                "file_type": file_extension,
+                "size": size,
+                "preset": preset,
+            })
+        return result
     except Exception as e:
         return {
             "status": "error",
             "message": str(e)
         }
 
-def extract_text_from_document(file_data: bytes, content_type: str) -> Dict[str, Any]:
+def get_file_extension(content_type: str) -> Optional[str]:
+    return SUPPORTED_TYPES.get(content_type.lower())
+
+def extract_text_from_document(
+    file_data: DocumentSource,
+    content_type: str,
+    preset: Optional[str] = None,
+    filename: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Main entry function to extract text from supported documents/images.
     """
-    supported_types = {
-        'application/pdf': 'pdf',
-        'image/jpeg': 'jpg',
-        'image/png': 'png',
-        'image/jpg': 'jpg'
-    }
-    if content_type.lower() not in supported_types:
+    file_extension = get_file_extension(content_type)
+    if file_extension is None:
         return {
             "status": "error",
             "message": f"Unsupported file type: {content_type}"
         }
-    file_extension = supported_types[content_type.lower()]
-    return process_document(file_data, file_extension)
-
+    return process_document(
+        file_data, file_extension, preset, metadata={"filename": filename, "content_type": content_type}
+    )
 
-import tempfile
-import subprocess
-import os
+def stream_text_from_document(
+    file_data: DocumentSource,
+    content_type: str,
+    parallel: bool = True,
+    preset: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield per-page records as they are extracted, followed by a summary record.
 
-def open_text_in_notepad(text: str):
-    # Create a temp file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".txt", mode="w", encoding="utf-8") as tmp_file:
-        tmp_file.write(text)
-        tmp_path = tmp_file.name
-    
-    # Open Notepad with the temp file
-    subprocess.Popen(['notepad.exe', tmp_path])
+    Images are treated as a single page. Errors end the stream with a record
+    whose ``status`` is ``error``.
+    """
+    started = time.perf_counter()
+    pages = 0
+    characters = 0
+    try:
+        file_extension = get_file_extension(content_type)
+        if file_extension is None:
+            raise ValueError(f"Unsupported file type: {content_type}")
+        observe_bytes(file_extension, _source_size(file_data))
 
-    return tmp_path
+        if file_extension == 'pdf':
+            records = iter_pdf_pages(file_data, parallel=parallel, preset=preset)
+        else:
+            ocr_started = time.perf_counter()
+            text = extract_text_from_image(file_data, preset)
+            records = iter([{
+                "page": 0,
+                "text": text,
+                "elapsed_ms": round((time.perf_counter() - ocr_started) * 1000, 3)
+            }])
 
+        for record in records:
+            pages += 1
+            characters += len(record["text"])
+            report_progress(f"Extracted page {record['page'] + 1}", page=record["page"])
+            yield record
+    except Exception as e:
+        yield {"status": "error", "message": str(e), "pages": pages}
+        return
 
+    yield {
+        "status": "success",
+        "pages": pages,
+        "characters_extracted": characters,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+    }
@@ -0,0 +1,230 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+
+class PooledDriver:
+    """A WebDriver session owned by the pool, plus its bookkeeping."""
+
+    def __init__(self, driver: Any):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+
+
+class DriverPool:
+    """
+    Bounded pool of reusable WebDriver sessions.
+
+    Sessions are created through ``factory`` so tests can pass a fake that
+    mimics the handful of WebDriver methods used here (``get``,
+    ``delete_all_cookies``, ``execute_script``, ``current_url``, ``quit``).
+
+    Args:
+        factory: Callable returning a new driver session
+        size: Maximum number of live sessions
+        max_uses: Recycle a session after this many leases (0 disables)
+        idle_timeout: Recycle a session idle for this many seconds (0 disables)
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int = 2,
+        max_uses: int = 50,
+        idle_timeout: float = 300.0
+    ):
+        if size < 1:
+            raise ValueError("Driver pool size must be at least 1")
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+
+        self._idle: List[PooledDriver] = []
+        self._live = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "created": 0,
+            "leases": 0,
+            "reused": 0,
+            "recycled": 0,
+            "failed_health_checks": 0,
+            "wait_time_total": 0.0,
+        }
+
+    def prewarm(self, count: Optional[int] = None) -> int:
+        """Start up to ``count`` sessions ahead of time and park them as idle."""
+        count = self.size if count is None else min(count, self.size)
+        started = 0
+        while True:
+            with self._cond:
+                if self._closed or self._live >= count:
+                    break
+                self._live += 1
+            try:
+                pooled = self._create()
+            except Exception:
+                with self._cond:
+                    self._live -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+            started += 1
+        return started
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledDriver:
+        """Lease a healthy session, creating one if the pool has room."""
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        while True:
+            pooled = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._live < self.size:
+                        self._live += 1
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a free browser session")
+                    self._cond.wait(remaining)
+
+            if pooled is None:
+                try:
+                    pooled = self._create()
+                except Exception:
+                    self._release_slot()
+                    raise
+            elif self._expired(pooled) or not self._healthy(pooled):
+                self._discard(pooled)
+                continue
+            else:
+                with self._cond:
+                    self._stats["reused"] += 1
+
+            pooled.uses += 1
+            pooled.last_used = time.monotonic()
+            with self._cond:
+                self._stats["leases"] += 1
+                self._stats["wait_time_total"] += pooled.last_used - start
+            return pooled
+
+    def release(self, pooled: PooledDriver, broken: bool = False) -> None:
+        """Return a leased session, resetting it for the next caller."""
+        if broken or self._closed or (self.max_uses and pooled.uses >= self.max_uses):
+            self._discard(pooled)
+            return
+        if not self._reset(pooled):
+            self._discard(pooled)
+            return
+        pooled.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """Context manager yielding a driver; broken sessions are not reused."""
+        pooled = self.acquire(timeout=timeout)
+        broken = False
+        try:
+            yield pooled.driver
+        except Exception:
+            broken = not self._healthy(pooled)
+            raise
+        finally:
+            self.release(pooled, broken=broken)
+
+    def reap_idle(self) -> int:
+        """Recycle idle sessions that exceeded the idle timeout."""
+        with self._cond:
+            expired = [p for p in self._idle if self._expired(p)]
+            self._idle = [p for p in self._idle if p not in expired]
+        for pooled in expired:
+            self._discard(pooled)
+        return len(expired)
+
+    def close(self) -> None:
+        """Quit every idle session and refuse further leases."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self.size,
+                "live": self._live,
+                "idle": len(self._idle),
+                "in_use": self._live - len(self._idle),
+                "closed": self._closed,
+            })
+        wait_time_total = stats.pop("wait_time_total")
+        stats["avg_wait_time"] = wait_time_total / stats["leases"] if stats["leases"] else 0.0
+        return stats
+
+    def _create(self) -> PooledDriver:
+        pooled = PooledDriver(self.factory())
+        with self._cond:
+            self._stats["created"] += 1
+        return pooled
+
+    def _expired(self, pooled: PooledDriver) -> bool:
+        if self.max_uses and pooled.uses >= self.max_uses:
+            return True
+        if self.idle_timeout and time.monotonic() - pooled.last_used > self.idle_timeout:
+            return True
+        return False
+
+    def _healthy(self, pooled: PooledDriver) -> bool:
+        try:
+            pooled.driver.current_url
+            return True
+        except Exception:
+            with self._cond:
+                self._stats["failed_health_checks"] += 1
+            return False
+
+    def _reset(self, pooled: PooledDriver) -> bool:
+        """Clear cookies and web storage and park the session on about:blank."""
+        try:
+            pooled.driver.delete_all_cookies()
+            try:
+                pooled.driver.execute_script(
+                    "window.localStorage.clear(); window.sessionStorage.clear();"
+                )
+            except Exception:
+                # Storage is not accessible on some pages (e.g. data: or about: URLs)
+                pass
+            pooled.driver.get("about:blank")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, pooled: PooledDriver) -> None:
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats["recycled"] += 1
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        with self._cond:
+            self._live -= 1
+            self._cond.notify()
@@ -0,0 +1,442 @@
+import glob
+import logging
+import os
+import queue
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import requests
+from app.config import settings
+from app.services.metrics import EXPORT_BATCH_DURATION, EXPORTS
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class SinkUnavailable(ValueError):
+    """The requested sink does not exist or is not configured."""
+
+
+def export_record(result: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """What a sink receives for one successful extraction."""
+    return {
+        **(metadata or {}),
+        "cache_key": result.get("cache_key"),
+        "characters": result.get("characters_extracted", 0),
+        "text": result.get("extracted_text", ""),
+        "exported_at": time.time(),
+    }
+
+
+def _file_stem(record: Dict[str, Any]) -> str:
+    name = os.path.splitext(os.path.basename(record.get("filename") or ""))[0]
+    stem = _UNSAFE_FILENAME.sub("_", name).strip("._")[:64] or "document"
+    key = (record.get("cache_key") or "")[:12]
+    return f"{stem}-{key}" if key else stem
+
+
+def _write_atomic(path: str, text: str) -> None:
+    """Write ``text`` to ``path`` so readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ExportSink:
+    """
+    A destination for extracted text. ``export`` gets a whole batch and
+    returns one outcome per record; raising fails the whole batch.
+    """
+
+    name = ""
+
+    def export(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class DirectorySink(ExportSink):
+    """
+    Writes each record to ``<directory>/<filename>-<cache key>.txt``.
+
+    Re-exporting the same document replaces its file, and once more than
+    ``max_files`` files exist the oldest are removed.
+    """
+
+    name = "directory"
+
+    def __init__(self, directory: str, max_files: int = 1000):
+        self.directory = directory
+        self.max_files = max_files
+        os.makedirs(directory, exist_ok=True)
+
+    def export(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        outcomes = []
+        for record in records:
+            path = os.path.join(self.directory, _file_stem(record) + ".txt")
+            _write_atomic(path, record["text"])
+            outcomes.append({"path": path})
+        self._prune()
+        return outcomes
+
+    def _prune(self) -> None:
+        if self.max_files <= 0:
+            return
+        files = glob.glob(os.path.join(self.directory, "*.txt"))
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0)
+        for path in files[:len(files) - self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def default_open_command() -> List[str]:
+    if sys.platform == "win32":
+        return ["notepad.exe"]
+    if sys.platform == "darwin":
+        return ["open"]
+    return ["xdg-open"]
+
+
+class DesktopOpenSink(ExportSink):
+    """
+    Opens exported text in a desktop viewer (Notepad on Windows).
+
+    A batch becomes one file and one viewer process rather than a window
+    per document. Each server process writes to its own subdirectory of
+    ``directory``. Files are deleted by a cleanup timer ``retention``
+    seconds after they were opened, and when the sink is closed. Files
+    older than ``retention`` are also deleted from subdirectories left
+    behind by earlier processes.
+    """
+
+    name = "desktop"
+
+    def __init__(self, directory: str, command: Optional[List[str]] = None, retention: float = 300.0):
+        self.root = directory
+        self.directory = os.path.join(directory, str(os.getpid()))
+        self.command = list(command or default_open_command())
+        self.retention = retention
+        self._opened: Deque[Tuple[float, str]] = deque()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        os.makedirs(self.directory, exist_ok=True)
+        self._remove_stale()
+        self._cleaner = threading.Thread(target=self._clean_loop, name="export-desktop-cleaner", daemon=True)
+        self._cleaner.start()
+
+    def export(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        self._expire()
+        if len(records) == 1:
+            text = records[0]["text"]
+        else:
+            text = "\n\n".join(
+                f"===== {record.get('filename') or 'document'} =====\n{record['text']}" for record in records
+            )
+        # Another process may have removed the directory while it was empty
+        os.makedirs(self.directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.directory, prefix=_file_stem(records[0]) + "-", suffix=".txt")
+        with self._lock:
+            self._opened.append((time.monotonic(), path))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        # The viewer outlives the batch; its file is cleaned up by _expire
+        subprocess.Popen(
+            self.command + [path], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        return [{"path": path}] * len(records)
+
+    def close(self) -> None:
+        self._closed.set()
+        self._cleaner.join()
+        with self._lock:
+            opened, self._opened = list(self._opened), deque()
+        for _, path in opened:
+            self._remove(path)
+        try:
+            os.rmdir(self.directory)
+        except OSError:
+            pass
+
+    def _clean_loop(self) -> None:
+        interval = max(1.0, min(60.0, self.retention / 2))
+        while not self._closed.wait(interval):
+            self._expire()
+
+    def _remove_stale(self) -> None:
+        """Delete expired files other processes (possibly crashed ones) left behind."""
+        cutoff = time.time() - self.retention
+        for path in glob.glob(os.path.join(self.root, "*", "*.txt")):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+        for directory in glob.glob(os.path.join(self.root, "*")):
+            if directory != self.directory:
+                try:
+                    os.rmdir(directory)  # only succeeds once it is empty
+                except OSError:
+                    pass
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.retention
+        expired = []
+        with self._lock:
+            while self._opened and self._opened[0][0] <= cutoff:
+                expired.append(self._opened.popleft()[1])
+        for path in expired:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class WebhookSink(ExportSink):
+    """POSTs each batch as ``{"exports": [...]}`` to ``url`` in one request."""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def export(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        response = self._session.post(self.url, json={"exports": records}, timeout=self.timeout)
+        response.raise_for_status()
+        return [{"status_code": response.status_code}] * len(records)
+
+    def close(self) -> None:
+        self._session.close()
+
+
+class ExportManager:
+    """
+    Delivers extraction results to sinks off the request path.
+
+    Exports go into one bounded queue served by ``workers`` threads. A
+    worker takes up to ``batch_size`` exports (or whatever arrived within
+    ``batch_window``) and hands each sink its share as one batch. When the
+    queue is full new exports are dropped and counted rather than blocking
+    the extraction that produced them.
+    """
+
+    def __init__(
+        self,
+        sinks: Dict[str, ExportSink],
+        workers: int = 2,
+        queue_size: int = 256,
+        batch_size: int = 16,
+        batch_window: float = 0.2
+    ):
+        self.sinks = dict(sinks)
+        self.batch_size = max(1, batch_size)
+        self.batch_window = batch_window
+        self._queue: "queue.Queue[Optional[Tuple[str, Dict[str, Any]]]]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {
+            name: {"queued": 0, "dropped": 0, "exported": 0, "failed": 0, "batches": 0, "last_batch_ms": 0.0}
+            for name in self.sinks
+        }
+        self._workers = [
+            threading.Thread(target=self._work_loop, name=f"export-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, sink: str, record: Dict[str, Any]) -> bool:
+        """
+        Queue ``record`` for ``sink`` without blocking. Returns False when
+        the queue is full and the export was dropped.
+        """
+        if sink not in self.sinks:
+            raise SinkUnavailable(f"Unknown export sink '{sink}'. Available: {', '.join(self.sinks) or 'none'}")
+        try:
+            self._queue.put_nowait((sink, record))
+        except queue.Full:
+            self._count(sink, "dropped")
+            logger.warning("Export queue is full, dropping export", extra={"sink": sink})
+            return False
+        self._count(sink, "queued")
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued export was delivered or failed. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self) -> None:
+        """Deliver what is queued, stop the workers and close the sinks."""
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        for sink in self.sinks.values():
+            try:
+                sink.close()
+            except Exception as e:
+                logger.error("Closing export sink %s failed: %s", sink.name, e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sinks = {name: dict(stats) for name, stats in self._stats.items()}
+        return {"queue_depth": self._queue.qsize(), "workers": len(self._workers), "sinks": sinks}
+
+    def _count(self, sink: str, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[sink][key] += amount
+        if settings.METRICS_ENABLED and key in ("dropped", "exported", "failed"):
+            EXPORTS.inc(amount, sink=sink, status=key)
+
+    def _work_loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            deadline = time.monotonic() + self.batch_window
+            while first is not None and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                if item is None:
+                    break
+            by_sink: Dict[str, List[Dict[str, Any]]] = {}
+            for item in batch:
+                if item is not None:
+                    by_sink.setdefault(item[0], []).append(item[1])
+            for name, records in by_sink.items():
+                self._deliver(name, records)
+            for _ in batch:
+                self._queue.task_done()
+            if batch[-1] is None:
+                return
+
+    def _deliver(self, name: str, records: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        try:
+            self.sinks[name].export(records)
+        except Exception as e:
+            self._count(name, "failed", len(records))
+            logger.error("Export to %s failed: %s", name, e, extra={"sink": name, "records": len(records)})
+            return
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats[name]["batches"] += 1
+            self._stats[name]["last_batch_ms"] = round(elapsed * 1000, 3)
+        self._count(name, "exported", len(records))
+        if settings.METRICS_ENABLED:
+            EXPORT_BATCH_DURATION.observe(elapsed, sink=name)
+
+
+def configured_sinks() -> Dict[str, ExportSink]:
+    """The sinks this server can export to; the webhook needs ``EXPORT_WEBHOOK_URL``."""
+    sinks: Dict[str, ExportSink] = {
+        "directory": DirectorySink(settings.EXPORT_DIR, max_files=settings.EXPORT_DIR_MAX_FILES),
+        "desktop": DesktopOpenSink(
+            os.path.join(tempfile.gettempdir(), "automation_dashboard", "open"),
+            command=settings.EXPORT_OPEN_COMMAND,
+            retention=settings.EXPORT_OPEN_RETENTION
+        ),
+    }
+    if settings.EXPORT_WEBHOOK_URL:
+        sinks["webhook"] = WebhookSink(settings.EXPORT_WEBHOOK_URL, timeout=settings.EXPORT_WEBHOOK_TIMEOUT)
+    return sinks
+
+
+def configured_sink_names() -> List[str]:
+    """Names of the sinks ``configured_sinks`` would build, without building them."""
+    names = ["directory", "desktop"]
+    if settings.EXPORT_WEBHOOK_URL:
+        names.append("webhook")
+    return names
+
+
+_export_manager: Optional[ExportManager] = None
+_export_manager_lock = threading.Lock()
+
+
+def get_export_manager() -> ExportManager:
+    global _export_manager
+    with _export_manager_lock:
+        if _export_manager is None:
+            _export_manager = ExportManager(
+                configured_sinks(),
+                workers=settings.EXPORT_WORKERS,
+                queue_size=settings.EXPORT_QUEUE_SIZE,
+                batch_size=settings.EXPORT_BATCH_SIZE,
+                batch_window=settings.EXPORT_BATCH_WINDOW
+            )
+        return _export_manager
+
+
+def resolve_sink(name: Optional[str]) -> Optional[str]:
+    """
+    The sink for a request: ``name`` if given ('none' disables export),
+    else ``EXPORT_DEFAULT_SINK``. Raises ``SinkUnavailable`` for a sink
+    that does not exist or is not configured.
+    """
+    name = settings.EXPORT_DEFAULT_SINK if name is None else name
+    if not name or name == "none":
+        return None
+    # Checked against the settings: the manager starts every sink, and a
+    # request that is rejected or exports nothing should not do that
+    available = configured_sink_names()
+    if name not in available:
+        available = ", ".join(available)
+        raise SinkUnavailable(f"Export sink '{name}' is not available. Available: {available}")
+    return name
+
+
+def export_result(sink: Optional[str], result: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Queue a successful ``result`` for ``sink`` and describe what happened, for the response."""
+    if sink is None or result.get("status") != "success":
+        return {"sink": None, "queued": False}
+    return {"sink": sink, "queued": get_export_manager().submit(sink, export_record(result, metadata))}
+
+
+def export_stats() -> Optional[Dict[str, Any]]:
+    with _export_manager_lock:
+        manager = _export_manager
+    return manager.stats() if manager is not None else None
+
+
+def shutdown_export_manager() -> None:
+    """Deliver queued exports and remove the files opened on the desktop."""
+    global _export_manager
+    with _export_manager_lock:
+        manager, _export_manager = _export_manager, None
+    if manager is not None:
+        manager.close()
@@ -0,0 +1,300 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urljoin, urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from app.config import settings
+from app.services.jobs import report_progress
+from app.services.metrics import instrument
+from app.services.tracing import span
+from app.services.web_extraction import extract_soup, iter_pages
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:  # optional; without it every run uses the browser
+    BeautifulSoup = None
+
+logger = logging.getLogger(__name__)
+
+# Same example selectors as the Selenium flow in web_automation
+LOGIN_FORM = "form:has(input[name=username]):has(input[name=password])"
+SEARCH_FORM = "form:has(input[name=q])"
+SEARCH_RESULT = ".search-result"
+
+_SKIPPED_INPUT_TYPES = {"submit", "button", "image", "reset", "file"}
+
+
+class NeedsBrowser(Exception):
+    """The page cannot be automated without running its JavaScript."""
+
+
+class HttpPage:
+    """A fetched HTML page with CSS selector access."""
+
+    def __init__(self, response: requests.Response):
+        self.url = response.url
+        self.status_code = response.status_code
+        content_type = response.headers.get("Content-Type", "")
+        if "html" not in content_type:
+            raise NeedsBrowser(f"{self.url} returned {content_type or 'no content type'}, not HTML")
+        self.soup = BeautifulSoup(response.text, "html.parser")
+
+    def select(self, selector: str) -> List[Any]:
+        return self.soup.select(selector)
+
+    def select_one(self, selector: str) -> Optional[Any]:
+        return self.soup.select_one(selector)
+
+
+def form_fields(form: Any) -> Dict[str, str]:
+    """Values a browser would submit for ``form`` as it stands, without a submit button."""
+    fields: Dict[str, str] = {}
+    for element in form.select("input[name], textarea[name], select[name]"):
+        name = element["name"]
+        if element.name == "input":
+            input_type = element.get("type", "text").lower()
+            if input_type in _SKIPPED_INPUT_TYPES:
+                continue
+            if input_type in ("checkbox", "radio") and not element.has_attr("checked"):
+                continue
+            fields[name] = element.get("value", "on" if input_type in ("checkbox", "radio") else "")
+        elif element.name == "textarea":
+            fields[name] = element.get_text()
+        else:
+            option = element.select_one("option[selected]") or element.select_one("option")
+            if option is not None:
+                fields[name] = option.get("value", option.get_text())
+    return fields
+
+
+class HttpEngine:
+    """
+    Browser-free version of the navigate/login/search flow.
+
+    One engine is one run: it owns a ``requests.Session`` for cookies, while
+    connections come from an adapter shared by every engine.
+    """
+
+    def __init__(self, adapter: HTTPAdapter):
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = settings.HTTP_USER_AGENT
+        self.page: Optional[HttpPage] = None
+
+    def close(self) -> None:
+        # Leaves the shared adapter (and its connections) open
+        self.session.adapters.clear()
+        self.session.close()
+
+    def get(self, url: str) -> HttpPage:
+        with span("http_get", url=url):
+            response = self.session.get(url, timeout=settings.HTTP_TIMEOUT)
+        response.raise_for_status()
+        self.page = HttpPage(response)
+        return self.page
+
+    def submit(self, form: Any, values: Dict[str, str]) -> HttpPage:
+        """Submit ``form`` of the current page with ``values`` filled in."""
+        data = {**form_fields(form), **values}
+        button = form.select_one("button[name], input[type=submit][name]")
+        if button is not None:
+            data[button["name"]] = button.get("value", "")
+        action = urljoin(self.page.url, form.get("action") or self.page.url)
+        method = form.get("method", "get").lower()
+        with span("http_submit", url=action, method=method):
+            if method == "post":
+                response = self.session.post(action, data=data, timeout=settings.HTTP_TIMEOUT)
+            else:
+                response = self.session.get(action, params=data, timeout=settings.HTTP_TIMEOUT)
+        response.raise_for_status()
+        self.page = HttpPage(response)
+        return self.page
+
+    def require_form(self, selector: str, purpose: str) -> Any:
+        form = self.page.select_one(selector)
+        if form is None:
+            # The form may be rendered by script, which only a browser runs
+            raise NeedsBrowser(f"No {purpose} form in the HTML of {self.page.url}")
+        return form
+
+    def login(self, username: str, password: str) -> Dict[str, Any]:
+        report_progress("Logging in", url=self.page.url)
+        form = self.require_form(LOGIN_FORM, "login")
+        self.submit(form, {"username": username, "password": password})
+        if self.page.select_one(LOGIN_FORM) is not None:
+            return {"status": "error", "message": "Login form is still shown after submitting credentials"}
+        return {"status": "success", "message": "Successfully logged in"}
+
+    def search(
+        self, query: str, schema: Optional[Dict[str, Any]] = None, require_results: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Submit the search form. With ``require_results`` a results page
+        without any result node raises NeedsBrowser, since the results may
+        be rendered by script.
+        """
+        report_progress("Searching", query=query)
+        form = self.require_form(SEARCH_FORM, "search")
+        self.submit(form, {"q": query})
+        item = schema["item"] if schema is not None else SEARCH_RESULT
+        if require_results and not self.page.select(item):
+            raise NeedsBrowser(f"No '{item}' nodes in the HTML of the search results at {self.page.url}")
+        if schema is not None:
+            page = self.extract(schema)
+            return {
+                "status": "success",
+                "message": f"Found {page['total']} search results",
+                "results_count": page["total"],
+                "results": page["records"]
+            }
+        results = self.page.select(SEARCH_RESULT)
+        return {
+            "status": "success",
+            "message": f"Found {len(results)} search results",
+            "results_count": len(results)
+        }
+
+    def extract(self, schema: Dict[str, Any], limit: Optional[int] = None) -> Dict[str, Any]:
+        """Typed records from the current page; ``schema`` comes from ``compile_schema``."""
+        with span("extract_page", url=self.page.url):
+            return extract_soup(self.page.soup, self.page.url, schema, limit)
+
+
+_adapter: Optional[HTTPAdapter] = None
+_adapter_lock = threading.Lock()
+
+# host -> (engine verdict, time it was decided)
+_verdicts: Dict[str, Any] = {}
+_verdicts_lock = threading.Lock()
+
+
+def available() -> bool:
+    return BeautifulSoup is not None
+
+
+def get_http_adapter() -> HTTPAdapter:
+    """Connection pools shared by every HTTP engine run."""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            _adapter = HTTPAdapter(
+                pool_connections=settings.HTTP_POOL_CONNECTIONS,
+                pool_maxsize=settings.HTTP_POOL_MAXSIZE
+            )
+        return _adapter
+
+
+def shutdown_http_adapter() -> None:
+    global _adapter
+    with _adapter_lock:
+        adapter, _adapter = _adapter, None
+    if adapter is not None:
+        adapter.close()
+
+
+def host_verdict(url: str) -> Optional[str]:
+    """'http' or 'browser' if a recent run decided how to handle this host."""
+    host = urlparse(url).netloc.lower()
+    with _verdicts_lock:
+        verdict = _verdicts.get(host)
+        if verdict is None:
+            return None
+        if time.time() - verdict[1] > settings.WEB_ENGINE_PROBE_TTL:
+            del _verdicts[host]
+            return None
+        return verdict[0]
+
+
+def remember_verdict(url: str, engine: str) -> None:
+    with _verdicts_lock:
+        _verdicts[urlparse(url).netloc.lower()] = (engine, time.time())
+
+
+@instrument("http_interaction")
+def run_http_interaction(
+    url: str,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    search_query: Optional[str] = None,
+    schema: Optional[Dict[str, Any]] = None,
+    require_results: bool = False
+) -> Dict[str, Any]:
+    """
+    Run the navigate/login/search flow over plain HTTP.
+
+    With a compiled extraction ``schema`` the search result also carries
+    the matching records.
+
+    Raises NeedsBrowser when a form the scenario needs is not in the served
+    HTML, or with ``require_results`` when the search results page has no
+    result nodes; the caller then falls back to Selenium. Other failures
+    are returned as an error result like the browser flow's.
+    """
+    started = time.perf_counter()
+    engine = HttpEngine(get_http_adapter())
+    try:
+        result: Dict[str, Any] = {"engine": "http"}
+        logger.info("Fetching over HTTP", extra={"url": url})
+        report_progress("Navigating", url=url)
+        engine.get(url)
+
+        if username and password:
+            result["login"] = engine.login(username, password)
+            if result["login"].get("status") == "error":
+                return {**result, "status": "error", "message": result["login"]["message"]}
+        if search_query:
+            result["search"] = engine.search(search_query, schema, require_results=require_results)
+
+        remember_verdict(url, "http")
+        result["status"] = "success"
+        result["message"] = "Web automation completed successfully"
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return result
+    except NeedsBrowser:
+        raise
+    except requests.RequestException as e:
+        logger.error("HTTP automation failed: %s", e)
+        return {"engine": "http", "status": "error", "message": str(e)}
+    finally:
+        engine.close()
+
+
+def iter_http_extraction(
+    url: str,
+    schema: Dict[str, Any],
+    limit: Optional[int] = None,
+    max_pages: int = 1,
+    require_items: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield pages of typed records starting at ``url``, following the
+    schema's ``next_page`` links.
+
+    With ``require_items`` a first page without any item node raises
+    NeedsBrowser, since the items may be rendered by script.
+    """
+    engine = HttpEngine(get_http_adapter())
+    try:
+        report_progress("Navigating", url=url)
+        engine.get(url)
+
+        def follow(page: Dict[str, Any]) -> bool:
+            if not page["next_url"]:
+                # A next control without an href needs a click handler to run
+                return False
+            report_progress("Next page", url=page["next_url"])
+            engine.get(page["next_url"])
+            return True
+
+        for page in iter_pages(
+            lambda remaining: engine.extract(schema, remaining), follow, limit=limit, max_pages=max_pages
+        ):
+            if require_items and page["page"] == 1 and page["total"] == 0:
+                raise NeedsBrowser(f"No '{schema['item']}' nodes in the HTML of {url}")
+            page["engine"] = "http"
+            yield page
+    finally:
+        engine.close()
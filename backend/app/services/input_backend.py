@@ -0,0 +1,231 @@
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set
+from app.config import settings
+
+
+class InputBackend:
+    """Sends keyboard input to the focused window and finds windows by title."""
+
+    name = "base"
+
+    def write(self, text: str, interval: float = 0.0) -> None:
+        raise NotImplementedError
+
+    def press(self, key: str) -> None:
+        raise NotImplementedError
+
+    def hotkey(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    def get_clipboard(self) -> str:
+        raise NotImplementedError
+
+    def set_clipboard(self, text: str) -> None:
+        raise NotImplementedError
+
+    def paste(self) -> None:
+        """Send the platform paste shortcut."""
+        self.hotkey("command" if sys.platform == "darwin" else "ctrl", "v")
+
+    @contextmanager
+    def pausing(self, pause: Optional[float]) -> Iterator[None]:
+        """Use ``pause`` seconds after each input call inside the block; None keeps the current pause."""
+        yield
+
+    def has_window(self, title: str) -> bool:
+        """Whether a window whose title contains ``title`` exists."""
+        raise NotImplementedError
+
+    def focus_window(self, title: str) -> bool:
+        """Bring the first window whose title contains ``title`` to the front."""
+        raise NotImplementedError
+
+    def wait_for_window(self, title: str, timeout: float, poll_interval: float = 0.1) -> bool:
+        """Poll until a matching window exists; False on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.has_window(title):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(poll_interval)
+
+
+class PyAutoGuiBackend(InputBackend):
+    """Real keyboard input through PyAutoGUI (needs a display)."""
+
+    name = "pyautogui"
+
+    def __init__(self, pause: float = 0.5, failsafe: bool = True):
+        import pyautogui
+
+        self._pyautogui = pyautogui
+        self._pause_lock = threading.Lock()
+        pyautogui.PAUSE = pause
+        pyautogui.FAILSAFE = failsafe
+
+    def write(self, text: str, interval: float = 0.0) -> None:
+        self._pyautogui.write(text, interval=interval)
+
+    def press(self, key: str) -> None:
+        self._pyautogui.press(key)
+
+    def hotkey(self, *keys: str) -> None:
+        self._pyautogui.hotkey(*keys)
+
+    def get_clipboard(self) -> str:
+        import pyperclip  # installed with PyAutoGUI
+
+        return pyperclip.paste()
+
+    def set_clipboard(self, text: str) -> None:
+        import pyperclip
+
+        pyperclip.copy(text)
+
+    @contextmanager
+    def pausing(self, pause: Optional[float]) -> Iterator[None]:
+        if pause is None:
+            yield
+            return
+        # PAUSE is module-global in PyAutoGUI; hold the lock for the whole block
+        with self._pause_lock:
+            previous, self._pyautogui.PAUSE = self._pyautogui.PAUSE, pause
+            try:
+                yield
+            finally:
+                self._pyautogui.PAUSE = previous
+
+    def _windows(self, title: str) -> List[Any]:
+        # Window lookup is only implemented by PyGetWindow on Windows
+        get_windows = getattr(self._pyautogui, "getWindowsWithTitle", None)
+        if get_windows is None:
+            raise NotImplementedError("Window management is not supported on this platform")
+        return get_windows(title)
+
+    def has_window(self, title: str) -> bool:
+        return bool(self._windows(title))
+
+    def focus_window(self, title: str) -> bool:
+        windows = self._windows(title)
+        if not windows:
+            return False
+        window = windows[0]
+        if window.isMinimized:
+            window.restore()
+        window.activate()
+        return True
+
+
+class RecordingBackend(InputBackend):
+    """
+    Fake backend that records every call instead of sending input.
+
+    By default calls return immediately. Benchmarks can model the cost of
+    real input with ``key_delay`` (per keystroke), ``pause`` (after every
+    call, like ``pyautogui.PAUSE``) and ``honor_interval`` (sleep for the
+    requested per-key interval).
+
+    Windows are simulated: ``add_window`` makes a title visible to
+    ``has_window``/``focus_window``, and the last focused title is kept in
+    ``focused``.
+    """
+
+    name = "recording"
+
+    def __init__(self, key_delay: float = 0.0, pause: float = 0.0, honor_interval: bool = False):
+        self.key_delay = key_delay
+        self.pause = pause
+        self.honor_interval = honor_interval
+        self.calls: List[Dict[str, Any]] = []
+        self.windows: Set[str] = set()
+        self.focused: Optional[str] = None
+        self.clipboard = ""
+        self._lock = threading.Lock()
+
+    def write(self, text: str, interval: float = 0.0) -> None:
+        self._record("write", text=text, interval=interval)
+        per_key = self.key_delay + (interval if self.honor_interval else 0.0)
+        self._simulate(per_key * len(text))
+
+    def press(self, key: str) -> None:
+        self._record("press", key=key)
+        self._simulate(self.key_delay)
+
+    def hotkey(self, *keys: str) -> None:
+        self._record("hotkey", keys=list(keys))
+        self._simulate(self.key_delay * len(keys))
+
+    def get_clipboard(self) -> str:
+        return self.clipboard
+
+    def set_clipboard(self, text: str) -> None:
+        self._record("set_clipboard", characters=len(text))
+        self.clipboard = text
+
+    @contextmanager
+    def pausing(self, pause: Optional[float]) -> Iterator[None]:
+        if pause is None:
+            yield
+            return
+        previous, self.pause = self.pause, pause
+        try:
+            yield
+        finally:
+            self.pause = previous
+
+    def has_window(self, title: str) -> bool:
+        with self._lock:
+            return any(title in window for window in self.windows)
+
+    def focus_window(self, title: str) -> bool:
+        self._record("focus", title=title)
+        with self._lock:
+            match = next((window for window in sorted(self.windows) if title in window), None)
+            if match is not None:
+                self.focused = match
+        return match is not None
+
+    def add_window(self, title: str) -> None:
+        with self._lock:
+            self.windows.add(title)
+
+    def remove_window(self, title: str) -> None:
+        with self._lock:
+            self.windows.discard(title)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+    def _record(self, action: str, **data: Any) -> None:
+        with self._lock:
+            self.calls.append({"action": action, **data})
+
+    def _simulate(self, delay: float) -> None:
+        delay += self.pause
+        if delay > 0:
+            time.sleep(delay)
+
+
+_input_backend: Optional[InputBackend] = None
+_input_backend_lock = threading.Lock()
+
+
+def get_input_backend() -> InputBackend:
+    """Return the active input backend, defaulting to PyAutoGUI on first use."""
+    global _input_backend
+    with _input_backend_lock:
+        if _input_backend is None:
+            _input_backend = PyAutoGuiBackend(pause=settings.DESKTOP_INPUT_PAUSE)
+        return _input_backend
+
+
+def set_input_backend(backend: Optional[InputBackend]) -> None:
+    """Install a backend (e.g. ``RecordingBackend`` in tests); None restores the default."""
+    global _input_backend
+    with _input_backend_lock:
+        _input_backend = backend
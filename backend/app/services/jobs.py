@@ -0,0 +1,220 @@
+import asyncio
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from app.config import settings
+from app.services.tracing import current_trace_id
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_current_job: contextvars.ContextVar[Optional["Job"]] = contextvars.ContextVar("current_job", default=None)
+
+
+class Job:
+    """A unit of blocking work executed off the event loop."""
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.trace_id = current_trace_id()
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.future: Optional[Future] = None
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def add_event(self, event: str, **data: Any) -> None:
+        with self._lock:
+            self._events.append({
+                "seq": len(self._events),
+                "event": event,
+                "time": time.time(),
+                **data
+            })
+
+    def events_since(self, seq: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._events[seq:]
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "trace_id": self.trace_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        with self._lock:
+            progress = [e for e in self._events if e["event"] == "progress"]
+        if progress:
+            data["progress"] = progress[-1].get("message")
+        if include_result and self.done:
+            data["result"] = self.result
+            data["error"] = self.error
+        return data
+
+
+class JobManager:
+    """
+    Runs blocking automation work on per-kind thread pools.
+
+    Each job kind (web, desktop, document) gets its own executor so a burst
+    of one kind cannot starve the others, and finished jobs are kept in a
+    bounded history for polling.
+
+    Args:
+        workers: Mapping of job kind to worker thread count
+        history_size: Number of jobs to remember
+    """
+
+    def __init__(self, workers: Dict[str, int], history_size: int = 500):
+        self.workers = dict(workers)
+        self.history_size = history_size
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._pending: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Job:
+        """Queue ``fn(*args, **kwargs)`` and return its job immediately."""
+        job = Job(kind)
+        job.add_event("status", status=QUEUED)
+        ctx = contextvars.copy_context()
+        with self._lock:
+            executor = self._executor(kind)
+            self._jobs[job.id] = job
+            self._pending[kind] = self._pending.get(kind, 0) + 1
+            self._trim()
+        job.future = executor.submit(ctx.run, self._run, job, fn, args, kwargs)
+        job.future.add_done_callback(lambda _: self._finished(kind))
+        return job
+
+    async def run(self, kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Submit a job and await its result without blocking the event loop."""
+        job = self.submit(kind, fn, *args, **kwargs)
+        return await asyncio.wrap_future(job.future)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, kind: Optional[str] = None) -> List[Job]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [j for j in jobs if kind is None or j.kind == kind]
+
+    def pending(self, kind: str) -> int:
+        """Jobs of ``kind`` that are queued or running."""
+        with self._lock:
+            return self._pending.get(kind, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, Dict[str, int]] = {}
+        for job in self.list():
+            per_kind = counts.setdefault(job.kind, {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0})
+            per_kind[job.status] += 1
+        return {"workers": self.workers, "jobs": counts}
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executors, self._executors = list(self._executors.values()), {}
+        for executor in executors:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _finished(self, kind: str) -> None:
+        with self._lock:
+            self._pending[kind] -= 1
+
+    def _executor(self, kind: str) -> ThreadPoolExecutor:
+        executor = self._executors.get(kind)
+        if executor is None:
+            if kind not in self.workers:
+                raise ValueError(f"Unknown job kind: {kind}")
+            executor = ThreadPoolExecutor(
+                max_workers=self.workers[kind],
+                thread_name_prefix=f"{kind}-job"
+            )
+            self._executors[kind] = executor
+        return executor
+
+    def _trim(self) -> None:
+        # Drop the oldest finished jobs once the history is full
+        excess = len(self._jobs) - self.history_size
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.done][:excess]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _run(job: Job, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+        token = _current_job.set(job)
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.add_event("status", status=RUNNING)
+        status = FAILED
+        try:
+            job.result = fn(*args, **kwargs)
+            status = SUCCEEDED
+            return job.result
+        except Exception as e:
+            job.error = str(e)
+            raise
+        finally:
+            job.finished_at = time.time()
+            # Record the final event before flipping the status so pollers that
+            # see a finished job have already got every event.
+            job.add_event("status", status=status)
+            job.status = status
+            _current_job.reset(token)
+
+
+def report_progress(message: str, **data: Any) -> None:
+    """Record a progress update on the job running in this context, if any."""
+    job = _current_job.get()
+    if job is not None:
+        job.add_event("progress", message=message, **data)
+
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide job manager, creating it on first use."""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager(
+                workers={
+                    "web": settings.JOB_WORKERS_WEB,
+                    "desktop": settings.JOB_WORKERS_DESKTOP,
+                    "document": settings.JOB_WORKERS_DOCUMENT,
+                },
+                history_size=settings.JOB_HISTORY_SIZE
+            )
+        return _job_manager
+
+
+def shutdown_job_manager() -> None:
+    global _job_manager
+    with _job_manager_lock:
+        manager, _job_manager = _job_manager, None
+    if manager is not None:
+        manager.shutdown()
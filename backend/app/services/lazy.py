@@ -0,0 +1,65 @@
+import importlib
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Any, Dict, Optional
+from app.services.metrics import MODULE_IMPORT_SECONDS
+
+_import_seconds: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def load(name: str) -> ModuleType:
+    """Import ``name`` if needed, recording how long the first import took."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    elapsed = time.perf_counter() - started
+    with _lock:
+        if name not in _import_seconds:
+            _import_seconds[name] = elapsed
+            MODULE_IMPORT_SECONDS.set(elapsed, module=name)
+    return module
+
+
+def loaded(name: str) -> Optional[ModuleType]:
+    """The module if something already imported it, without importing it."""
+    return sys.modules.get(name)
+
+
+def import_seconds() -> Dict[str, float]:
+    """First-import duration of every module loaded through ``load``."""
+    with _lock:
+        return dict(_import_seconds)
+
+
+class LazyModule:
+    """
+    Stands in for a service module and imports it on first attribute access.
+
+    Endpoint modules hold these instead of importing services directly, so
+    heavy dependencies (cv2, fitz, selenium, ...) are only loaded once a
+    request needs them.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def __getattr__(self, attr: str) -> Any:
+        # Only called for attributes the proxy itself does not have
+        module = self._module
+        if module is None:
+            module = self._module = load(self._name)
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None or self._name in sys.modules else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    return LazyModule(name)
@@ -0,0 +1,119 @@
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from app.config import settings
+from app.services.tracing import current_span_id, current_trace_id
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "trace_id", "span_id"}
+
+
+class TraceContextFilter(logging.Filter):
+    """Stamp records with the trace and span of the calling context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = current_trace_id()
+        record.span_id = current_span_id()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra`` fields are emitted as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "trace_id", None):
+            entry["trace_id"] = record.trace_id
+        if getattr(record, "span_id", None):
+            entry["span_id"] = record.span_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the writer thread without ever waiting.
+
+    When the queue is full the record is dropped and counted, so a slow
+    stdout can never stall a request.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now (they may reference mutable
+        # or thread-local state) but leave JSON formatting to the writer.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[NonBlockingQueueHandler] = None
+_logging_lock = threading.Lock()
+
+
+def setup_logging() -> None:
+    """
+    Route the ``app`` loggers through a bounded queue to a JSON-lines writer
+    thread. Safe to call more than once.
+    """
+    global _listener, _handler
+    with _logging_lock:
+        if _listener is not None:
+            return
+        writer = logging.StreamHandler(sys.stdout)
+        writer.setFormatter(JsonFormatter())
+        _handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+        _handler.addFilter(TraceContextFilter())
+        logger = logging.getLogger("app")
+        logger.setLevel(settings.LOG_LEVEL.upper())
+        logger.addHandler(_handler)
+        logger.propagate = False
+        _listener = logging.handlers.QueueListener(_handler.queue, writer, respect_handler_level=True)
+        _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener, _handler
+    with _logging_lock:
+        listener, handler, _listener, _handler = _listener, _handler, None, None
+    if listener is not None:
+        listener.stop()
+    if handler is not None:
+        logging.getLogger("app").removeHandler(handler)
+
+
+def dropped_records() -> int:
+    handler = _handler
+    return handler.dropped if handler is not None else 0
@@ -0,0 +1,289 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from app.config import settings
+from app.services.tracing import span
+
+LabelValues = Tuple[str, ...]
+
+# Seconds; spans a fast threshold pass up to a slow browser start
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base for a labelled metric family; each label combination is a series."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    """
+    Cumulative histogram with fixed buckets.
+
+    ``observe`` is a bisect and three additions under a lock, cheap enough to
+    call on every request.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: [bucket counts..., +Inf count], sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = [(key, list(counts), total[0]) for key, (counts, total) in self._series.items()]
+        lines = self.header()
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status")
+))
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Time until the response starts, by route.", ("method", "route")
+))
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled."
+))
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "automation_stage_duration_seconds", "Duration of instrumented service stages.", ("stage",)
+))
+STAGE_IN_FLIGHT = REGISTRY.register(Gauge(
+    "automation_stage_in_flight", "Service stages currently running.", ("stage",)
+))
+STAGE_ERRORS = REGISTRY.register(Counter(
+    "automation_stage_errors_total", "Service stages that raised or returned an error status.", ("stage",)
+))
+PREPROCESS_STEP_DURATION = REGISTRY.register(Histogram(
+    "preprocess_step_duration_seconds", "Duration of individual image preprocessing steps.", ("step", "skipped")
+))
+WAIT_DURATION = REGISTRY.register(Histogram(
+    "web_wait_duration_seconds", "Time spent in browser waits, by condition and outcome.", ("condition", "met")
+))
+SLEEP_SECONDS = REGISTRY.register(Counter(
+    "automation_sleep_seconds_total", "Seconds spent in fixed sleeps.", ("reason",)
+))
+BYTES_PROCESSED = REGISTRY.register(Counter(
+    "document_bytes_processed_total", "Bytes of documents submitted for extraction.", ("type",)
+))
+MODULE_IMPORT_SECONDS = REGISTRY.register(Gauge(
+    "service_module_import_seconds", "Time the first import of a lazily loaded service module took.", ("module",)
+))
+ADMISSION_IN_FLIGHT = REGISTRY.register(Gauge(
+    "admission_in_flight", "Requests holding an admission slot, by endpoint kind.", ("endpoint",)
+))
+ADMISSION_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "admission_queue_depth", "Requests waiting for an admission slot, by endpoint kind.", ("endpoint",)
+))
+ADMISSION_WAIT = REGISTRY.register(Histogram(
+    "admission_wait_seconds", "Time requests waited for an admission slot.", ("endpoint", "priority")
+))
+ADMISSION_REJECTED = REGISTRY.register(Counter(
+    "admission_rejected_total", "Requests rejected with 429, by endpoint kind and reason.", ("endpoint", "reason")
+))
+EXPORTS = REGISTRY.register(Counter(
+    "result_exports_total", "Extraction results handed to export sinks, by sink and outcome.", ("sink", "status")
+))
+EXPORT_BATCH_DURATION = REGISTRY.register(Histogram(
+    "result_export_batch_duration_seconds", "Time an export sink took to deliver one batch.", ("sink",)
+))
+STARTUP_SECONDS = REGISTRY.register(Gauge(
+    "app_startup_seconds", "Cold-start time of this worker, by phase.", ("phase",)
+))
+
+
+def _is_error(result: Any) -> bool:
+    return isinstance(result, dict) and result.get("status") == "error"
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """
+    Record the duration, concurrency and failures of a block under ``stage``.
+
+    The block is also recorded as a span on the current request trace.
+    """
+    with span(stage):
+        if not settings.METRICS_ENABLED:
+            yield
+            return
+        STAGE_IN_FLIGHT.inc(stage=stage)
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            STAGE_ERRORS.inc(stage=stage)
+            raise
+        finally:
+            STAGE_DURATION.observe(time.perf_counter() - started, stage=stage)
+            STAGE_IN_FLIGHT.dec(stage=stage)
+
+
+def instrument(stage: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorator form of ``timed``.
+
+    Service functions that report failures as ``{"status": "error"}`` instead
+    of raising are counted as errors too.
+    """
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with timed(stage):
+                result = fn(*args, **kwargs)
+            if _is_error(result) and settings.METRICS_ENABLED:
+                STAGE_ERRORS.inc(stage=stage)
+            return result
+        return wrapper
+    return decorator
+
+
+def sleep(seconds: float, reason: str) -> None:
+    """``time.sleep`` that accounts the time under ``reason`` and shows it on the trace."""
+    if settings.METRICS_ENABLED:
+        SLEEP_SECONDS.inc(seconds, reason=reason)
+    with span("sleep", reason=reason):
+        time.sleep(seconds)
+
+
+def observe_bytes(file_type: Optional[str], size: int) -> None:
+    if settings.METRICS_ENABLED:
+        BYTES_PROCESSED.inc(size, type=file_type or "unknown")
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,314 @@
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+import pytesseract
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def ocr_thread_budget(pool_size: int) -> int:
+    """Threads each engine may use so that ``pool_size`` engines fit on the CPUs."""
+    return max(1, (os.cpu_count() or 1) // max(1, pool_size))
+
+
+def effective_pool_size(requested: int) -> int:
+    """
+    Cap the pool so engines times ``OMP_THREAD_LIMIT`` does not exceed the CPUs.
+
+    Tesseract parallelises internally with OpenMP; without a limit every
+    engine would try to use every core and the pool would oversubscribe.
+    """
+    limit = int(os.environ.get("OMP_THREAD_LIMIT", "0") or 0)
+    if limit <= 0:
+        return max(1, requested)
+    return max(1, min(requested, (os.cpu_count() or 1) // limit))
+
+
+# An explicit limit from the environment wins over the computed budgets
+_OMP_LIMIT_FROM_ENV = "OMP_THREAD_LIMIT" in os.environ
+
+_tesserocr: Any = None
+_tesserocr_loaded = False
+# Set once creating a tesserocr engine failed; pytesseract is used from then on
+_tesserocr_failed = False
+# Engines per pool in processes configured by configure_worker_process
+_worker_pool_size: Optional[int] = None
+
+
+def apply_thread_limit() -> None:
+    """
+    Default ``OMP_THREAD_LIMIT`` to each engine's share of the CPUs.
+
+    OpenMP reads the limit once, when libtesseract loads, so this runs
+    before tesserocr is imported and before the pool is sized. A value from
+    the environment or from ``configure_worker_process`` is kept.
+    """
+    pool_size = _worker_pool_size or settings.OCR_POOL_SIZE
+    os.environ.setdefault("OMP_THREAD_LIMIT", str(ocr_thread_budget(pool_size)))
+
+
+def _load_tesserocr() -> Any:
+    """Import tesserocr on first use, so worker processes can set their thread limit first."""
+    global _tesserocr, _tesserocr_loaded
+    if not _tesserocr_loaded:
+        apply_thread_limit()
+        try:
+            import tesserocr
+            _tesserocr = tesserocr
+        except ImportError:  # optional; pytesseract is used instead
+            _tesserocr = None
+        _tesserocr_loaded = True
+    return _tesserocr
+
+
+def worker_thread_budget(processes: int) -> Optional[int]:
+    """
+    OpenMP threads per engine when ``processes`` worker processes each run
+    one engine, or None when ``OMP_THREAD_LIMIT`` was set explicitly.
+    """
+    if _OMP_LIMIT_FROM_ENV:
+        return None
+    return ocr_thread_budget(processes)
+
+
+def configure_worker_process(engines: int, omp_threads: Optional[int]) -> None:
+    """
+    Process pool initializer for workers that OCR alongside each other.
+
+    Each worker gets a pool of ``engines`` engines and ``omp_threads``
+    OpenMP threads per engine, so the workers together fit on the CPUs
+    instead of every worker sizing itself for the whole machine. Workers
+    must be fresh (spawned) processes that have not loaded libtesseract.
+    """
+    global _worker_pool_size
+    _worker_pool_size = max(1, engines)
+    if omp_threads is not None:
+        os.environ["OMP_THREAD_LIMIT"] = str(omp_threads)
+
+
+class OcrEngine:
+    """Recognises text in a preprocessed image held as a numpy array."""
+
+    name = "base"
+
+    def recognize(self, image: np.ndarray) -> str:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class TesserocrEngine(OcrEngine):
+    """
+    In-process Tesseract through tesserocr.
+
+    The language model is loaded once when the engine is created and reused
+    for every call, and images are handed over as raw pixel buffers.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str, tessdata_path: Optional[str] = None):
+        kwargs = {"lang": lang}
+        if tessdata_path:
+            kwargs["path"] = tessdata_path
+        self._api = _load_tesserocr().PyTessBaseAPI(**kwargs)
+
+    def recognize(self, image: np.ndarray) -> str:
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        height, width = image.shape[:2]
+        channels = 1 if image.ndim == 2 else image.shape[2]
+        self._api.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+        return self._api.GetUTF8Text()
+
+    def close(self) -> None:
+        self._api.End()
+
+
+class PytesseractEngine(OcrEngine):
+    """Fallback engine that runs the ``tesseract`` binary per call."""
+
+    name = "pytesseract"
+
+    def __init__(self, lang: str):
+        self.lang = lang
+
+    def recognize(self, image: np.ndarray) -> str:
+        return pytesseract.image_to_string(image, lang=self.lang)
+
+
+class OcrEnginePool:
+    """
+    Bounded pool of long-lived OCR engines.
+
+    At most ``size`` recognitions run at once; engines are created lazily by
+    ``factory`` and kept for reuse. Engines that raise are discarded and
+    replaced on the next lease.
+    """
+
+    def __init__(self, factory: Callable[[], OcrEngine], size: int):
+        self.factory = factory
+        self.size = size
+        self._idle: "queue.LifoQueue[OcrEngine]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._engines: List[OcrEngine] = []
+        self._stats = {"created": 0, "calls": 0, "errors": 0, "busy_time": 0.0, "wait_time": 0.0}
+
+    def prewarm(self) -> int:
+        started = 0
+        while len(self._engines) < self.size:
+            self._idle.put(self._create())
+            started += 1
+        return started
+
+    @contextmanager
+    def lease(self):
+        requested = time.perf_counter()
+        self._slots.acquire()
+        try:
+            try:
+                engine = self._idle.get_nowait()
+            except queue.Empty:
+                engine = self._create()
+            with self._lock:
+                self._stats["wait_time"] += time.perf_counter() - requested
+            try:
+                yield engine
+            except Exception:
+                self._discard(engine)
+                raise
+            else:
+                self._idle.put(engine)
+        finally:
+            self._slots.release()
+
+    def recognize(self, image: np.ndarray) -> str:
+        started = time.perf_counter()
+        try:
+            with self.lease() as engine:
+                return engine.recognize(image)
+        except Exception:
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._stats["calls"] += 1
+                self._stats["busy_time"] += time.perf_counter() - started
+
+    def close(self) -> None:
+        while True:
+            try:
+                engine = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(engine)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["engines"] = len(self._engines)
+        stats.update({
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "omp_thread_limit": os.environ.get("OMP_THREAD_LIMIT"),
+            "engine": engine_name(),
+        })
+        return stats
+
+    def _create(self) -> OcrEngine:
+        engine = self.factory()
+        with self._lock:
+            self._engines.append(engine)
+            self._stats["created"] += 1
+        return engine
+
+    def _discard(self, engine: OcrEngine) -> None:
+        with self._lock:
+            if engine in self._engines:
+                self._engines.remove(engine)
+        try:
+            engine.close()
+        except Exception:
+            pass
+
+
+def engine_name() -> str:
+    """
+    The engine selected by ``OCR_ENGINE`` (``auto`` prefers tesserocr when
+    installed), or pytesseract once a tesserocr engine failed to start.
+    """
+    if settings.OCR_ENGINE == "pytesseract" or _tesserocr_failed or _load_tesserocr() is None:
+        return PytesseractEngine.name
+    return TesserocrEngine.name
+
+
+@lru_cache(maxsize=1)
+def engine_version() -> str:
+    """Name and Tesseract version of the selected engine, used in cache keys."""
+    try:
+        if engine_name() == TesserocrEngine.name:
+            version = _load_tesserocr().tesseract_version().splitlines()[0]
+        else:
+            version = str(pytesseract.get_tesseract_version())
+    except Exception:
+        version = "unknown"
+    return f"{engine_name()}-{version}"
+
+
+def create_engine() -> OcrEngine:
+    global _tesserocr_failed
+    if engine_name() == TesserocrEngine.name:
+        try:
+            return TesserocrEngine(settings.OCR_LANGUAGE, settings.TESSDATA_PATH or None)
+        except Exception as e:
+            # e.g. missing tessdata for OCR_LANGUAGE; the tesseract binary may still work
+            logger.warning("Falling back to pytesseract, tesserocr engine failed to start: %s", e)
+            _tesserocr_failed = True
+            engine_version.cache_clear()
+    return PytesseractEngine(settings.OCR_LANGUAGE)
+
+
+_ocr_pool: Optional[OcrEnginePool] = None
+_ocr_pool_lock = threading.Lock()
+
+
+def get_ocr_pool() -> OcrEnginePool:
+    """Return the process-wide OCR engine pool, creating it on first use."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            apply_thread_limit()
+            size = _worker_pool_size or effective_pool_size(settings.OCR_POOL_SIZE)
+            _ocr_pool = OcrEnginePool(create_engine, size)
+        return _ocr_pool
+
+
+def ocr_pool_stats() -> Optional[Dict[str, Any]]:
+    """Usage of the OCR engine pool, or ``None`` if nothing has created it yet."""
+    with _ocr_pool_lock:
+        pool = _ocr_pool
+    return pool.stats() if pool is not None else None
+
+
+def warm_ocr_pool() -> int:
+    """Load the OCR models ahead of the first request."""
+    if not settings.OCR_POOL_PREWARM:
+        return 0
+    return get_ocr_pool().prewarm()
+
+
+def shutdown_ocr_pool() -> None:
+    global _ocr_pool
+    with _ocr_pool_lock:
+        pool, _ocr_pool = _ocr_pool, None
+    if pool is not None:
+        pool.close()
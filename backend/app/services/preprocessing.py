@@ -0,0 +1,183 @@
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import cv2
+import numpy as np
+from app.config import settings
+from app.services.metrics import PREPROCESS_STEP_DURATION
+from app.services.tracing import record_span
+
+StageFn = Callable[[np.ndarray, Dict[str, Any], Dict[str, Any]], np.ndarray]
+NoopFn = Callable[[np.ndarray, Dict[str, Any], Dict[str, Any]], bool]
+
+
+def _downscale(img: np.ndarray, params: Dict[str, Any], ctx: Dict[str, Any]) -> np.ndarray:
+    scale = params["target_dpi"] / ctx["dpi"]
+    ctx["dpi"] = params["target_dpi"]
+    return cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def _downscale_is_noop(img: np.ndarray, params: Dict[str, Any], ctx: Dict[str, Any]) -> bool:
+    # Never upscale
+    return params["target_dpi"] >= ctx["dpi"]
+
+
+def _otsu(img: np.ndarray, params: Dict[str, Any], ctx: Dict[str, Any]) -> np.ndarray:
+    cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=img)
+    return img
+
+
+def _adaptive(img: np.ndarray, params: Dict[str, Any], ctx: Dict[str, Any]) -> np.ndarray:
+    return cv2.adaptiveThreshold(
+        img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+        params.get("block_size", 31), params.get("c", 10)
+    )
+
+
+def _skew_angle(img: np.ndarray) -> float:
+    # Text is dark on light; fit a rotated box around the ink pixels
+    _, ink = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    coords = cv2.findNonZero(ink)
+    if coords is None:
+        return 0.0
+    angle = cv2.minAreaRect(coords)[-1]
+    if angle > 45:
+        angle -= 90
+    elif angle < -45:
+        angle += 90
+    return angle
+
+
+def _deskew(img: np.ndarray, params: Dict[str, Any], ctx: Dict[str, Any]) -> np.ndarray:
+    angle = ctx.pop("skew_angle")
+    height, width = img.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(
+        img, matrix, (width, height),
+        flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=255
+    )
+
+
+def _deskew_is_noop(img: np.ndarray, params: Dict[str, Any], ctx: Dict[str, Any]) -> bool:
+    angle = _skew_angle(img)
+    ctx["skew_angle"] = angle
+    return abs(angle) < params.get("min_angle", 0.5)
+
+
+def _denoise(img: np.ndarray, params: Dict[str, Any], ctx: Dict[str, Any]) -> np.ndarray:
+    return cv2.medianBlur(img, params["ksize"])
+
+
+def _morph(img: np.ndarray, params: Dict[str, Any], ctx: Dict[str, Any]) -> np.ndarray:
+    kernel = np.ones((params["ksize"], params["ksize"]), np.uint8)
+    cv2.dilate(img, kernel, dst=img, iterations=1)
+    cv2.erode(img, kernel, dst=img, iterations=1)
+    return img
+
+
+def _kernel_is_noop(img: np.ndarray, params: Dict[str, Any], ctx: Dict[str, Any]) -> bool:
+    # A 1x1 kernel leaves the image unchanged
+    return params.get("ksize", 1) <= 1
+
+
+STAGES: Dict[str, Tuple[StageFn, Optional[NoopFn]]] = {
+    "downscale": (_downscale, _downscale_is_noop),
+    "otsu": (_otsu, None),
+    "adaptive_threshold": (_adaptive, None),
+    "deskew": (_deskew, _deskew_is_noop),
+    "denoise": (_denoise, _kernel_is_noop),
+    "morph": (_morph, _kernel_is_noop),
+}
+
+PRESETS: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {
+    # Same output as the original Otsu pass (its 1x1 dilate/erode was a no-op)
+    "default": [("otsu", {})],
+    "fast": [("downscale", {"target_dpi": 200}), ("otsu", {})],
+    "accurate": [
+        ("denoise", {"ksize": 3}),
+        ("deskew", {"min_angle": 0.5}),
+        ("adaptive_threshold", {"block_size": 31, "c": 10}),
+    ],
+}
+
+
+class Pipeline:
+    """
+    An ordered list of preprocessing stages applied to a greyscale image.
+
+    Each stage is timed; stages that would not change the image are skipped
+    and reported as such.
+
+    Args:
+        stages: ``(stage_name, params)`` pairs, see ``STAGES``
+        name: Label reported with the timings
+    """
+
+    def __init__(self, stages: List[Tuple[str, Dict[str, Any]]], name: str = "custom"):
+        unknown = [stage for stage, _ in stages if stage not in STAGES]
+        if unknown:
+            raise ValueError(f"Unknown preprocessing stage(s): {', '.join(unknown)}")
+        self.stages = stages
+        self.name = name
+
+    @classmethod
+    def preset(cls, name: Optional[str] = None) -> "Pipeline":
+        name = name or settings.PREPROCESS_DEFAULT_PRESET
+        if name not in PRESETS:
+            raise ValueError(f"Unknown preprocessing preset '{name}'. Available: {', '.join(PRESETS)}")
+        return cls(PRESETS[name], name=name)
+
+    def describe(self) -> Dict[str, Any]:
+        """Stable description of the pipeline, used in cache keys."""
+        return {"preset": self.name, "stages": [[stage, params] for stage, params in self.stages]}
+
+    def decode(self, image_data: Union[bytes, memoryview]) -> np.ndarray:
+        """Decode straight to greyscale so no colour buffer is allocated."""
+        img = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            raise ValueError("Could not decode image")
+        return img
+
+    def run(
+        self,
+        image: Union[bytes, memoryview, np.ndarray],
+        dpi: Optional[int] = None
+    ) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """
+        Apply the pipeline and return ``(image, timings)``.
+
+        ``image`` is either encoded image bytes or a greyscale array, which may
+        be modified in place. ``dpi`` is the source resolution when known
+        (e.g. rendered PDF pages).
+        """
+        timings = []
+        if not isinstance(image, np.ndarray):
+            started = time.perf_counter()
+            image = self.decode(image)
+            timings.append(_timing("decode", started, False))
+        img = np.ascontiguousarray(image)
+        if not img.flags.writeable:
+            img = img.copy()
+        ctx = {"dpi": dpi or settings.PREPROCESS_ASSUMED_DPI}
+
+        for stage, params in self.stages:
+            fn, is_noop = STAGES[stage]
+            started = time.perf_counter()
+            if is_noop is not None and is_noop(img, params, ctx):
+                timings.append(_timing(stage, started, True))
+                continue
+            img = np.ascontiguousarray(fn(img, params, ctx))
+            timings.append(_timing(stage, started, False))
+        return img, timings
+
+
+def _timing(stage: str, started: float, skipped: bool) -> Dict[str, Any]:
+    ended = time.perf_counter()
+    elapsed = ended - started
+    record_span(stage, started, ended, skipped=skipped)
+    if settings.METRICS_ENABLED:
+        PREPROCESS_STEP_DURATION.observe(elapsed, step=stage, skipped=str(skipped).lower())
+    return {
+        "stage": stage,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "skipped": skipped,
+    }
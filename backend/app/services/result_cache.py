@@ -0,0 +1,330 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_hash(data: Union[bytes, memoryview]) -> str:
+    """SHA-256 of the document bytes."""
+    digest = hashlib.sha256()
+    view = memoryview(data)
+    for offset in range(0, len(view), _HASH_CHUNK_SIZE):
+        digest.update(view[offset:offset + _HASH_CHUNK_SIZE])
+    return digest.hexdigest()
+
+
+def cache_key_for_hash(document_hash: str, params: Dict[str, Any]) -> str:
+    """Cache key from a ``content_hash`` and the parameters that shape the result."""
+    digest = hashlib.sha256(document_hash.encode("ascii"))
+    digest.update(b"\0")
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def make_cache_key(data: Union[bytes, memoryview], params: Dict[str, Any]) -> str:
+    """Hash the document bytes together with the parameters that shape the result."""
+    return cache_key_for_hash(content_hash(data), params)
+
+
+@contextmanager
+def _locked_file(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on ``path``, shared with other processes."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ResultCache:
+    """
+    Two-tier cache for extraction results keyed by content hash.
+
+    The memory tier is an LRU of ``memory_entries`` results. The disk tier
+    stores one JSON file per key under ``disk_dir``, which the server's
+    worker processes share. Once this process has written past
+    ``disk_max_bytes``, or at the latest every ``sweep_interval`` seconds
+    after a write, the directory is measured under a lock file and its least
+    recently used files are evicted until it fits, whichever worker wrote
+    them. Concurrent misses for the same key share a single computation.
+    """
+
+    def __init__(
+        self,
+        memory_entries: int = 256,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0,
+        sweep_interval: float = 10.0
+    ):
+        self.memory_entries = memory_entries
+        self.disk_dir = disk_dir if disk_max_bytes > 0 else None
+        self.disk_max_bytes = disk_max_bytes
+        self.sweep_interval = sweep_interval
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._disk_index: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._next_sweep = 0.0
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "merged": 0,
+            "disk_evictions": 0,
+        }
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._sweep()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return value
+        value = self._read_disk(key)
+        if value is not None:
+            with self._lock:
+                self._stats["disk_hits"] += 1
+                self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._remember(key, value)
+        self._write_disk(key, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Return ``(value, hit)``, computing and storing the value on a miss.
+
+        If another thread is already computing ``key`` this call waits for
+        that result instead of starting a second computation.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value, True
+
+        with self._lock:
+            # Another caller may have stored the value since the lookup above
+            if key in self._memory:
+                return self._memory[key], True
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+                self._stats["misses"] += 1
+            else:
+                self._stats["merged"] += 1
+
+        if not owner:
+            return future.result(), True
+
+        try:
+            value = compute()
+            if value.get("status") != "error":
+                self.put(key, value)
+            future.set_result(value)
+            return value, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def invalidate(self, key: Optional[str] = None) -> int:
+        """Drop one key, or every entry when ``key`` is None. Returns the number removed."""
+        # Every file in the directory, including other workers' entries
+        on_disk = [name for _, name, _ in self._scan_disk()] if key is None and self.disk_dir else []
+        with self._lock:
+            keys = [key] if key is not None else list(set(self._memory) | set(self._disk_index) | set(on_disk))
+            removed = 0
+            for k in keys:
+                in_memory = self._memory.pop(k, None) is not None
+                on_disk = self._drop_disk(k)
+                removed += in_memory or on_disk
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk_index),
+                "disk_bytes": self._disk_bytes,
+                "in_flight": len(self._in_flight),
+            })
+        served = stats["memory_hits"] + stats["disk_hits"] + stats["merged"]
+        lookups = served + stats["misses"]
+        stats["hit_ratio"] = served / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _scan_disk(self) -> List[Tuple[float, str, int]]:
+        """``(mtime, key, size)`` of every entry in the cache directory, oldest first."""
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue  # evicted by another worker meanwhile
+                    entries.append((stat.st_mtime, name[:-5], stat.st_size))
+        return sorted(entries)
+
+    def _sweep(self) -> None:
+        """
+        Measure the directory, which other workers write to as well, and
+        evict the least recently used files until it fits ``disk_max_bytes``.
+        The lock file keeps workers from sweeping at the same time.
+        """
+        if not self._sweep_lock.acquire(blocking=False):
+            return  # another thread is already sweeping
+        try:
+            with _locked_file(os.path.join(self.disk_dir, ".lock")):
+                entries = self._scan_disk()
+                total = sum(size for _, _, size in entries)
+                evicted = 0
+                # The newest entry always stays
+                while total > self.disk_max_bytes and len(entries) > 1:
+                    _, key, size = entries.pop(0)
+                    try:
+                        os.remove(self._path(key))
+                    except OSError:
+                        pass
+                    total -= size
+                    evicted += 1
+            with self._lock:
+                self._disk_index = OrderedDict((key, size) for _, key, size in entries)
+                self._disk_bytes = total
+                self._stats["disk_evictions"] += evicted
+                self._next_sweep = time.monotonic() + self.sweep_interval
+        except OSError as e:
+            logger.error("Failed to sweep the result cache directory: %s", e)
+        finally:
+            self._sweep_lock.release()
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.disk_dir:
+            return None
+        # Indexed or not: another worker may have written it
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+                size = os.fstat(f.fileno()).st_size
+            # The file's mtime is the recency every worker evicts by
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._forget_disk(key)
+            return None
+        except (OSError, ValueError):
+            with self._lock:
+                self._drop_disk(key)
+            return None
+        with self._lock:
+            self._index_disk(key, size)
+        return value
+
+    def _write_disk(self, key: str, value: Dict[str, Any]) -> None:
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            logger.error("Failed to write cache entry %s: %s", key, e)
+            return
+        with self._lock:
+            self._index_disk(key, size)
+            due = self._disk_bytes > self.disk_max_bytes or time.monotonic() >= self._next_sweep
+        if due:
+            self._sweep()
+
+    def _index_disk(self, key: str, size: int) -> None:
+        # Caller holds the lock
+        self._disk_bytes += size - self._disk_index.get(key, 0)
+        self._disk_index[key] = size
+        self._disk_index.move_to_end(key)
+
+    def _forget_disk(self, key: str) -> bool:
+        # Caller holds the lock
+        size = self._disk_index.pop(key, None)
+        if size is None:
+            return False
+        self._disk_bytes -= size
+        return True
+
+    def _drop_disk(self, key: str) -> bool:
+        # Caller holds the lock
+        indexed = self._forget_disk(key)
+        if not self.disk_dir:
+            return indexed
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            return indexed
+        return True
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Return the process-wide extraction result cache, creating it on first use."""
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache(
+                memory_entries=settings.RESULT_CACHE_MEMORY_ENTRIES,
+                disk_dir=settings.RESULT_CACHE_DIR,
+                disk_max_bytes=settings.RESULT_CACHE_DISK_MAX_BYTES
+            )
+        return _result_cache
@@ -0,0 +1,372 @@
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    cache_key TEXT NOT NULL UNIQUE,
+    content_hash TEXT NOT NULL,
+    filename TEXT,
+    content_type TEXT,
+    file_type TEXT,
+    size INTEGER,
+    page_count INTEGER,
+    characters INTEGER,
+    metadata TEXT,
+    created_at REAL NOT NULL,
+    last_seen_at REAL NOT NULL,
+    times_seen INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS documents_content_hash ON documents(content_hash);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    page INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_document ON pages(document_id, page);
+-- External-content index: the text is stored once, in pages
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+    text, content='pages', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS pages_ai AFTER INSERT ON pages BEGIN
+    INSERT INTO pages_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS pages_ad AFTER DELETE ON pages BEGIN
+    INSERT INTO pages_fts(pages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_DOCUMENT_COLUMNS = (
+    "id, cache_key, content_hash, filename, content_type, file_type, size, "
+    "page_count, characters, metadata, created_at, last_seen_at, times_seen"
+)
+
+_TERM = re.compile(r'"([^"]+)"|(\S+)')
+
+
+def to_match_query(query: str) -> str:
+    """
+    Turn user input into an FTS5 query that cannot be a syntax error.
+
+    Every term and ``"quoted phrase"`` is quoted, so operators and
+    punctuation are matched literally; a trailing ``*`` keeps prefix search.
+    Terms are ANDed.
+    """
+    terms = []
+    for phrase, word in _TERM.findall(query):
+        text = phrase or word
+        prefix = not phrase and text.endswith("*")
+        text = text.rstrip("*") if prefix else text
+        text = text.replace('"', "")
+        if text.strip():
+            terms.append(f'"{text}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def _document_row(row: sqlite3.Row) -> Dict[str, Any]:
+    document = dict(row)
+    document["metadata"] = json.loads(document["metadata"]) if document["metadata"] else {}
+    return document
+
+
+class ResultStore:
+    """
+    SQLite store of extraction results with an FTS5 index over page text.
+
+    Writes are queued and a single writer thread commits them in batches of
+    up to ``batch_size`` (or whatever arrived within ``flush_interval``), so
+    extraction requests never wait on the database. When the queue is full
+    new results are dropped and counted. Reads use one connection per
+    thread and run alongside the writer thanks to WAL mode.
+
+    A document is identified by its extraction cache key (content hash plus
+    extraction parameters); storing it again only bumps ``times_seen``.
+    """
+
+    def __init__(self, path: str, batch_size: int = 64, flush_interval: float = 0.5, queue_size: int = 1000):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"queued": 0, "dropped": 0, "documents_written": 0, "pages_written": 0,
+                       "duplicates": 0, "batches": 0, "write_errors": 0, "last_batch_ms": 0.0}
+        self._writer = threading.Thread(target=self._write_loop, name="result-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    def submit(
+        self,
+        cache_key: str,
+        content_hash: str,
+        result: Dict[str, Any],
+        page_texts: Optional[List[str]] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Queue an extraction result for storage without blocking.
+
+        ``page_texts`` holds the text of each page in page order; without it
+        the whole extracted text is stored as a single page. Returns False
+        when the queue is full and the result was dropped.
+        """
+        metadata = dict(metadata or {})
+        record = {
+            "cache_key": cache_key,
+            "content_hash": content_hash,
+            "filename": metadata.pop("filename", None),
+            "content_type": metadata.pop("content_type", None),
+            "file_type": metadata.pop("file_type", None),
+            "size": metadata.pop("size", None),
+            "characters": result.get("characters_extracted", 0),
+            "page_texts": page_texts if page_texts else [result.get("extracted_text", "")],
+            "metadata": metadata,
+            "seen_at": time.time(),
+        }
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += 1
+            logger.warning("Result store queue is full, dropping result", extra={"cache_key": cache_key})
+            return False
+        with self._lock:
+            self._stats["queued"] += 1
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued result is committed. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self) -> None:
+        """Commit what is queued and stop the writer."""
+        self._queue.put(None)
+        self._writer.join()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                first = self._queue.get()
+                batch = [first]
+                deadline = time.monotonic() + self.flush_interval
+                while first is not None and len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+                    if item is None:
+                        break
+                records = [record for record in batch if record is not None]
+                if records:
+                    self._write_batch(conn, records)
+                for _ in batch:
+                    self._queue.task_done()
+                if len(records) < len(batch):
+                    return
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, records: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        documents = pages = duplicates = 0
+        try:
+            with conn:
+                for record in records:
+                    row = conn.execute(
+                        "SELECT id FROM documents WHERE cache_key = ?", (record["cache_key"],)
+                    ).fetchone()
+                    if row is not None:
+                        conn.execute(
+                            "UPDATE documents SET last_seen_at = ?, times_seen = times_seen + 1 WHERE id = ?",
+                            (record["seen_at"], row["id"])
+                        )
+                        duplicates += 1
+                        continue
+                    cursor = conn.execute(
+                        "INSERT INTO documents (cache_key, content_hash, filename, content_type, file_type, size, "
+                        "page_count, characters, metadata, created_at, last_seen_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            record["cache_key"], record["content_hash"], record["filename"],
+                            record["content_type"], record["file_type"], record["size"],
+                            len(record["page_texts"]), record["characters"],
+                            json.dumps(record["metadata"], default=str), record["seen_at"], record["seen_at"]
+                        )
+                    )
+                    conn.executemany(
+                        "INSERT INTO pages (document_id, page, text) VALUES (?, ?, ?)",
+                        [(cursor.lastrowid, page, text) for page, text in enumerate(record["page_texts"])]
+                    )
+                    documents += 1
+                    pages += len(record["page_texts"])
+        except sqlite3.Error as e:
+            logger.error("Failed to write %d result(s) to the store: %s", len(records), e)
+            with self._lock:
+                self._stats["write_errors"] += len(records)
+            return
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["documents_written"] += documents
+            self._stats["pages_written"] += pages
+            self._stats["duplicates"] += duplicates
+            self._stats["last_batch_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        snippet_tokens: int = 16,
+        sort: str = "relevance",
+        before: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Pages matching ``query``, each with a highlighted snippet.
+
+        ``sort='relevance'`` orders by FTS5's bm25 ``rank`` and pages with
+        ``offset``; every match is scored, so very common terms cost more.
+        ``sort='recent'`` walks the index newest first and pages with the
+        ``before`` cursor (``next_before`` of the previous page), which
+        stays constant-time however many pages match. No total is counted;
+        ``has_more`` says whether another page of hits exists.
+        """
+        if sort not in ("relevance", "recent"):
+            raise ValueError(f"Unknown sort '{sort}'. Available: relevance, recent")
+        response: Dict[str, Any] = {"query": query, "sort": sort, "hits": [], "limit": limit, "has_more": False}
+        match = to_match_query(query)
+        if not match:
+            return response
+        sql = (
+            "SELECT p.id AS page_id, p.document_id, p.page, snippet(pages_fts, 0, '[', ']', '…', ?) AS snippet, "
+            "pages_fts.rank AS score, d.filename, d.content_hash, d.created_at "
+            "FROM pages_fts "
+            "JOIN pages p ON p.id = pages_fts.rowid "
+            "JOIN documents d ON d.id = p.document_id "
+            "WHERE pages_fts MATCH ? "
+        )
+        if sort == "relevance":
+            sql += "ORDER BY pages_fts.rank LIMIT ? OFFSET ?"
+            params: tuple = (snippet_tokens, match, limit + 1, offset)
+            response["offset"] = offset
+        else:
+            if before is not None:
+                sql += "AND pages_fts.rowid < ? "
+            sql += "ORDER BY pages_fts.rowid DESC LIMIT ?"
+            params = (snippet_tokens, match) + ((before,) if before is not None else ()) + (limit + 1,)
+        rows = self._reader().execute(sql, params).fetchall()
+        response["hits"] = [dict(row) for row in rows[:limit]]
+        response["has_more"] = len(rows) > limit
+        if sort == "recent":
+            response["next_before"] = response["hits"][-1]["page_id"] if response["has_more"] else None
+        return response
+
+    def list_documents(self, limit: int = 20, before: Optional[int] = None) -> Dict[str, Any]:
+        """Most recent documents first; pass ``next_before`` back as ``before`` for the next page."""
+        if before is None:
+            rows = self._reader().execute(
+                f"SELECT {_DOCUMENT_COLUMNS} FROM documents ORDER BY id DESC LIMIT ?", (limit + 1,)
+            ).fetchall()
+        else:
+            rows = self._reader().execute(
+                f"SELECT {_DOCUMENT_COLUMNS} FROM documents WHERE id < ? ORDER BY id DESC LIMIT ?",
+                (before, limit + 1)
+            ).fetchall()
+        documents = [_document_row(row) for row in rows[:limit]]
+        next_before = documents[-1]["id"] if len(rows) > limit else None
+        return {"documents": documents, "next_before": next_before}
+
+    def get_document(self, document_id: int) -> Optional[Dict[str, Any]]:
+        row = self._reader().execute(
+            f"SELECT {_DOCUMENT_COLUMNS} FROM documents WHERE id = ?", (document_id,)
+        ).fetchone()
+        return _document_row(row) if row is not None else None
+
+    def get_page(self, document_id: int, page: int) -> Optional[Dict[str, Any]]:
+        row = self._reader().execute(
+            "SELECT document_id, page, text FROM pages WHERE document_id = ? AND page = ?", (document_id, page)
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["path"] = self.path
+        return stats
+
+
+_result_store: Optional[ResultStore] = None
+_result_store_lock = threading.Lock()
+
+
+def get_result_store() -> Optional[ResultStore]:
+    """Return the process-wide result store, or None when it is disabled or cannot be opened."""
+    global _result_store
+    if not settings.RESULT_STORE_ENABLED:
+        return None
+    with _result_store_lock:
+        if _result_store is None:
+            try:
+                _result_store = ResultStore(
+                    settings.RESULT_STORE_PATH,
+                    batch_size=settings.RESULT_STORE_BATCH_SIZE,
+                    flush_interval=settings.RESULT_STORE_FLUSH_INTERVAL,
+                    queue_size=settings.RESULT_STORE_QUEUE_SIZE
+                )
+            except sqlite3.Error as e:
+                # e.g. an SQLite build without FTS5
+                logger.error("Failed to open the result store: %s", e)
+                return None
+        return _result_store
+
+
+def shutdown_result_store() -> None:
+    """Commit queued results and close the store."""
+    global _result_store
+    with _result_store_lock:
+        store, _result_store = _result_store, None
+    if store is not None:
+        store.close()
@@ -0,0 +1,225 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+from app.config import settings
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # optional; without it sessions are not cached
+    Fernet = None
+    InvalidToken = Exception
+
+logger = logging.getLogger(__name__)
+
+_STORAGE_SCRIPT = "return Object.assign({}, window.localStorage);"
+_RESTORE_STORAGE_SCRIPT = """
+var items = arguments[0];
+Object.keys(items).forEach(function (key) { window.localStorage.setItem(key, items[key]); });
+"""
+# Keys WebDriver accepts in add_cookie
+_COOKIE_FIELDS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
+
+
+def origin_of(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+
+def _derive_key(secret: str, purpose: bytes) -> bytes:
+    return hmac.new(secret.encode("utf-8"), purpose, hashlib.sha256).digest()
+
+
+class SessionCache:
+    """
+    Encrypted cache of logged-in browser state per (origin, username).
+
+    Each entry holds the cookies and localStorage captured after a
+    successful login plus a keyed hash of the password, so a changed
+    password never reuses an old session. Entries are Fernet tokens
+    encrypted with a key derived from ``secret``; Fernet's timestamp
+    enforces ``ttl``. With ``disk_dir`` set, tokens are also written there
+    and survive restarts.
+
+    Args:
+        secret: Key material, normally ``settings.SECRET_KEY``
+        ttl: Seconds a captured session is trusted
+        max_entries: In-memory entries kept (LRU)
+        disk_dir: Directory for persisted tokens ("" keeps them in memory only)
+    """
+
+    def __init__(self, secret: str, ttl: float, max_entries: int = 256, disk_dir: str = ""):
+        if Fernet is None:
+            raise RuntimeError("The 'cryptography' package is required for the session cache")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._fernet = Fernet(base64.urlsafe_b64encode(_derive_key(secret, b"session-cache")))
+        self._hash_key = _derive_key(secret, b"session-cache-id")
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _key(self, origin: str, username: str) -> str:
+        # Keyed hash, so neither the memory index nor file names reveal the user
+        return hmac.new(self._hash_key, f"{origin}\0{username}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def _password_hash(self, password: str) -> str:
+        return hmac.new(self._hash_key, password.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.session")
+
+    def get(self, origin: str, username: str, password: str) -> Optional[Dict[str, Any]]:
+        """Return the stored state, or None when missing, expired or for another password."""
+        key = self._key(origin, username)
+        with self._lock:
+            token = self._entries.get(key)
+            if token is not None:
+                self._entries.move_to_end(key)
+        if token is None and self.disk_dir:
+            try:
+                with open(self._path(key), "rb") as f:
+                    token = f.read()
+            except OSError:
+                token = None
+
+        state = None
+        if token is not None:
+            try:
+                state = json.loads(self._fernet.decrypt(token, ttl=int(self.ttl)))
+            except InvalidToken:
+                # Expired, or written with another SECRET_KEY
+                self.invalidate(origin, username)
+        if state is not None and not hmac.compare_digest(state.get("password", ""), self._password_hash(password)):
+            state = None
+
+        with self._lock:
+            if state is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return state
+
+    def put(
+        self,
+        origin: str,
+        username: str,
+        password: str,
+        cookies: List[Dict[str, Any]],
+        local_storage: Dict[str, str]
+    ) -> None:
+        key = self._key(origin, username)
+        token = self._fernet.encrypt(json.dumps({
+            "origin": origin,
+            "username": username,
+            "password": self._password_hash(password),
+            "cookies": cookies,
+            "local_storage": local_storage,
+            "saved_at": time.time(),
+        }).encode("utf-8"))
+        with self._lock:
+            self._entries[key] = token
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, mode=0o700, exist_ok=True)
+                tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(token)
+                os.replace(tmp_path, self._path(key))
+            except OSError as e:
+                logger.error("Failed to persist session for %s: %s", origin, e)
+
+    def invalidate(self, origin: str, username: str) -> None:
+        key = self._key(origin, username)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.disk_dir:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".session"):
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        pass
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 3) if lookups else None,
+                "persistent": bool(self.disk_dir),
+            }
+
+
+def capture_state(driver: Any) -> Dict[str, Any]:
+    """Cookies and localStorage of the page the driver is on."""
+    try:
+        local_storage = driver.execute_script(_STORAGE_SCRIPT) or {}
+    except Exception:
+        local_storage = {}
+    return {"cookies": driver.get_cookies(), "local_storage": local_storage}
+
+
+def restore_state(driver: Any, state: Dict[str, Any]) -> None:
+    """
+    Load captured cookies and localStorage into the driver.
+
+    The driver must already be on a page of the session's origin, since
+    WebDriver only sets cookies for the current domain. Reload afterwards.
+    """
+    driver.delete_all_cookies()
+    for cookie in state.get("cookies", []):
+        driver.add_cookie({field: cookie[field] for field in _COOKIE_FIELDS if field in cookie})
+    if state.get("local_storage"):
+        driver.execute_script(_RESTORE_STORAGE_SCRIPT, state["local_storage"])
+
+
+_session_cache: Optional[SessionCache] = None
+_session_cache_lock = threading.Lock()
+
+
+def get_session_cache() -> Optional[SessionCache]:
+    """
+    Return the process-wide session cache, or None when it is disabled or
+    ``cryptography`` is not installed.
+    """
+    global _session_cache
+    if not settings.SESSION_CACHE_ENABLED or Fernet is None:
+        return None
+    with _session_cache_lock:
+        if _session_cache is None:
+            if settings.SECRET_KEY == "your-secret-key-here":
+                logger.warning("SECRET_KEY is the default value; set it before caching sessions")
+            _session_cache = SessionCache(
+                secret=settings.SECRET_KEY,
+                ttl=settings.SESSION_CACHE_TTL,
+                max_entries=settings.SESSION_CACHE_MAX_ENTRIES,
+                disk_dir=settings.SESSION_CACHE_DIR
+            )
+        return _session_cache
@@ -0,0 +1,167 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from app.config import settings
+
+Band = Tuple[int, int]
+
+
+def row_ink(binary: np.ndarray) -> np.ndarray:
+    """Dark pixels per row of a binarized (dark text on light) image."""
+    return np.count_nonzero(binary < 128, axis=1)
+
+
+def find_text_bands(ink: np.ndarray, min_gap: int) -> List[Band]:
+    """
+    Cheap layout pass: group inked rows into bands separated by at least
+    ``min_gap`` blank rows.
+    """
+    inked = np.flatnonzero(ink > 0)
+    if inked.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(inked) > min_gap)
+    starts = np.concatenate(([inked[0]], inked[breaks + 1]))
+    ends = np.concatenate((inked[breaks], [inked[-1]])) + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def _quietest_row(ink: np.ndarray, center: int, radius: int) -> int:
+    lo = max(1, center - radius)
+    hi = min(len(ink) - 1, center + radius)
+    if hi <= lo:
+        return center
+    return lo + int(np.argmin(ink[lo:hi]))
+
+
+def plan_tiles(ink: np.ndarray, tile_height: int, overlap: int, min_gap: int) -> List[Band]:
+    """
+    Split the page into horizontal tiles of roughly ``tile_height`` rows.
+
+    Tiles are cut in the blank space between text bands where possible, so
+    no line is split. Where a band is taller than a tile (photos, dense
+    layouts) the cut snaps to the least inked row nearby and neighbouring
+    tiles overlap by ``overlap`` rows.
+    """
+    height = len(ink)
+    tiles: List[Band] = []
+    top = None
+    end = 0
+    for band_start, band_end in find_text_bands(ink, min_gap):
+        if top is None:
+            top = max(0, band_start - min_gap)
+        elif band_end - top > tile_height:
+            # Cut halfway through the gap before this band
+            cut = (end + band_start) // 2
+            tiles.append((top, cut))
+            top = cut
+        end = band_end
+        while end - top > tile_height:
+            cut = max(top + 1, _quietest_row(ink, top + tile_height, overlap))
+            tiles.append((top, min(height, cut + overlap)))
+            top = cut
+    if top is not None:
+        tiles.append((top, min(height, end + min_gap)))
+    return tiles
+
+
+def _common_lines(previous: List[str], following: List[str], max_lines: int) -> int:
+    """
+    How many leading lines of ``following`` repeat the end of ``previous``.
+
+    Only the longest run of up to ``max_lines`` text lines is matched; blank
+    lines are skipped when comparing, since OCR of the two tiles may break
+    paragraphs differently.
+    """
+    tail = [line.strip() for line in previous if line.strip()][-max_lines:]
+    head = [(index, line.strip()) for index, line in enumerate(following) if line.strip()][:max_lines]
+    for size in range(min(len(tail), len(head)), 0, -1):
+        if tail[-size:] == [line for _, line in head[:size]]:
+            return head[size - 1][0] + 1
+    return 0
+
+
+def _tile_lines(text: str) -> List[str]:
+    """Lines of one tile, with blank lines emptied and dropped at the tile's edges."""
+    lines = [line if line.strip() else "" for line in text.splitlines()]
+    while lines and not lines[-1]:
+        lines.pop()
+    start = 0
+    while start < len(lines) and not lines[start]:
+        start += 1
+    return lines[start:]
+
+
+def overlapping_boundaries(tiles: List[Band]) -> List[bool]:
+    """For each boundary between consecutive tiles, whether the two tiles share rows."""
+    return [bottom > next_top for (_, bottom), (next_top, _) in zip(tiles, tiles[1:])]
+
+
+def merge_tile_texts(
+    texts: List[str],
+    overlapping: Optional[List[bool]] = None,
+    max_overlap_lines: int = 5
+) -> str:
+    """
+    Join tile texts in reading order.
+
+    ``overlapping[i]`` tells whether tiles ``i`` and ``i + 1`` share rows
+    (see ``overlapping_boundaries``); lines repeated across such a boundary
+    are dropped once. Boundaries cut in a gap keep every line, since a
+    repeat there is real text. Blank lines inside a tile are kept.
+    """
+    merged: List[str] = []
+    for index, text in enumerate(texts):
+        lines = _tile_lines(text)
+        skip = 0
+        if index and overlapping and overlapping[index - 1]:
+            skip = _common_lines(merged, lines, max_overlap_lines)
+        merged.extend(lines[skip:])
+    return "\n".join(merged)
+
+
+_tile_executor: Optional[ThreadPoolExecutor] = None
+_tile_executor_lock = threading.Lock()
+
+
+def get_tile_executor() -> ThreadPoolExecutor:
+    global _tile_executor
+    with _tile_executor_lock:
+        if _tile_executor is None:
+            _tile_executor = ThreadPoolExecutor(
+                max_workers=settings.OCR_TILE_WORKERS or None,
+                thread_name_prefix="ocr-tile"
+            )
+        return _tile_executor
+
+
+def should_tile(image: np.ndarray) -> bool:
+    return settings.OCR_TILE_MIN_PIXELS > 0 and image.shape[0] * image.shape[1] >= settings.OCR_TILE_MIN_PIXELS
+
+
+def ocr_tiled(image: np.ndarray, recognize: Callable[[np.ndarray], str]) -> str:
+    """
+    OCR a large binarized image as horizontal tiles in parallel.
+
+    Tile views share the image buffer; ``recognize`` is called once per tile
+    from the tile executor, and results are merged in top-to-bottom order.
+    """
+    ink = row_ink(image)
+    tiles = plan_tiles(
+        ink,
+        tile_height=settings.OCR_TILE_HEIGHT,
+        overlap=settings.OCR_TILE_OVERLAP,
+        min_gap=settings.OCR_TILE_MIN_GAP
+    )
+    if len(tiles) <= 1:
+        return recognize(image)
+    futures = [get_tile_executor().submit(recognize, image[top:bottom]) for top, bottom in tiles]
+    return merge_tile_texts([future.result() for future in futures], overlapping_boundaries(tiles))
+
+
+def shutdown_tile_executor() -> None:
+    global _tile_executor
+    with _tile_executor_lock:
+        executor, _tile_executor = _tile_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,190 @@
+import contextvars
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from app.config import settings
+
+_TRACE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Trace:
+    """
+    The span timeline of one request.
+
+    Span offsets are relative to the start of the trace. Spans recorded after
+    the response was sent (background jobs, streamed bodies) still land on
+    the trace because the context is copied into worker threads.
+    """
+
+    def __init__(self, name: str, trace_id: Optional[str] = None, max_spans: int = 1000):
+        self.id = trace_id or uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.max_spans = max_spans
+        self.duration_ms: Optional[float] = None
+        self.status: Optional[int] = None
+        self.dropped_spans = 0
+        self._spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add_span(self, span: Dict[str, Any]) -> None:
+        with self._lock:
+            if len(self._spans) >= self.max_spans:
+                self.dropped_spans += 1
+                return
+            self._spans.append(span)
+
+    def finish(self, status: int) -> None:
+        self.status = status
+        self.duration_ms = round((time.perf_counter() - self.origin) * 1000, 3)
+
+    def to_dict(self, include_spans: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self._spans, key=lambda s: s["start_ms"])
+        data = {
+            "trace_id": self.id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "span_count": len(spans),
+            "dropped_spans": self.dropped_spans,
+        }
+        if include_spans:
+            data["spans"] = spans
+        return data
+
+
+class TraceStore:
+    """Bounded history of recent traces, oldest evicted first."""
+
+    def __init__(self, history_size: int = 200):
+        self.history_size = history_size
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces[trace.id] = trace
+            self._traces.move_to_end(trace.id)
+            while len(self._traces) > self.history_size:
+                self._traces.popitem(last=False)
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            return self._traces.get(trace_id)
+
+    def list(self, limit: int = 50) -> List[Trace]:
+        with self._lock:
+            traces = list(self._traces.values())
+        return traces[::-1][:limit]
+
+
+_trace_store: Optional[TraceStore] = None
+_trace_store_lock = threading.Lock()
+
+
+def get_trace_store() -> TraceStore:
+    global _trace_store
+    with _trace_store_lock:
+        if _trace_store is None:
+            _trace_store = TraceStore(settings.TRACE_HISTORY_SIZE)
+        return _trace_store
+
+
+def valid_trace_id(value: Optional[str]) -> bool:
+    return bool(value) and bool(_TRACE_ID_PATTERN.match(value))
+
+
+def start_trace(name: str, trace_id: Optional[str] = None) -> contextvars.Token:
+    """Start a trace in the current context; pass the token to ``end_trace``."""
+    trace = Trace(name, trace_id if valid_trace_id(trace_id) else None, settings.TRACE_MAX_SPANS)
+    get_trace_store().add(trace)
+    return _current_trace.set(trace)
+
+
+def end_trace(token: contextvars.Token, status: int) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.finish(status)
+    _current_trace.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.id if trace is not None else None
+
+
+def current_span_id() -> Optional[str]:
+    return _current_span.get()
+
+
+def _span_record(
+    trace: Trace,
+    name: str,
+    span_id: str,
+    started: float,
+    ended: float,
+    status: str,
+    attrs: Dict[str, Any]
+) -> Dict[str, Any]:
+    record = {
+        "span_id": span_id,
+        "parent_id": _current_span.get(),
+        "name": name,
+        "thread": threading.current_thread().name,
+        "start_ms": round((started - trace.origin) * 1000, 3),
+        "duration_ms": round((ended - started) * 1000, 3),
+        "status": status,
+    }
+    if attrs:
+        record["attrs"] = attrs
+    return record
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Record a span for the enclosed block on the current trace.
+
+    Yields the span's attribute dict so the block can add results to it.
+    Outside a trace this only yields.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield attrs
+        return
+    span_id = uuid.uuid4().hex[:16]
+    token = _current_span.set(span_id)
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield attrs
+    except BaseException as e:
+        status = "error"
+        attrs["error"] = str(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        trace.add_span(_span_record(trace, name, span_id, started, time.perf_counter(), status, attrs))
+
+
+def record_span(name: str, started: float, ended: Optional[float] = None, **attrs: Any) -> None:
+    """Add an already measured block (``perf_counter`` timestamps) as a child of the current span."""
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    ended = time.perf_counter() if ended is None else ended
+    trace.add_span(_span_record(trace, name, uuid.uuid4().hex[:16], started, ended, "ok", attrs))
@@ -0,0 +1,100 @@
+import mmap
+import os
+import tempfile
+from typing import Optional, Union
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload grows past the configured size limit."""
+
+
+class DocumentBuffer:
+    """
+    Document contents held in memory, or spooled to a temporary file once
+    they grow past ``spool_threshold`` bytes.
+
+    Spooled documents are exposed through a read-only memory map, so callers
+    get a bytes-like view without loading the file into the Python heap.
+
+    Args:
+        max_size: Reject writes that would grow the document past this size
+        spool_threshold: Size at which the contents move to a temp file
+    """
+
+    def __init__(self, max_size: int, spool_threshold: int):
+        self.max_size = max_size
+        self.spool_threshold = spool_threshold
+        self.size = 0
+        self.path: Optional[str] = None
+        self._memory: Optional[bytearray] = bytearray()
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DocumentBuffer":
+        buffer = cls(max_size=len(data), spool_threshold=len(data))
+        buffer.write(data)
+        return buffer
+
+    @property
+    def spooled(self) -> bool:
+        return self.path is not None
+
+    def write(self, chunk: bytes) -> None:
+        if self.size + len(chunk) > self.max_size:
+            raise UploadTooLarge(f"File size exceeds maximum allowed size of {self.max_size} bytes")
+        if self._file is None and self.size + len(chunk) > self.spool_threshold:
+            self._rollover()
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._memory.extend(chunk)
+        self.size += len(chunk)
+
+    def flush(self) -> None:
+        """Push buffered writes to the temp file; call before handing ``path`` to anything else."""
+        if self._file is not None:
+            self._file.flush()
+
+    def view(self) -> Union[memoryview, mmap.mmap]:
+        """Return a zero-copy, bytes-like view of the contents."""
+        if self._file is None:
+            return memoryview(self._memory)
+        if self._mmap is None:
+            self.flush()
+            if self.size == 0:
+                return memoryview(b"")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def getvalue(self) -> bytes:
+        """Return the contents as ``bytes`` (copies; prefer ``view`` or ``path``)."""
+        return bytes(self.view())
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self.path = None
+        self._memory = None
+
+    def __enter__(self) -> "DocumentBuffer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _rollover(self) -> None:
+        self._file = tempfile.NamedTemporaryFile(delete=False, prefix="upload-")
+        self.path = self._file.name
+        if self._memory:
+            self._file.write(self._memory)
+        self._memory = bytearray()
+
+
+DocumentSource = Union[bytes, DocumentBuffer]
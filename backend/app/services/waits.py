@@ -0,0 +1,246 @@
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from app.config import settings
+from app.services.metrics import WAIT_DURATION
+from app.services.tracing import record_span
+
+Locator = Tuple[str, str]
+
+# Installs a MutationObserver on first call and reports milliseconds since the
+# last DOM mutation, so DOM stability can be polled without serialising the page.
+_DOM_QUIET_SCRIPT = """
+if (!window.__automationLastMutation) {
+    window.__automationLastMutation = performance.now();
+    new MutationObserver(function () {
+        window.__automationLastMutation = performance.now();
+    }).observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+return performance.now() - window.__automationLastMutation;
+"""
+
+_NETWORK_STATE_SCRIPT = """
+return [document.readyState, performance.getEntriesByType('resource').length];
+"""
+
+
+class WaitRecorder:
+    """
+    Keeps recent wait durations per (host, condition) and derives timeouts.
+
+    Once a host has enough samples, the timeout for a condition becomes the
+    observed p95 multiplied by ``factor``, clamped to ``[min_timeout, max_timeout]``.
+    Timeouts are kept as outcomes too, so callers can stop waiting on a
+    condition a host never meets.
+    """
+
+    def __init__(
+        self,
+        default_timeout: float = 10.0,
+        min_timeout: float = 2.0,
+        max_timeout: float = 30.0,
+        factor: float = 3.0,
+        history_size: int = 50,
+        min_samples: int = 5
+    ):
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.factor = factor
+        self.min_samples = min_samples
+        self._samples: Dict[Tuple[str, str], Deque[float]] = defaultdict(lambda: deque(maxlen=history_size))
+        # True for a met condition, False for a timeout
+        self._outcomes: Dict[Tuple[str, str], Deque[bool]] = defaultdict(lambda: deque(maxlen=history_size))
+        self._lock = threading.Lock()
+
+    def record(self, host: str, condition: str, elapsed: float) -> None:
+        with self._lock:
+            self._samples[(host, condition)].append(elapsed)
+            self._outcomes[(host, condition)].append(True)
+
+    def record_timeout(self, host: str, condition: str) -> None:
+        with self._lock:
+            self._outcomes[(host, condition)].append(False)
+
+    def keeps_timing_out(self, host: str, condition: str) -> bool:
+        """True when each of the last ``min_samples`` waits for ``condition`` on ``host`` timed out."""
+        with self._lock:
+            recent = list(self._outcomes.get((host, condition), ()))[-self.min_samples:]
+        return len(recent) >= self.min_samples and not any(recent)
+
+    def timeout_for(self, host: str, condition: str) -> float:
+        with self._lock:
+            samples = sorted(self._samples.get((host, condition), ()))
+        if len(samples) < self.min_samples:
+            return self.default_timeout
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return max(self.min_timeout, min(self.max_timeout, p95 * self.factor))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            items = [
+                (key, list(self._samples.get(key, ())), list(outcomes)) for key, outcomes in self._outcomes.items()
+            ]
+        stats: Dict[str, Dict[str, Any]] = {}
+        for (host, condition), values, outcomes in items:
+            stats.setdefault(host, {})[condition] = {
+                "samples": len(values),
+                "timeouts": outcomes.count(False),
+                "mean": sum(values) / len(values) if values else 0.0,
+                "timeout": self.timeout_for(host, condition),
+            }
+        return stats
+
+
+class WaitEngine:
+    """
+    Explicit, condition-based waits for a single automation run.
+
+    Every wait is recorded in ``timings`` with the step name, the condition,
+    the timeout used and how long it actually took.
+
+    Args:
+        driver: WebDriver to poll
+        recorder: Shared recorder used for adaptive per-host timeouts
+        timeouts: Optional per-step timeout overrides in seconds
+    """
+
+    def __init__(
+        self,
+        driver: WebDriver,
+        recorder: Optional[WaitRecorder] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        poll_frequency: Optional[float] = None
+    ):
+        self.driver = driver
+        self.recorder = recorder or get_wait_recorder()
+        self.timeouts = timeouts or {}
+        self.poll_frequency = poll_frequency or settings.WAIT_POLL_INTERVAL
+        self.timings: List[Dict[str, Any]] = []
+
+    def until(
+        self,
+        step: str,
+        condition: str,
+        predicate: Callable[[WebDriver], Any],
+        timeout: Optional[float] = None,
+        required: bool = True
+    ) -> Any:
+        """
+        Poll ``predicate`` until it returns a truthy value.
+
+        Raises TimeoutException when ``required`` and the condition is not met,
+        otherwise returns None on timeout.
+        """
+        host = self._host()
+        if timeout is None:
+            timeout = self.timeouts.get(step, self.recorder.timeout_for(host, condition))
+        start = time.perf_counter()
+        try:
+            value = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(predicate)
+        except TimeoutException:
+            self._log(step, condition, host, timeout, time.perf_counter() - start, False)
+            self.recorder.record_timeout(host, condition)
+            if required:
+                raise TimeoutException(f"Timed out after {timeout:.1f}s waiting for {condition} ({step})")
+            return None
+        elapsed = time.perf_counter() - start
+        self._log(step, condition, host, timeout, elapsed, True)
+        self.recorder.record(host, condition, elapsed)
+        return value
+
+    def element_present(self, step: str, locator: Locator, **kwargs: Any) -> Any:
+        return self.until(step, "element_present", EC.presence_of_element_located(locator), **kwargs)
+
+    def element_clickable(self, step: str, locator: Locator, **kwargs: Any) -> Any:
+        return self.until(step, "element_clickable", EC.element_to_be_clickable(locator), **kwargs)
+
+    def url_changes(self, step: str, old_url: str, **kwargs: Any) -> Any:
+        return self.until(step, "url_change", EC.url_changes(old_url), **kwargs)
+
+    def network_idle(self, step: str, idle_time: Optional[float] = None, **kwargs: Any) -> Any:
+        """Wait for the document to finish loading and no new resources to start for ``idle_time``."""
+        idle_time = settings.WAIT_NETWORK_IDLE_PERIOD if idle_time is None else idle_time
+        state = {"count": -1, "since": time.perf_counter()}
+
+        def idle(driver: WebDriver) -> bool:
+            ready_state, count = driver.execute_script(_NETWORK_STATE_SCRIPT)
+            now = time.perf_counter()
+            if count != state["count"]:
+                state["count"], state["since"] = count, now
+            return ready_state == "complete" and now - state["since"] >= idle_time
+
+        return self.until(step, "network_idle", idle, **kwargs)
+
+    def dom_stable(self, step: str, quiet_period: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Wait until the DOM has not mutated for ``quiet_period`` seconds.
+
+        A best-effort wait (``required=False``) only gives late mutations a
+        chance to land, so it stops ``WAIT_SETTLE_GRACE`` seconds after the
+        quiet period, or after a single quiet period on a host whose DOM
+        has not settled in any recent wait.
+        """
+        quiet = settings.WAIT_DOM_QUIET_PERIOD if quiet_period is None else quiet_period
+        quiet_ms = quiet * 1000
+        if not kwargs.get("required", True) and kwargs.get("timeout") is None and step not in self.timeouts:
+            host = self._host()
+            if self.recorder.keeps_timing_out(host, "dom_stable"):
+                cap = quiet + self.poll_frequency
+            else:
+                cap = quiet + settings.WAIT_SETTLE_GRACE
+            kwargs["timeout"] = min(self.recorder.timeout_for(host, "dom_stable"), cap)
+
+        def stable(driver: WebDriver) -> bool:
+            return driver.execute_script(_DOM_QUIET_SCRIPT) >= quiet_ms
+
+        return self.until(step, "dom_stable", stable, **kwargs)
+
+    def total_time(self) -> float:
+        return sum(t["elapsed"] for t in self.timings)
+
+    def _host(self) -> str:
+        try:
+            return urlparse(self.driver.current_url).netloc or "unknown"
+        except Exception:
+            return "unknown"
+
+    def _log(self, step: str, condition: str, host: str, timeout: float, elapsed: float, ok: bool) -> None:
+        ended = time.perf_counter()
+        record_span("wait", ended - elapsed, ended, step=step, condition=condition, met=ok)
+        if settings.METRICS_ENABLED:
+            WAIT_DURATION.observe(elapsed, condition=condition, met=str(ok).lower())
+        self.timings.append({
+            "step": step,
+            "condition": condition,
+            "host": host,
+            "timeout": round(timeout, 3),
+            "elapsed": round(elapsed, 3),
+            "ok": ok,
+        })
+
+
+_wait_recorder: Optional[WaitRecorder] = None
+_wait_recorder_lock = threading.Lock()
+
+
+def get_wait_recorder() -> WaitRecorder:
+    """Return the process-wide wait recorder, creating it on first use."""
+    global _wait_recorder
+    with _wait_recorder_lock:
+        if _wait_recorder is None:
+            _wait_recorder = WaitRecorder(
+                default_timeout=settings.WAIT_DEFAULT_TIMEOUT,
+                min_timeout=settings.WAIT_MIN_TIMEOUT,
+                max_timeout=settings.WAIT_MAX_TIMEOUT,
+                factor=settings.WAIT_ADAPTIVE_FACTOR,
+                history_size=settings.WAIT_HISTORY_SIZE,
+                min_samples=settings.WAIT_MIN_SAMPLES
+            )
+        return _wait_recorder
@@ -1,79 +1,259 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
-import time
+from functools import lru_cache
+import logging
+import threading
+from app.config import settings
+from app.services.browser_profiles import (
+    BASELINE_PROFILE, BrowserProfile, drain_network_log, get_profile_ledger, read_network_log, resolve_profile
+)
+from app.services import http_engine
+from app.services.driver_pool import DriverPool
+from app.services.jobs import report_progress
+from app.services.metrics import instrument
+from app.services.session_cache import capture_state, get_session_cache, origin_of, restore_state
+from app.services.tracing import span
+from app.services.web_extraction import click_next, compile_schema, extract_page, iter_pages
+from app.services.waits import WaitEngine, get_wait_recorder
 
-def init_driver(headless: bool = True) -> WebDriver:
-    """Initialize and return a Chrome WebDriver instance."""
+logger = logging.getLogger(__name__)
+
+_driver_pools: Dict[str, DriverPool] = {}
+_driver_pool_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def get_driver_path() -> str:
+    """Resolve the chromedriver binary once per process."""
+    return ChromeDriverManager().install()
+
+@instrument("init_driver")
+def init_driver(profile: Optional[BrowserProfile] = None) -> WebDriver:
+    """Initialize and return a Chrome WebDriver instance configured by ``profile``."""
+    profile = profile or resolve_profile("", BASELINE_PROFILE)
     chrome_options = Options()
-    if headless:
+    if profile.headless:
         chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--window-size=%d,%d" % profile.viewport)
+    if profile.disk_cache_dir:
+        chrome_options.add_argument(f"--disk-cache-dir={profile.disk_cache_dir}")
+    chrome_options.page_load_strategy = profile.page_load_strategy
+    if "image" in profile.block_resources:
+        # Stops image decoding as well as the requests the URL rules catch
+        chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    # Network events feed the per-profile traffic counts
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
     
-    service = Service(ChromeDriverManager().install())
+    service = Service(get_driver_path())
     driver = webdriver.Chrome(service=service, options=chrome_options)
+    blocked_urls = profile.blocked_urls
+    if blocked_urls:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
     return driver
 
-def login(driver: WebDriver, url: str, username: str, password: str) -> Dict[str, Any]:
+def get_driver_pool(profile: Optional[BrowserProfile] = None) -> DriverPool:
+    """Return the process-wide WebDriver pool for ``profile``, creating it on first use."""
+    profile = profile or resolve_profile("", BASELINE_PROFILE)
+    with _driver_pool_lock:
+        pool = _driver_pools.get(profile.name)
+        if pool is None:
+            pool = _driver_pools[profile.name] = DriverPool(
+                factory=lambda: init_driver(profile),
+                size=settings.DRIVER_POOL_SIZE,
+                max_uses=settings.DRIVER_POOL_MAX_USES,
+                idle_timeout=settings.DRIVER_POOL_IDLE_TIMEOUT
+            )
+        return pool
+
+def get_driver_pool_stats() -> Dict[str, Any]:
+    """Usage statistics of every profile's driver pool."""
+    with _driver_pool_lock:
+        pools = dict(_driver_pools)
+    return {name: pool.stats() for name, pool in pools.items()}
+
+def warm_driver_pool() -> int:
+    """Start the configured number of browser sessions of the default profile ahead of the first request."""
+    if settings.DRIVER_POOL_PREWARM <= 0:
+        return 0
+    profile = resolve_profile("", settings.BROWSER_PROFILE_DEFAULT)
+    return get_driver_pool(profile).prewarm(settings.DRIVER_POOL_PREWARM)
+
+def shutdown_driver_pool() -> None:
+    """Quit all pooled browser sessions."""
+    with _driver_pool_lock:
+        pools = list(_driver_pools.values())
+        _driver_pools.clear()
+    for pool in pools:
+        pool.close()
+
+@instrument("login")
+def login(
+    driver: WebDriver,
+    url: str,
+    username: str,
+    password: str,
+    waits: Optional[WaitEngine] = None
+) -> Dict[str, Any]:
     """Handle website login."""
+    waits = waits or WaitEngine(driver)
     try:
-        print(f"[INFO] Navigating to login page: {url}")
-        driver.get(url)
-        time.sleep(2)  # Wait for page to load
+        logger.info("Navigating to login page", extra={"url": url})
+        report_progress("Logging in", url=url)
+        with span("navigate", url=url):
+            driver.get(url)
         
         # These selectors are just examples and should be updated based on the target website
-        username_field = driver.find_element(By.NAME, "username")
+        username_field = waits.element_present("login_form", (By.NAME, "username"))
         password_field = driver.find_element(By.NAME, "password")
-        login_button = driver.find_element(By.XPATH, "//button[contains(text(), 'Sign In')]")
+        login_button = waits.element_clickable("login_button", (By.XPATH, "//button[contains(text(), 'Sign In')]"))
         
         username_field.send_keys(username)
         password_field.send_keys(password)
+        start_url = driver.current_url
         login_button.click()
         
-        time.sleep(2)  # Wait for login to complete
-        print("[SUCCESS] Logged in successfully.")
+        # Done once we leave the login page or the form is replaced in place
+        waits.until(
+            "login_submit",
+            "login_complete",
+            EC.any_of(EC.url_changes(start_url), EC.staleness_of(login_button))
+        )
+        waits.dom_stable("login_settle", required=False)
+        logger.info("Logged in successfully")
         return {"status": "success", "message": "Successfully logged in"}
     except Exception as e:
-        print("[ERROR] Login failed:", str(e))
+        logger.error("Login failed: %s", e)
         return {"status": "error", "message": str(e)}
 
-def search(driver: WebDriver, query: str) -> Dict[str, Any]:
-    """Perform a search on the current page."""
+def is_logged_in(driver: WebDriver) -> bool:
+    """A page that still shows the login form is treated as logged out."""
+    # Same example selector as login(); update both for the target website
+    return not driver.find_elements(By.NAME, "username")
+
+@instrument("restore_session")
+def restore_session(
+    driver: WebDriver,
+    url: str,
+    username: str,
+    password: str,
+    waits: Optional[WaitEngine] = None
+) -> bool:
+    """
+    Load a cached session for (origin, username) and check it is still valid.
+
+    The driver must already be on ``url``. Expired or rejected sessions are
+    dropped from the cache and False is returned so the caller logs in.
+    """
+    cache = get_session_cache()
+    if cache is None:
+        return False
+    origin = origin_of(url)
+    state = cache.get(origin, username, password)
+    if state is None:
+        return False
+    waits = waits or WaitEngine(driver)
     try:
+        report_progress("Restoring cached session", url=url)
+        restore_state(driver, state)
+        with span("navigate", url=url):
+            driver.get(url)
+        waits.dom_stable("session_check", required=False)
+        if is_logged_in(driver):
+            logger.info("Restored cached session", extra={"origin": origin})
+            return True
+    except Exception as e:
+        logger.error("Failed to restore cached session: %s", e)
+    cache.invalidate(origin, username)
+    return False
+
+def save_session(driver: WebDriver, url: str, username: str, password: str) -> None:
+    """Cache the current cookies and localStorage after a successful login."""
+    cache = get_session_cache()
+    if cache is None:
+        return
+    try:
+        state = capture_state(driver)
+        cache.put(origin_of(url), username, password, state["cookies"], state["local_storage"])
+    except Exception as e:
+        logger.error("Failed to cache session: %s", e)
+
+@instrument("search")
+def search(
+    driver: WebDriver,
+    query: str,
+    waits: Optional[WaitEngine] = None,
+    schema: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Perform a search on the current page.
+
+    With a compiled extraction ``schema`` the matching records are read in
+    the same script call that counts them.
+    """
+    waits = waits or WaitEngine(driver)
+    try:
+        report_progress("Searching", query=query)
         # These selectors are just examples and should be updated based on the target website
-        search_box = driver.find_element(By.NAME, "q")
-        search_button = driver.find_element(By.XPATH, "//button[@type='submit']")
+        search_box = waits.element_present("search_form", (By.NAME, "q"))
+        search_button = waits.element_clickable("search_button", (By.XPATH, "//button[@type='submit']"))
         
         search_box.clear()
         search_box.send_keys(query)
+        start_url = driver.current_url
         search_button.click()
         
-        time.sleep(2)  # Wait for search results
+        # Pages with no matches render no .search-result, so this wait is best-effort
+        waits.until(
+            "search_submit",
+            "search_results",
+            EC.any_of(
+                EC.url_changes(start_url),
+                EC.presence_of_element_located((By.CSS_SELECTOR, ".search-result"))
+            ),
+            required=False
+        )
+        waits.dom_stable("search_settle", required=False)
         
+        if schema is not None:
+            page = extract_page(driver, schema)
+            logger.info("Found %d search results", page["total"], extra={"results_count": page["total"]})
+            return {
+                "status": "success",
+                "message": f"Found {page['total']} search results",
+                "results_count": page["total"],
+                "results": page["records"]
+            }
+
         # Get search results (example)
         results = driver.find_elements(By.CSS_SELECTOR, ".search-result")
-        print(f"[INFO] Found {len(results)} search results.")
+        logger.info("Found %d search results", len(results), extra={"results_count": len(results)})
         return {
             "status": "success",
             "message": f"Found {len(results)} search results",
             "results_count": len(results)
         }
     except Exception as e:
-        print("[ERROR] Search failed:", str(e))
+        logger.error("Search failed: %s", e)
         return {"status": "error", "message": str(e)}
 
 def automate_web_interaction(
     url: str, 
     username: Optional[str] = None, 
     password: Optional[str] = None, 
-    search_query: Optional[str] = None
+    search_query: Optional[str] = None,
+    wait_timeouts: Optional[Dict[str, float]] = None,
+    engine: Optional[str] = None,
+    browser_profile: Optional[str] = None,
+    extract: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Main function to handle web automation.
@@ -83,40 +263,173 @@ def automate_web_interaction(
         username: Username for login (if required)
         password: Password for login (if required)
         search_query: Text to search for (if any)
+        wait_timeouts: Per-step wait timeouts in seconds, overriding the adaptive defaults
+        engine: 'http', 'browser' or 'auto' (default ``WEB_ENGINE_DEFAULT``). 'auto'
+            tries plain HTTP first and falls back to the browser when the page
+            needs JavaScript (a missing form, or a search without result
+            nodes), remembering the outcome per host
+        browser_profile: Browser profile name; defaults to the host's entry in
+            ``BROWSER_PROFILE_BY_HOST``, then ``BROWSER_PROFILE_DEFAULT``
+        extract: Extraction schema (see ``web_extraction.compile_schema``) for
+            structured search results
         
     Returns:
         Dict containing the result of the automation
     """
-    driver = None
+    engine = engine or settings.WEB_ENGINE_DEFAULT
+    fallback_reason = None
     try:
-        print("[INFO] Initializing browser...")
-        driver = init_driver(headless=False)
-        result = {}
+        schema = compile_schema(extract) if extract else None
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    if engine == "http" and not http_engine.available():
+        return {"status": "error", "message": "The 'beautifulsoup4' package is required for the http engine"}
+    if engine == "http" or (
+        engine == "auto" and http_engine.available() and http_engine.host_verdict(url) != "browser"
+    ):
+        try:
+            # Results may be rendered by script even when the forms are served as HTML
+            return http_engine.run_http_interaction(
+                url, username, password, search_query, schema, require_results=engine == "auto"
+            )
+        except http_engine.NeedsBrowser as e:
+            if engine == "http":
+                return {"engine": "http", "status": "error", "message": str(e)}
+            logger.info("Falling back to the browser: %s", e, extra={"url": url})
+            http_engine.remember_verdict(url, "browser")
+            fallback_reason = str(e)
 
-        print(f"[INFO] Navigating to: {url}")
+    try:
+        profile = resolve_profile(url, browser_profile)
+    except ValueError as e:
+        return {"engine": "browser", "status": "error", "message": str(e)}
+    pool = get_driver_pool(profile)
+    pool.reap_idle()
+    try:
+        logger.info("Leasing browser session", extra={"profile": profile.name})
+        report_progress("Waiting for a browser session")
+        with pool.lease(timeout=settings.DRIVER_POOL_ACQUIRE_TIMEOUT) as driver:
+            drain_network_log(driver)
+            waits = WaitEngine(driver, timeouts=wait_timeouts)
+            result = _run_web_interaction(driver, waits, url, username, password, search_query, schema)
+            traffic = read_network_log(driver)
+        result["network"] = {
+            "profile": profile.name,
+            **traffic,
+            "saved": get_profile_ledger().record(profile.name, url, traffic)
+        }
+    except Exception as e:
+        logger.error("Web automation failed: %s", e)
+        result = {"status": "error", "message": str(e)}
+    result["engine"] = "browser"
+    if fallback_reason:
+        result["fallback_reason"] = fallback_reason
+    return result
+
+def _run_web_interaction(
+    driver: WebDriver,
+    waits: WaitEngine,
+    url: str,
+    username: Optional[str],
+    password: Optional[str],
+    search_query: Optional[str],
+    schema: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Run the navigate/login/search flow on an already leased driver."""
+    result = {}
+
+    logger.info("Navigating", extra={"url": url})
+    report_progress("Navigating", url=url)
+    with span("navigate", url=url):
         driver.get(url)
-        time.sleep(2)
-        
-        if username and password:
-            login_result = login(driver,url, username, password)
-            result["login"] = login_result
-            if login_result.get("status") == "error":
-                return result
+    waits.dom_stable("page_load", required=False)
+
+    if username and password:
+        if restore_session(driver, url, username, password, waits=waits):
+            login_result = {"status": "success", "message": "Restored cached session", "session_cached": True}
         else:
-            print(f"[INFO] Opening public site: {url}")
-            
-        
-        if search_query:
-            search_result = search(driver, search_query)
-            result["search"] = search_result
-        
-        result["status"] = "success"
-        result["message"] = "Web automation completed successfully"
-        print("[SUCCESS] Automation completed.")
-        return result
-    except Exception as e:
-        print("Login failed:", str(e))
-        return {"status": "error", "message": str(e)}
-    # finally:
-    #     if driver:
-    #         driver.quit()
+            login_result = login(driver, url, username, password, waits=waits)
+            if login_result.get("status") == "success":
+                save_session(driver, url, username, password)
+        result["login"] = login_result
+        if login_result.get("status") == "error":
+            result["waits"] = waits.timings
+            return result
+    else:
+        logger.info("Opening public site", extra={"url": url})
+
+    if search_query:
+        search_result = search(driver, search_query, waits=waits, schema=schema)
+        result["search"] = search_result
+
+    result["waits"] = waits.timings
+    result["wait_time"] = round(waits.total_time(), 3)
+
+    result["status"] = "success"
+    result["message"] = "Web automation completed successfully"
+    logger.info("Automation completed")
+    return result
+
+def iter_extraction(
+    url: str,
+    schema: Dict[str, Any],
+    limit: Optional[int] = None,
+    max_pages: Optional[int] = None,
+    engine: Optional[str] = None,
+    browser_profile: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield pages of typed records extracted from ``url`` and the pages its
+    ``next_page`` control leads to, stopping after ``limit`` records or
+    ``max_pages`` pages (default ``EXTRACT_MAX_PAGES``).
+
+    Engines are chosen as in ``automate_web_interaction``. In 'auto' mode a
+    first page without any item node in its HTML is retried in the browser.
+    Raises ValueError for an invalid schema or profile.
+    """
+    schema = compile_schema(schema)
+    max_pages = max(1, min(max_pages or settings.EXTRACT_MAX_PAGES, settings.EXTRACT_MAX_PAGES))
+    engine = engine or settings.WEB_ENGINE_DEFAULT
+    if engine == "http" and not http_engine.available():
+        raise ValueError("The 'beautifulsoup4' package is required for the http engine")
+    if engine == "http" or (
+        engine == "auto" and http_engine.available() and http_engine.host_verdict(url) != "browser"
+    ):
+        try:
+            yield from http_engine.iter_http_extraction(
+                url, schema, limit=limit, max_pages=max_pages, require_items=engine == "auto"
+            )
+            return
+        except http_engine.NeedsBrowser as e:
+            if engine == "http":
+                raise
+            logger.info("Falling back to the browser: %s", e, extra={"url": url})
+            http_engine.remember_verdict(url, "browser")
+
+    profile = resolve_profile(url, browser_profile)
+    with get_driver_pool(profile).lease(timeout=settings.DRIVER_POOL_ACQUIRE_TIMEOUT) as driver:
+        waits = WaitEngine(driver)
+        report_progress("Navigating", url=url)
+        with span("navigate", url=url):
+            driver.get(url)
+        waits.dom_stable("page_load", required=False)
+
+        def follow(page: Dict[str, Any]) -> bool:
+            report_progress("Next page", url=page["next_url"] or page["url"])
+            if page["next_url"]:
+                with span("navigate", url=page["next_url"]):
+                    driver.get(page["next_url"])
+            elif not click_next(driver, schema):
+                return False
+            waits.dom_stable("next_page", required=False)
+            return True
+
+        for page in iter_pages(
+            lambda remaining: extract_page(driver, schema, remaining), follow, limit=limit, max_pages=max_pages
+        ):
+            page["engine"] = "browser"
+            yield page
+
+def get_wait_stats() -> Dict[str, Any]:
+    """Return observed wait durations and adaptive timeouts per host."""
+    return get_wait_recorder().stats()
@@ -0,0 +1,218 @@
+import contextvars
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, TimeoutError, as_completed
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+from app.config import settings
+from app.services import web_automation
+
+_global_slots: Optional[threading.BoundedSemaphore] = None
+_global_slots_lock = threading.Lock()
+
+# Targets currently running in any batch, keyed by target_key(), and how
+# many batches are waiting on each of those runs
+_in_flight: Dict[str, Future] = {}
+_references: Dict[Future, int] = {}
+_in_flight_lock = threading.Lock()
+
+
+def _get_global_slots() -> threading.BoundedSemaphore:
+    """Cap on targets running at once across every batch."""
+    global _global_slots
+    with _global_slots_lock:
+        if _global_slots is None:
+            _global_slots = threading.BoundedSemaphore(settings.WEB_BATCH_MAX_CONCURRENCY)
+        return _global_slots
+
+
+class HostLimiter:
+    """At most ``limit`` concurrent targets per host."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, host: str) -> Iterator[None]:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.BoundedSemaphore(self.limit)
+        with semaphore:
+            yield
+
+
+def target_host(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def target_key(url: str, scenario: Dict[str, Any]) -> str:
+    """Identity of a run: the URL plus every scenario field, hashed so no password is kept."""
+    payload = json.dumps({"url": url.strip(), **scenario}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def interleave_by_host(targets: List[str]) -> List[Tuple[int, str]]:
+    """
+    Order targets round-robin across hosts.
+
+    Workers take targets in submission order, so a run of same-host targets
+    would otherwise leave workers blocked on that host's limit while other
+    hosts wait.
+    """
+    by_host: Dict[str, Deque[Tuple[int, str]]] = defaultdict(deque)
+    for index, url in enumerate(targets):
+        by_host[target_host(url)].append((index, url))
+    queues = list(by_host.values())
+    ordered = []
+    while queues:
+        for queue in list(queues):
+            ordered.append(queue.popleft())
+            if not queue:
+                queues.remove(queue)
+    return ordered
+
+
+def effective_concurrency(concurrency: Optional[int], targets: int) -> int:
+    """Targets of a batch of ``targets`` that run at once for a requested ``concurrency``."""
+    return max(1, min(concurrency or settings.WEB_BATCH_CONCURRENCY, settings.WEB_BATCH_MAX_CONCURRENCY, targets))
+
+
+def _run_target(url: str, scenario: Dict[str, Any], hosts: HostLimiter) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        with hosts.slot(target_host(url)), _get_global_slots():
+            result = web_automation.automate_web_interaction(url=url, **scenario)
+    except Exception as e:
+        result = {"status": "error", "message": str(e)}
+    return {"result": result, "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)}
+
+
+def _release_in_flight(key: str, future: Future) -> None:
+    with _in_flight_lock:
+        if _in_flight.get(key) is future:
+            del _in_flight[key]
+
+
+def _leave(futures: Dict[Future, str]) -> None:
+    """
+    Drop this batch's interest in ``futures`` and cancel the queued runs
+    no other batch is waiting on. Runs another batch joined stay queued on
+    this batch's executor, which keeps working through them after shutdown.
+    """
+    orphaned = []
+    with _in_flight_lock:
+        for future, key in futures.items():
+            _references[future] -= 1
+            if _references[future] == 0:
+                del _references[future]
+                if not future.done() and not future.running():
+                    # Nobody may join a run that is about to be cancelled
+                    if _in_flight.get(key) is future:
+                        del _in_flight[key]
+                    orphaned.append(future)
+    # Outside the lock: cancelling runs the done callbacks inline
+    for future in orphaned:
+        future.cancel()
+
+
+def _record(index: int, url: str, deduplicated: bool, outcome: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "index": index,
+        "url": url,
+        "status": outcome["result"].get("status", "error"),
+        "deduplicated": deduplicated,
+        "elapsed_ms": outcome["elapsed_ms"],
+        "result": outcome["result"],
+    }
+
+
+def iter_batch(
+    targets: List[str],
+    scenario: Dict[str, Any],
+    concurrency: Optional[int] = None,
+    per_host_limit: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Run the same web scenario against every target and yield one record per
+    target as it finishes, followed by a summary record.
+
+    ``scenario`` holds the ``automate_web_interaction`` arguments other than
+    ``url``. At most ``concurrency`` targets of this batch run at once (and
+    ``WEB_BATCH_MAX_CONCURRENCY`` across all batches), with at most
+    ``per_host_limit`` per host. A target that is identical to one already
+    running, in this batch or another, waits for that run instead of
+    starting its own. A failing target only produces an error record, as
+    does every target still unfinished after ``WEB_BATCH_TIMEOUT`` seconds.
+    """
+    concurrency = effective_concurrency(concurrency, len(targets))
+    hosts = HostLimiter(max(1, per_host_limit or settings.WEB_BATCH_PER_HOST_LIMIT))
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="web-batch")
+    indexes: Dict[Future, List[int]] = defaultdict(list)
+    keys: Dict[Future, str] = {}
+    shared = set()
+    counts = {"succeeded": 0, "failed": 0, "deduplicated": 0}
+
+    try:
+        for index, url in interleave_by_host(targets):
+            key = target_key(url, scenario)
+            with _in_flight_lock:
+                future = _in_flight.get(key)
+                started_here = future is None
+                if started_here:
+                    # Each task gets its own copy so the request trace follows it
+                    future = executor.submit(contextvars.copy_context().run, _run_target, url, scenario, hosts)
+                    _in_flight[key] = future
+                if future not in keys:
+                    keys[future] = key
+                    _references[future] = _references.get(future, 0) + 1
+            if started_here:
+                # Outside the lock: the callback runs inline if the run already finished
+                future.add_done_callback(lambda f, key=key: _release_in_flight(key, f))
+            else:
+                shared.add(index)
+            indexes[future].append(index)
+
+        pending = set(indexes)
+        try:
+            for future in as_completed(list(indexes), timeout=settings.WEB_BATCH_TIMEOUT):
+                pending.discard(future)
+                try:
+                    outcome = future.result()
+                except CancelledError:
+                    outcome = {"result": {"status": "error", "message": "Cancelled"}, "elapsed_ms": None}
+                for index in indexes[future]:
+                    record = _record(index, targets[index], index in shared, outcome)
+                    counts["succeeded" if record["status"] == "success" else "failed"] += 1
+                    counts["deduplicated"] += int(record["deduplicated"])
+                    yield record
+        except TimeoutError:
+            timed_out = {
+                "result": {"status": "error", "message": f"Timed out after {settings.WEB_BATCH_TIMEOUT}s"},
+                "elapsed_ms": None,
+            }
+            for future in pending:
+                for index in indexes[future]:
+                    record = _record(index, targets[index], index in shared, timed_out)
+                    counts["succeeded" if record["status"] == "success" else "failed"] += 1
+                    counts["deduplicated"] += int(record["deduplicated"])
+                    yield record
+    finally:
+        # Stops queued targets no other batch shares if the client goes away mid-stream
+        _leave(keys)
+        executor.shutdown(wait=False)
+
+    yield {
+        "status": "success",
+        "targets": len(targets),
+        **counts,
+        "concurrency": concurrency,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
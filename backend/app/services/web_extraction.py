@@ -0,0 +1,192 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urljoin
+from app.services.tracing import span
+
+FIELD_TYPES = ("str", "int", "float", "bool", "url")
+
+# Titles and links of the example .search-result nodes
+SEARCH_RESULT_SCHEMA: Dict[str, Any] = {
+    "item": ".search-result",
+    "fields": {
+        "title": {"selector": "a"},
+        "link": {"selector": "a", "attr": "href", "type": "url"},
+    },
+}
+
+# Runs in the page: reads every field of every item node and finds the next
+# page, so a whole page of records costs one WebDriver round trip.
+_EXTRACT_SCRIPT = """
+var schema = arguments[0], limit = arguments[1];
+var nodes = document.querySelectorAll(schema.item);
+var records = [];
+function read(el, attr) {
+    if (attr === 'text') return el.textContent.replace(/\\s+/g, ' ').trim();
+    if (attr === 'html') return el.innerHTML;
+    return el.getAttribute(attr);
+}
+for (var i = 0; i < nodes.length && (limit === null || records.length < limit); i++) {
+    var record = {};
+    for (var name in schema.fields) {
+        var field = schema.fields[name];
+        var targets = !field.selector ? [nodes[i]]
+            : field.all ? Array.prototype.slice.call(nodes[i].querySelectorAll(field.selector))
+            : [nodes[i].querySelector(field.selector)];
+        var values = [];
+        for (var j = 0; j < targets.length; j++) {
+            if (targets[j]) values.push(read(targets[j], field.attr));
+        }
+        record[name] = field.all ? values : (values.length ? values[0] : null);
+    }
+    records.push(record);
+}
+var next = schema.next_page ? document.querySelector(schema.next_page) : null;
+return {
+    url: location.href,
+    total: nodes.length,
+    records: records,
+    has_next: !!next,
+    next_url: next && next.getAttribute('href') ? next.href : null
+};
+"""
+
+_CLICK_SCRIPT = "var el = document.querySelector(arguments[0]); if (el) { el.click(); } return !!el;"
+
+
+def compile_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate ``schema`` and fill in field defaults.
+
+    A schema has an ``item`` CSS selector, a ``fields`` mapping and an
+    optional ``next_page`` selector for pagination. Each field has an
+    optional ``selector`` (relative to the item, default the item itself),
+    ``attr`` ('text', 'html' or an attribute name, default 'text'), ``type``
+    (one of ``FIELD_TYPES``, default 'str') and ``all`` (return every match
+    as a list).
+    """
+    if not isinstance(schema, dict) or not schema.get("item"):
+        raise ValueError("An extraction schema needs an 'item' selector")
+    fields = schema.get("fields")
+    if not isinstance(fields, dict) or not fields:
+        raise ValueError("An extraction schema needs at least one field")
+    compiled = {}
+    for name, field in fields.items():
+        field = {"selector": field} if isinstance(field, str) else dict(field or {})
+        field.setdefault("selector", None)
+        field.setdefault("attr", "text")
+        field.setdefault("type", "str")
+        field["all"] = bool(field.get("all", False))
+        if field["type"] not in FIELD_TYPES:
+            raise ValueError(f"Unknown field type '{field['type']}' for '{name}'. Available: {', '.join(FIELD_TYPES)}")
+        compiled[name] = field
+    return {"item": schema["item"], "fields": compiled, "next_page": schema.get("next_page")}
+
+
+def _coerce(value: Optional[str], kind: str, base_url: str) -> Any:
+    """Convert one raw string to ``kind``; values that do not parse become None."""
+    if value is None:
+        return None
+    if kind == "str":
+        return value
+    if kind == "url":
+        return urljoin(base_url, value)
+    if kind == "bool":
+        return value.strip().lower() not in ("", "0", "false", "no", "off")
+    text = value.strip().replace(",", "")
+    try:
+        return int(text) if kind == "int" else float(text)
+    except ValueError:
+        return None
+
+
+def type_records(schema: Dict[str, Any], records: List[Dict[str, Any]], base_url: str) -> List[Dict[str, Any]]:
+    """Apply each field's type to the raw strings read from the page."""
+    typed = []
+    for record in records:
+        row = {}
+        for name, field in schema["fields"].items():
+            value = record.get(name)
+            if field["all"]:
+                row[name] = [_coerce(v, field["type"], base_url) for v in value or []]
+            else:
+                row[name] = _coerce(value, field["type"], base_url)
+        typed.append(row)
+    return typed
+
+
+def extract_page(driver: Any, schema: Dict[str, Any], limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Read typed records for every ``item`` node on the driver's current page
+    (at most ``limit``) with a single ``execute_script`` call.
+
+    ``schema`` must come from ``compile_schema``.
+    """
+    with span("extract_page"):
+        page = driver.execute_script(_EXTRACT_SCRIPT, schema, limit)
+    page["records"] = type_records(schema, page["records"], page["url"])
+    return page
+
+
+def extract_soup(soup: Any, base_url: str, schema: Dict[str, Any], limit: Optional[int] = None) -> Dict[str, Any]:
+    """``extract_page`` for HTML parsed by BeautifulSoup (the HTTP engine)."""
+    def read(el: Any, attr: str) -> Optional[str]:
+        if attr == "text":
+            return " ".join(el.get_text(" ").split())
+        if attr == "html":
+            return el.decode_contents()
+        value = el.get(attr)
+        return " ".join(value) if isinstance(value, list) else value
+
+    nodes = soup.select(schema["item"])
+    records = []
+    for node in nodes[:limit] if limit is not None else nodes:
+        record = {}
+        for name, field in schema["fields"].items():
+            if not field["selector"]:
+                targets = [node]
+            elif field["all"]:
+                targets = node.select(field["selector"])
+            else:
+                targets = [node.select_one(field["selector"])]
+            values = [read(target, field["attr"]) for target in targets if target is not None]
+            record[name] = values if field["all"] else (values[0] if values else None)
+        records.append(record)
+    next_link = soup.select_one(schema["next_page"]) if schema["next_page"] else None
+    next_href = next_link.get("href") if next_link is not None else None
+    return {
+        "url": base_url,
+        "total": len(nodes),
+        "records": type_records(schema, records, base_url),
+        "has_next": next_link is not None,
+        "next_url": urljoin(base_url, next_href) if next_href else None,
+    }
+
+
+def iter_pages(
+    extract: Callable[[Optional[int]], Dict[str, Any]],
+    follow: Callable[[Dict[str, Any]], bool],
+    limit: Optional[int] = None,
+    max_pages: int = 1
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one page of records at a time until ``limit`` records or
+    ``max_pages`` pages have been read, or there is no next page.
+
+    ``extract(remaining)`` reads the current page; ``follow(page)`` moves to
+    the next one and returns False when it cannot.
+    """
+    remaining = limit
+    for number in range(1, max_pages + 1):
+        page = extract(remaining)
+        page["page"] = number
+        yield page
+        if remaining is not None:
+            remaining -= len(page["records"])
+            if remaining <= 0:
+                return
+        if number == max_pages or not page["has_next"] or not follow(page):
+            return
+
+
+def click_next(driver: Any, schema: Dict[str, Any]) -> bool:
+    """Click the next-page control when it has no href to navigate to."""
+    return bool(driver.execute_script(_CLICK_SCRIPT, schema["next_page"]))
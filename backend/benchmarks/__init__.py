@@ -0,0 +1 @@
+# Offline benchmarks for the document, web and desktop service layers
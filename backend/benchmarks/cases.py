@@ -0,0 +1,270 @@
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, List
+
+Setup = Callable[[ExitStack], Callable[[], Any]]
+
+
+class Skip(Exception):
+    """Raised by a case setup when its environment is not available (no Chrome, no Tesseract)."""
+
+
+class Case:
+    """
+    A single benchmark.
+
+    ``setup`` prepares fixtures (registering cleanup on the ExitStack) and
+    returns the zero-argument callable that is timed.
+    """
+
+    def __init__(self, suite: str, name: str, setup: Setup, iterations: int = 20, warmup: int = 2):
+        self.suite = suite
+        self.name = name
+        self.setup = setup
+        self.iterations = iterations
+        self.warmup = warmup
+
+
+def _check(result: Dict[str, Any]) -> Dict[str, Any]:
+    if result.get("status") == "error":
+        raise RuntimeError(result.get("message", "benchmark call failed"))
+    return result
+
+
+def _probe(fn: Callable[[], Any], what: str) -> Callable[[], Any]:
+    """Run ``fn`` once; skip the case if the environment cannot run it."""
+    try:
+        fn()
+    except Exception as e:
+        raise Skip(f"{what} unavailable: {e}")
+    return fn
+
+
+# Document service -----------------------------------------------------------
+
+def _disable_result_cache() -> None:
+    from app.config import settings
+
+    settings.RESULT_CACHE_ENABLED = False
+    # Extraction timings should not include hashing for the result store either
+    settings.RESULT_STORE_ENABLED = False
+
+
+def _pdf_case(pages: int) -> Setup:
+    def setup(stack: ExitStack):
+        from app.services import document_automation
+        from benchmarks.fixtures import make_text_pdf
+
+        _disable_result_cache()
+        stack.callback(document_automation.shutdown_process_pool)
+        data = make_text_pdf(pages)
+        return lambda: _check(document_automation.extract_text_from_document(data, "application/pdf"))
+    return setup
+
+
+def _scanned_pdf_case(pages: int) -> Setup:
+    def setup(stack: ExitStack):
+        from app.services import document_automation
+        from benchmarks.fixtures import make_scanned_pdf
+
+        _disable_result_cache()
+        stack.callback(document_automation.shutdown_process_pool)
+        data = make_scanned_pdf(pages)
+        fn = lambda: _check(document_automation.extract_text_from_document(data, "application/pdf"))
+        return _probe(fn, "Tesseract")
+    return setup
+
+
+def _image_case(width: int, height: int, preset: str = "default") -> Setup:
+    def setup(stack: ExitStack):
+        from app.services import document_automation
+        from benchmarks.fixtures import make_image
+
+        _disable_result_cache()
+        data = make_image(width, height)
+        fn = lambda: _check(document_automation.extract_text_from_document(data, "image/png", preset=preset))
+        return _probe(fn, "Tesseract")
+    return setup
+
+
+def _preprocess_case(width: int, height: int, preset: str) -> Setup:
+    def setup(stack: ExitStack):
+        from app.services.preprocessing import Pipeline
+        from benchmarks.fixtures import make_image
+
+        data = make_image(width, height)
+        pipeline = Pipeline.preset(preset)
+        return lambda: pipeline.run(data)
+    return setup
+
+
+def _store_search_case(documents: int, pages_per_document: int, query: str, sort: str = "relevance") -> Setup:
+    def setup(stack: ExitStack):
+        import os
+        import tempfile
+        from app.services.result_store import ResultStore
+        from benchmarks.fixtures import LOREM
+
+        words = LOREM.split()
+        tmp = stack.enter_context(tempfile.TemporaryDirectory())
+        store = ResultStore(os.path.join(tmp, "results.db"), batch_size=500, flush_interval=0.05, queue_size=documents)
+        stack.callback(store.close)
+        for n in range(documents):
+            pages = [
+                " ".join(words[(n * 7 + p * 3 + i) % len(words)] for i in range(200)) + f" doc{n}"
+                for p in range(pages_per_document)
+            ]
+            store.submit(f"key{n}", f"hash{n}", {"characters_extracted": sum(map(len, pages))}, pages)
+        store.flush()
+        return lambda: store.search(query, limit=20, sort=sort)
+    return setup
+
+
+# Web service ----------------------------------------------------------------
+
+def _web_case(login: bool, profile: str = "default") -> Setup:
+    def setup(stack: ExitStack):
+        from app.services import web_automation
+        from benchmarks.fixture_site import FixtureSite
+
+        site = stack.enter_context(FixtureSite())
+        stack.callback(web_automation.shutdown_driver_pool)
+        kwargs = {"url": f"{site.url}/", "search_query": "invoice"}
+        if login:
+            kwargs.update(username="bench", password="bench")
+        fn = lambda: _check(web_automation.automate_web_interaction(engine="browser", browser_profile=profile, **kwargs))
+        return _probe(fn, "Chrome")
+    return setup
+
+
+def _http_web_case(login: bool) -> Setup:
+    def setup(stack: ExitStack):
+        from app.services import http_engine
+        from benchmarks.fixture_site import FixtureHandler, FixtureSite
+
+        if not http_engine.available():
+            raise Skip("beautifulsoup4 unavailable")
+        site = stack.enter_context(FixtureSite())
+        stack.callback(http_engine.shutdown_http_adapter)
+        kwargs = {"url": f"{site.url}/", "search_query": "invoice"}
+        if login:
+            kwargs.update(username="bench", password="bench")
+
+        def run():
+            result = _check(http_engine.run_http_interaction(**kwargs))
+            if result["search"]["results_count"] != FixtureHandler.results_per_query:
+                raise RuntimeError(f"expected {FixtureHandler.results_per_query} results, got {result['search']}")
+            return result
+        return run
+    return setup
+
+
+def _extract_case(engine: str, limit: int) -> Setup:
+    def setup(stack: ExitStack):
+        from app.services import http_engine, web_automation
+        from benchmarks.fixture_site import FixtureSite
+
+        if engine == "http" and not http_engine.available():
+            raise Skip("beautifulsoup4 unavailable")
+        site = stack.enter_context(FixtureSite())
+        stack.callback(web_automation.shutdown_driver_pool)
+        stack.callback(http_engine.shutdown_http_adapter)
+        schema = {
+            "item": ".search-result",
+            "fields": {
+                "title": "a",
+                "link": {"selector": "a", "attr": "href", "type": "url"},
+                "score": {"selector": ".score", "type": "float"},
+            },
+            "next_page": "a.next",
+        }
+
+        def run():
+            pages = list(web_automation.iter_extraction(
+                f"{site.url}/search?q=invoice", schema, limit=limit, max_pages=10, engine=engine
+            ))
+            records = sum(len(page["records"]) for page in pages)
+            if records != limit:
+                raise RuntimeError(f"expected {limit} records, got {records}")
+            return pages
+        return _probe(run, "Chrome") if engine == "browser" else run
+    return setup
+
+
+# Desktop service ------------------------------------------------------------
+
+def _desktop_case(action: str, text: str, strategy: str = "auto", **backend_options: Any) -> Setup:
+    def setup(stack: ExitStack):
+        from app.services import desktop_automation
+        from app.services.input_backend import RecordingBackend, set_input_backend
+
+        backend = RecordingBackend(**backend_options)
+        set_input_backend(backend)
+        stack.callback(set_input_backend, None)
+
+        def run():
+            backend.clear()
+            if action == "type":
+                return _check(desktop_automation.type_text(text, strategy=strategy))
+            return _check(desktop_automation.press_key(text))
+        return run
+    return setup
+
+
+# Startup ---------------------------------------------------------------------
+
+def _cold_start_case(**flags: bool) -> Setup:
+    """Import the app in a fresh interpreter with the given subsystem flags."""
+    def setup(stack: ExitStack):
+        import os
+        import subprocess
+        import sys
+
+        env = {**os.environ, **{name: str(value).lower() for name, value in flags.items()}}
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        def run():
+            subprocess.run([sys.executable, "-c", "import app.main"], cwd=backend_dir, env=env, check=True)
+        return _probe(run, "app import")
+    return setup
+
+
+CASES: List[Case] = [
+    Case("document", "pdf_text_1_page", _pdf_case(1), iterations=50),
+    Case("document", "pdf_text_20_pages", _pdf_case(20)),
+    Case("document", "pdf_text_200_pages", _pdf_case(200), iterations=5, warmup=1),
+    Case("document", "pdf_scanned_4_pages", _scanned_pdf_case(4), iterations=3, warmup=1),
+    Case("document", "image_1mp_ocr", _image_case(1200, 900), iterations=5, warmup=1),
+    Case("document", "image_24mp_ocr", _image_case(6000, 4000), iterations=2, warmup=1),
+    Case("document", "preprocess_8mp_default", _preprocess_case(3464, 2309, "default"), iterations=10),
+    Case("document", "preprocess_8mp_fast", _preprocess_case(3464, 2309, "fast"), iterations=10),
+    Case("document", "preprocess_8mp_accurate", _preprocess_case(3464, 2309, "accurate"), iterations=5),
+    Case("document", "store_search_100k_pages_rare", _store_search_case(20000, 5, "doc1234"), iterations=50),
+    Case("document", "store_search_100k_pages_common", _store_search_case(20000, 5, "invoices receipt*"), iterations=20),
+    Case("document", "store_search_100k_pages_common_recent", _store_search_case(
+        20000, 5, "invoices receipt*", sort="recent"
+    ), iterations=50),
+    Case("web", "web_public_search", _web_case(login=False), iterations=5, warmup=1),
+    Case("web", "web_login_search", _web_case(login=True), iterations=5, warmup=1),
+    Case("web", "web_login_search_lean", _web_case(login=True, profile="lean"), iterations=5, warmup=1),
+    Case("web", "web_public_search_http", _http_web_case(login=False), iterations=50),
+    Case("web", "web_login_search_http", _http_web_case(login=True), iterations=50),
+    Case("web", "web_extract_25_records_http", _extract_case("http", 25), iterations=50),
+    Case("web", "web_extract_25_records_browser", _extract_case("browser", 25), iterations=5, warmup=1),
+    Case("desktop", "desktop_type_1kb", _desktop_case("type", "x" * 1024), iterations=50),
+    Case("desktop", "desktop_type_40_chars_per_key", _desktop_case(
+        "type", "Hello from the automation dashboard!!!!", "per_key", key_delay=0.002, pause=0.5, honor_interval=True
+    ), iterations=3, warmup=0),
+    Case("desktop", "desktop_type_40_chars_batched", _desktop_case(
+        "type", "Hello from the automation dashboard!!!!", "batched", key_delay=0.002, pause=0.5, honor_interval=True
+    ), iterations=3, warmup=0),
+    Case("desktop", "desktop_type_5kb_paste", _desktop_case(
+        "type", "x" * 5 * 1024, "paste", key_delay=0.002, pause=0.5, honor_interval=True
+    ), iterations=3, warmup=0),
+    Case("desktop", "desktop_press_key", _desktop_case("press", "enter"), iterations=100),
+    Case("startup", "cold_import_all_subsystems", _cold_start_case(), iterations=5, warmup=1),
+    Case("startup", "cold_import_document_only", _cold_start_case(
+        WEB_AUTOMATION_ENABLED=False, DESKTOP_AUTOMATION_ENABLED=False
+    ), iterations=5, warmup=1),
+]
+
+CASES_BY_NAME: Dict[str, Case] = {case.name: case for case in CASES}
@@ -0,0 +1,91 @@
+import threading
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+LOGIN_PAGE = """<!doctype html>
+<html><head><title>Login</title></head><body>
+<form method="post" action="/login">
+  <input name="username"><input name="password" type="password">
+  <button type="submit">Sign In</button>
+</form>
+</body></html>"""
+
+SEARCH_PAGE = """<!doctype html>
+<html><head><title>Search</title></head><body>
+<form method="get" action="/search">
+  <input name="q" value="{query}">
+  <button type="submit">Search</button>
+</form>
+<div id="results">{results}</div>
+{next_link}
+</body></html>"""
+
+RESULT = '<div class="search-result"><a href="/item/{n}">Result {n} for {query}</a><span class="score">{score}</span></div>'
+
+NEXT_LINK = '<a class="next" href="/search?q={query}&amp;page={page}">Next</a>'
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Login and search pages in the shape the web automation flow expects."""
+
+    results_per_query = 10
+    pages_per_query = 3
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path in ("/", "/login"):
+            self._send(LOGIN_PAGE)
+        elif url.path == "/search":
+            params = parse_qs(url.query)
+            query = escape(params.get("q", [""])[0])
+            page = int(params.get("page", ["1"])[0])
+            first = (page - 1) * self.results_per_query
+            results = "".join(
+                RESULT.format(n=n, query=query, score=f"{1 - n / 100:.2f}")
+                for n in range(first, first + self.results_per_query)
+            ) if query else ""
+            next_link = NEXT_LINK.format(query=quote(query), page=page + 1) if query and page < self.pages_per_query else ""
+            self._send(SEARCH_PAGE.format(query=query, results=results, next_link=next_link))
+        else:
+            self._send("<html><body>Not found</body></html>", status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.send_response(303)
+        self.send_header("Location", "/search")
+        self.send_header("Set-Cookie", "session=fixture; Path=/")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body: str, status: int = 200):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FixtureSite:
+    """Serves the fixture pages on a free localhost port in a background thread."""
+
+    def __init__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FixtureSite":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
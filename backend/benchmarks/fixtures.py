@@ -0,0 +1,45 @@
+import cv2
+import fitz
+import numpy as np
+
+LOREM = (
+    "The quick brown fox jumps over the lazy dog while invoices and receipts "
+    "are processed by the automation dashboard"
+)
+
+
+def make_text_pdf(pages: int, lines_per_page: int = 40) -> bytes:
+    """A PDF with an embedded text layer on every page."""
+    doc = fitz.open()
+    for page_no in range(pages):
+        page = doc.new_page()
+        for line in range(lines_per_page):
+            page.insert_text((50, 60 + line * 18), f"{page_no}.{line} {LOREM}", fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_image(width: int, height: int, fmt: str = ".png") -> bytes:
+    """A white image with rows of black text, encoded as ``fmt``."""
+    img = np.full((height, width), 255, np.uint8)
+    scale = max(0.5, width / 1600)
+    line_height = int(40 * scale)
+    for row, y in enumerate(range(line_height, height - line_height // 2, line_height)):
+        cv2.putText(img, f"{row} {LOREM}", (20, y), cv2.FONT_HERSHEY_SIMPLEX, scale * 0.6, 0, max(1, int(scale)))
+    ok, encoded = cv2.imencode(fmt, img)
+    if not ok:
+        raise RuntimeError(f"Could not encode {fmt} fixture")
+    return encoded.tobytes()
+
+
+def make_scanned_pdf(pages: int, width: int = 1240, height: int = 1754) -> bytes:
+    """A PDF whose pages are images only, as produced by a scanner."""
+    image = make_image(width, height)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_image(page.rect, stream=image)
+    data = doc.tobytes()
+    doc.close()
+    return data
@@ -0,0 +1,191 @@
+"""
+Offline benchmark runner.
+
+Run from the backend directory:
+
+    python -m benchmarks.run                       # all suites
+    python -m benchmarks.run --suite document      # one suite
+    python -m benchmarks.run --save-baseline       # record the current results as the baseline
+
+Each case runs in a fresh process so its peak RSS is measured in isolation.
+A case that does not finish, and exit, within ``--timeout`` seconds is killed
+and reported as failed.
+When a baseline exists, the run fails (exit code 1) if a case's p95 latency or
+peak RSS grew, or its throughput dropped, by more than ``--threshold``.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from contextlib import ExitStack
+from typing import Any, Dict, List, Optional
+
+from benchmarks.cases import CASES, CASES_BY_NAME, Skip
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def measure(name: str, iterations: Optional[int] = None) -> Dict[str, Any]:
+    """Run one case in this process and return its measurements."""
+    case = CASES_BY_NAME[name]
+    iterations = iterations or case.iterations
+    with ExitStack() as stack:
+        try:
+            fn = case.setup(stack)
+        except Skip as e:
+            return {"status": "skipped", "reason": str(e)}
+        for _ in range(case.warmup):
+            fn()
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            call_started = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - call_started)
+        total = time.perf_counter() - started
+
+    return {
+        "status": "ok",
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "throughput_per_s": round(iterations / total, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# Time a case's process gets to exit after reporting its result
+EXIT_GRACE_SECONDS = 10.0
+
+
+def _measure_in_child(conn: Any, name: str, iterations: Optional[int]) -> None:
+    try:
+        result = measure(name, iterations)
+    except Exception as e:
+        result = {"status": "failed", "reason": str(e)}
+    conn.send(result)
+    conn.close()
+
+
+def run_isolated(name: str, iterations: Optional[int], timeout: float) -> Dict[str, Any]:
+    ctx = multiprocessing.get_context("spawn")
+    receiver, sender = ctx.Pipe(duplex=False)
+    # Not a daemon: cases start process pools of their own
+    process = ctx.Process(target=_measure_in_child, args=(sender, name, iterations))
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            return {"status": "failed", "reason": f"timed out after {timeout:g}s"}
+        result = receiver.recv()
+    except EOFError:
+        return {"status": "failed", "reason": "benchmark process died"}
+    finally:
+        receiver.close()
+        process.join(EXIT_GRACE_SECONDS)
+        if process.is_alive():
+            process.kill()
+            process.join()
+            hung = True
+        else:
+            hung = False
+    if hung:
+        # e.g. a pool that never lets the interpreter exit; a server would hang the same way
+        return {"status": "failed", "reason": f"did not exit within {EXIT_GRACE_SECONDS:g}s of finishing"}
+    return result
+
+
+def compare(result: Dict[str, Any], baseline: Optional[Dict[str, Any]], threshold: float) -> List[str]:
+    """Describe every metric that regressed past ``threshold`` relative to the baseline."""
+    if result.get("status") != "ok" or not baseline:
+        return []
+    regressions = []
+    for metric in ("p95_ms", "peak_rss_mb"):
+        if result.get(metric) and baseline.get(metric) and result[metric] > baseline[metric] * (1 + threshold):
+            regressions.append(f"{metric} {baseline[metric]} -> {result[metric]}")
+    base_tp = baseline.get("throughput_per_s")
+    if base_tp and result["throughput_per_s"] < base_tp * (1 - threshold):
+        regressions.append(f"throughput_per_s {base_tp} -> {result['throughput_per_s']}")
+    return regressions
+
+
+def load_baselines(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the offline service benchmarks.")
+    parser.add_argument("--suite", action="append", choices=sorted({c.suite for c in CASES}),
+                        help="Suite to run (repeatable); default is all suites")
+    parser.add_argument("--case", action="append", help="Only run cases whose name contains this text")
+    parser.add_argument("--iterations", type=int, help="Override the iteration count of every case")
+    parser.add_argument("--timeout", type=float, default=300.0,
+                        help="Seconds a case may run before it is killed and failed (default 300)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed relative regression before failing (default 0.25)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results to the baseline file")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    cases = [
+        c for c in CASES
+        if (not args.suite or c.suite in args.suite)
+        and (not args.case or any(text in c.name for text in args.case))
+    ]
+    baselines = load_baselines(args.baseline)
+    results: Dict[str, Any] = {}
+    failed = False
+
+    print(f"{'case':36} {'p50 ms':>10} {'p95 ms':>10} {'ops/s':>10} {'rss MB':>8}  status")
+    for case in cases:
+        result = run_isolated(case.name, args.iterations, args.timeout)
+        results[case.name] = result
+        if result["status"] != "ok":
+            print(f"{case.name:36} {'':>10} {'':>10} {'':>10} {'':>8}  {result['status']}: {result['reason']}")
+            failed = failed or result["status"] == "failed"
+            continue
+        regressions = compare(result, baselines.get(case.name), args.threshold)
+        failed = failed or bool(regressions)
+        rss = f"{result['peak_rss_mb']:.1f}" if result["peak_rss_mb"] is not None else "-"
+        status = "REGRESSED: " + "; ".join(regressions) if regressions else "ok"
+        print(f"{case.name:36} {result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f} "
+              f"{result['throughput_per_s']:>10.2f} {rss:>8}  {status}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        baselines.update({name: r for name, r in results.items() if r["status"] == "ok"})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
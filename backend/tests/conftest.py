@@ -0,0 +1,59 @@
+import os
+import sys
+import threading
+
+import pytest
+
+# Run from anywhere: the app package lives next to this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeDriver:
+    """Mimics the WebDriver methods the driver pool uses."""
+
+    def __init__(self, number: int):
+        self.number = number
+        self.url = "about:blank"
+        self.cookies = {"session": "1"}
+        self.scripts = []
+        self.crashed = False
+        self.quit_called = False
+
+    @property
+    def current_url(self) -> str:
+        if self.crashed:
+            raise RuntimeError("session deleted")
+        return self.url
+
+    def get(self, url: str) -> None:
+        if self.crashed:
+            raise RuntimeError("session deleted")
+        self.url = url
+
+    def delete_all_cookies(self) -> None:
+        if self.crashed:
+            raise RuntimeError("session deleted")
+        self.cookies.clear()
+
+    def execute_script(self, script: str) -> None:
+        self.scripts.append(script)
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+
+class FakeDriverFactory:
+    def __init__(self):
+        self.drivers = []
+        self._lock = threading.Lock()
+
+    def __call__(self) -> FakeDriver:
+        with self._lock:
+            driver = FakeDriver(len(self.drivers))
+            self.drivers.append(driver)
+        return driver
+
+
+@pytest.fixture
+def driver_factory() -> FakeDriverFactory:
+    return FakeDriverFactory()
@@ -0,0 +1,192 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from app.services import admission
+from app.services.admission import PRIORITY_HIGH, PRIORITY_NORMAL, AdmissionController, AdmissionRejected
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_requests_beyond_the_limit_wait_for_a_slot():
+    async def scenario():
+        controller = AdmissionController("unit", limit=1, queue_size=2)
+        first = await controller.acquire()
+        waiting = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        assert not waiting.done() and controller.stats()["queue_depth"] == 1
+
+        first.release()
+        second = await asyncio.wait_for(waiting, 1)
+        second.release()
+        second.release()  # idempotent
+        return controller.stats()
+
+    stats = run(scenario())
+    assert stats["admitted"] == 2 and stats["queued"] == 1
+    assert stats["active"] == 0
+
+
+def test_higher_priority_waiters_are_admitted_first():
+    async def scenario():
+        controller = AdmissionController("unit", limit=1, queue_size=3)
+        holder = await controller.acquire()
+        order = []
+
+        async def wait(name, priority):
+            ticket = await controller.acquire(priority)
+            order.append(name)
+            ticket.release()
+
+        tasks = [asyncio.ensure_future(wait("large", PRIORITY_NORMAL))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(wait("small", PRIORITY_HIGH)))
+        await asyncio.sleep(0)
+        holder.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert run(scenario()) == ["small", "large"]
+
+
+def test_a_full_queue_rejects_with_a_retry_estimate():
+    async def scenario():
+        controller = AdmissionController("unit", limit=1, queue_size=0)
+        await controller.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        return rejected.value, controller.stats()
+
+    rejected, stats = run(scenario())
+    assert rejected.reason == "queue_full" and rejected.retry_after >= 1
+    assert stats["rejected_queue_full"] == 1
+
+
+def test_waiting_too_long_is_rejected_and_leaves_the_queue():
+    async def scenario():
+        controller = AdmissionController("unit", limit=1, queue_size=1, max_wait=0.02)
+        await controller.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        return rejected.value.reason, controller.stats()
+
+    reason, stats = run(scenario())
+    assert reason == "wait_timeout"
+    assert stats["queue_depth"] == 0 and stats["active"] == 1
+
+
+def test_release_from_a_worker_thread_hops_back_to_the_loop():
+    async def scenario():
+        controller = AdmissionController("unit", limit=1, queue_size=1)
+        ticket = await controller.acquire()
+        await asyncio.get_running_loop().run_in_executor(None, ticket.release)
+        await asyncio.sleep(0)
+        return controller.stats()["active"]
+
+    assert run(scenario()) == 0
+
+
+def test_job_backlog_beyond_limit_and_queue_is_rejected(monkeypatch):
+    monkeypatch.setattr(admission.settings, "ADMISSION_ENABLED", True)
+    monkeypatch.setitem(admission._controllers, "unit", AdmissionController("unit", limit=2, queue_size=1))
+
+    admission.check_backlog("unit", 2)
+    with pytest.raises(AdmissionRejected):
+        admission.check_backlog("unit", 3)
+
+
+def test_small_documents_get_priority(monkeypatch):
+    monkeypatch.setattr(admission.settings, "ADMISSION_SMALL_DOCUMENT_BYTES", 1000)
+
+    assert admission.document_priority(1000) == PRIORITY_HIGH
+    assert admission.document_priority(1001) == PRIORITY_NORMAL
+
+
+def test_rejections_are_served_as_429_with_retry_after(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from app.api.endpoints import desktop
+    from app.main import app
+
+    class BusyJobs:
+        def pending(self, kind):
+            return 10_000
+
+    monkeypatch.setattr(admission.settings, "ADMISSION_ENABLED", True)
+    monkeypatch.setattr(desktop, "get_job_manager", BusyJobs)
+
+    response = TestClient(app).post(
+        "/api/desktop-automate/jobs", json={"appName": "notepad", "action": "press", "text": "enter"}
+    )
+
+    assert response.status_code == 429
+    assert response.json()["reason"] == "backlog_full"
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_weighted_requests_hold_several_slots():
+    async def scenario():
+        controller = AdmissionController("unit", limit=4, queue_size=3)
+        light = await controller.acquire()
+        batch = asyncio.ensure_future(controller.acquire(weight=4))
+        await asyncio.sleep(0)
+        # The batch is next in line, so a light request arriving later waits behind it
+        later = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        assert not batch.done() and not later.done()
+
+        light.release()
+        ticket = await asyncio.wait_for(batch, 1)
+        assert controller.stats()["active"] == 4 and not later.done()
+        ticket.release()
+        (await asyncio.wait_for(later, 1)).release()
+        return controller.stats()
+
+    stats = run(scenario())
+    assert stats["admitted"] == 3 and stats["active"] == 0
+
+
+def test_weight_is_capped_at_the_limit():
+    async def scenario():
+        controller = AdmissionController("unit", limit=2, queue_size=0)
+        ticket = await controller.acquire(weight=50)
+        assert ticket.weight == 2
+        ticket.release()
+        return controller.stats()
+
+    assert run(scenario())["active"] == 0
+
+
+def test_uploads_are_admitted_before_they_are_read(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("multipart")
+    from fastapi.testclient import TestClient
+
+    from app.api.endpoints import document
+    from app.main import app
+
+    calls = []
+
+    async def admit(kind, priority=PRIORITY_NORMAL, weight=1):
+        calls.append((kind, priority))
+        raise AdmissionRejected(kind, "queue_full", 3)
+
+    async def read_validated_upload(file):
+        calls.append("read")
+
+    monkeypatch.setattr(admission.settings, "ADMISSION_SMALL_DOCUMENT_BYTES", 1000)
+    monkeypatch.setattr(document, "admit", admit)
+    monkeypatch.setattr(document, "read_validated_upload", read_validated_upload)
+
+    response = TestClient(app).post(
+        "/api/document/extract-text", files={"file": ("a.png", b"x" * 10, "image/png")}
+    )
+
+    assert response.status_code == 429
+    assert calls == [("document", PRIORITY_HIGH)]
@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from app.services.app_registry import APPS, AppRegistry, FakeLauncher
+from app.services.input_backend import RecordingBackend
+
+
+@pytest.fixture
+def backend():
+    return RecordingBackend()
+
+
+def test_open_reuses_the_tracked_instance(backend):
+    launcher = FakeLauncher(backend)
+    registry = AppRegistry(launcher, backend)
+
+    first = registry.open("notepad")
+    second = registry.open("notepad")
+
+    assert not first["reused"] and second["reused"]
+    assert launcher.launches == ["notepad"]
+    assert backend.focused == "Notepad"
+
+
+def test_slow_launch_does_not_block_other_apps(backend):
+    launcher = FakeLauncher(backend, window_delay=0.5)
+    registry = AppRegistry(launcher, backend)
+    opening = threading.Thread(target=registry.open, args=("notepad",))
+    opening.start()
+
+    result = registry.close("calculator")
+    still_opening = opening.is_alive()
+    opening.join(5)
+
+    assert still_opening
+    assert result["closed"] is False
+
+
+def test_close_stops_only_the_tracked_instance(backend):
+    launcher = FakeLauncher(backend)
+    registry = AppRegistry(launcher, backend)
+    registry.open("notepad")
+
+    assert registry.close("notepad")["closed"] is True
+    assert launcher.running == {}
+
+    # Started outside the registry: left running
+    launcher.launch(APPS["notepad"])
+    assert registry.close("notepad")["closed"] is False
+    assert len(launcher.running) == 1
+
+
+def test_shutdown_leaves_adopted_instances_running(backend):
+    launcher = FakeLauncher(backend)
+    adopted = launcher.launch(APPS["paint"])
+    registry = AppRegistry(launcher, backend)
+    registry.open("paint")
+    registry.open("notepad")
+
+    registry.shutdown()
+
+    assert list(launcher.running) == [adopted]
+    assert registry.list() == []
+
+
+class ShellLauncher(FakeLauncher):
+    """Starts apps the way ``os.startfile`` does: no pid is reported."""
+
+    def __init__(self, backend, findable=True):
+        super().__init__(backend)
+        self.findable = findable
+
+    def launch(self, spec):
+        super().launch(spec)
+        return None
+
+    def find(self, spec):
+        return super().find(spec) if self.findable else []
+
+
+def test_an_instance_started_without_a_pid_is_followed_by_its_new_pid(backend):
+    launcher = ShellLauncher(backend)
+    registry = AppRegistry(launcher, backend)
+
+    assert registry.open("notepad")["pid"] == 1000
+    assert registry.close("notepad")["closed"] is True
+    assert launcher.running == {}
+
+
+def test_an_instance_without_a_known_pid_is_left_running(backend):
+    launcher = ShellLauncher(backend, findable=False)
+    registry = AppRegistry(launcher, backend)
+    registry.open("notepad")
+
+    result = registry.close("notepad")
+
+    assert result["status"] == "success" and result["closed"] is False
+    assert len(launcher.running) == 1
@@ -0,0 +1,98 @@
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from benchmarks import run
+from benchmarks.cases import Case, Skip
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert run.percentile(values, 50) == 50.0
+    assert run.percentile(values, 95) == 95.0
+    assert run.percentile([7.0], 95) == 7.0
+
+
+def test_regressions_past_the_threshold_are_reported():
+    baseline = {"p95_ms": 10.0, "peak_rss_mb": 100.0, "throughput_per_s": 50.0}
+    result = {"status": "ok", "p95_ms": 13.0, "peak_rss_mb": 110.0, "throughput_per_s": 30.0}
+
+    regressions = run.compare(result, baseline, threshold=0.25)
+
+    assert [r.split()[0] for r in regressions] == ["p95_ms", "throughput_per_s"]
+    assert run.compare(result, None, threshold=0.25) == []
+
+
+def test_measure_times_the_case_after_warmup(monkeypatch):
+    calls = []
+    case = Case("unit", "counting", lambda stack: lambda: calls.append(1), iterations=4, warmup=2)
+    monkeypatch.setitem(run.CASES_BY_NAME, case.name, case)
+
+    result = run.measure(case.name)
+
+    assert result["status"] == "ok" and result["iterations"] == 4
+    assert len(calls) == 6
+
+
+def test_unavailable_environments_are_skipped(monkeypatch):
+    def setup(stack):
+        raise Skip("Chrome unavailable")
+
+    monkeypatch.setitem(run.CASES_BY_NAME, "needs_chrome", Case("unit", "needs_chrome", setup))
+
+    assert run.measure("needs_chrome") == {"status": "skipped", "reason": "Chrome unavailable"}
+
+
+def test_desktop_cases_run_against_the_recording_backend():
+    from app.services import input_backend
+
+    result = run.measure("desktop_press_key", iterations=3)
+
+    assert result["status"] == "ok"
+    assert input_backend._input_backend is None
+
+
+class ForkContext:
+    """Runs cases in forked processes so cases registered by a test are visible there."""
+
+    @staticmethod
+    def get_context(method):
+        return multiprocessing.get_context("fork")
+
+
+@pytest.fixture
+def forked(monkeypatch):
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("needs the fork start method")
+    monkeypatch.setattr(run, "multiprocessing", ForkContext)
+
+
+def test_a_case_that_hangs_is_killed_and_failed(forked, monkeypatch):
+    monkeypatch.setitem(run.CASES_BY_NAME, "hangs", Case("unit", "hangs", lambda stack: lambda: time.sleep(60)))
+    monkeypatch.setattr(run, "EXIT_GRACE_SECONDS", 0.5)
+
+    started = time.monotonic()
+    result = run.run_isolated("hangs", iterations=1, timeout=0.5)
+
+    assert result == {"status": "failed", "reason": "timed out after 0.5s"}
+    assert time.monotonic() - started < 30
+
+
+def test_a_case_that_does_not_exit_is_failed(forked, monkeypatch):
+    def setup(stack):
+        # A non-daemon thread keeps the interpreter from exiting, as a stuck pool would
+        threading.Thread(target=threading.Event().wait).start()
+        return lambda: None
+
+    monkeypatch.setitem(run.CASES_BY_NAME, "lingers", Case("unit", "lingers", setup, iterations=1, warmup=0))
+    monkeypatch.setattr(run, "EXIT_GRACE_SECONDS", 0.5)
+
+    result = run.run_isolated("lingers", iterations=1, timeout=30)
+
+    assert result["status"] == "failed"
+    assert result["reason"].startswith("did not exit")
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from app.services import browser_profiles
+from app.services.browser_profiles import BrowserProfile, ProfileLedger, read_network_log, resolve_profile
+
+
+def test_profiles_resolve_by_name_then_host_then_default(monkeypatch):
+    monkeypatch.setattr(browser_profiles.settings, "BROWSER_PROFILE_BY_HOST", {"heavy.test": "lean"})
+    monkeypatch.setattr(browser_profiles.settings, "BROWSER_PROFILE_DEFAULT", "default")
+
+    assert resolve_profile("https://heavy.test/page", "default").name == "default"
+    assert resolve_profile("https://heavy.test/page").name == "lean"
+    assert resolve_profile("https://other.test/").name == "default"
+    with pytest.raises(ValueError):
+        resolve_profile("https://other.test/", "turbo")
+
+
+def test_configured_profiles_extend_the_builtins(monkeypatch):
+    monkeypatch.setattr(browser_profiles.settings, "BROWSER_PROFILES", {
+        "text_only": {"block_resources": ["image", "stylesheet"], "page_load_strategy": "eager"}
+    })
+
+    profile = resolve_profile("https://example.test/", "text_only")
+
+    assert "*.css" in profile.blocked_urls and "*.png" in profile.blocked_urls
+    assert profile.page_load_strategy == "eager"
+
+
+def test_invalid_profiles_are_rejected():
+    with pytest.raises(ValueError):
+        BrowserProfile("bad", block_resources=["video"])
+    with pytest.raises(ValueError):
+        BrowserProfile("bad", page_load_strategy="lazy")
+
+
+class LogDriver:
+    def __init__(self, *events):
+        self.entries = [{"message": json.dumps({"message": event})} for event in events]
+
+    def get_log(self, kind):
+        entries, self.entries = self.entries, []
+        return entries
+
+
+def test_network_log_counts_requests_bytes_and_blocks():
+    driver = LogDriver(
+        {"method": "Network.requestWillBeSent", "params": {}},
+        {"method": "Network.requestWillBeSent", "params": {}},
+        {"method": "Network.loadingFinished", "params": {"encodedDataLength": 1500}},
+        {"method": "Network.loadingFailed", "params": {"blockedReason": "inspector"}},
+    )
+
+    assert read_network_log(driver) == {"requests": 1, "bytes": 1500, "blocked_requests": 1}
+    assert read_network_log(driver) == {"requests": 0, "bytes": 0, "blocked_requests": 0}
+
+
+def test_savings_are_measured_against_the_default_profile_on_the_same_host():
+    ledger = ProfileLedger()
+    url = "https://example.test/search"
+
+    assert ledger.record("lean", url, {"requests": 5, "bytes": 1000, "blocked_requests": 3}) == {
+        "requests": None, "bytes": None
+    }
+    ledger.record("default", url, {"requests": 20, "bytes": 9000, "blocked_requests": 0})
+    saved = ledger.record("lean", url, {"requests": 5, "bytes": 1000, "blocked_requests": 3})
+
+    assert saved == {"requests": 15, "bytes": 8000}
+    stats = ledger.stats()
+    assert stats["lean"]["runs"] == 2 and stats["lean"]["saved_bytes"] == 8000
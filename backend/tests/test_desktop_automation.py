@@ -0,0 +1,130 @@
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from app.services import desktop_automation
+from app.services.input_backend import RecordingBackend, set_input_backend
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = RecordingBackend()
+    set_input_backend(backend)
+    monkeypatch.setattr(desktop_automation.settings, "DESKTOP_WINDOW_POLL_INTERVAL", 0.01)
+    yield backend
+    set_input_backend(None)
+
+
+@pytest.fixture
+def opened(monkeypatch, backend):
+    opened = []
+
+    def open_application(app_name):
+        opened.append(app_name)
+        backend.add_window("Untitled - Notepad")
+        return {"status": "success", "message": f"Opened {app_name}"}
+
+    monkeypatch.setattr(desktop_automation, "open_application", open_application)
+    return opened
+
+
+def test_macro_runs_every_step_in_one_session(backend, opened):
+    result = desktop_automation.run_macro("notepad", [
+        {"action": "open"},
+        {"action": "wait_for_window", "timeout": 1},
+        {"action": "focus"},
+        {"action": "type", "text": "hello"},
+        {"action": "hotkey", "keys": ["ctrl", "s"]},
+        {"action": "open"},
+    ])
+
+    assert result["status"] == "success"
+    assert opened == ["notepad"]
+    assert backend.focused == "Untitled - Notepad"
+    assert [c["action"] for c in backend.calls] == ["focus", "write", "hotkey"]
+    assert [s["index"] for s in result["steps"]] == list(range(6))
+
+
+def test_macro_stops_at_the_first_failing_step(backend):
+    result = desktop_automation.run_macro("notepad", [
+        {"action": "wait_for_window", "timeout": 0.05},
+        {"action": "type", "text": "never typed"},
+    ])
+
+    assert result["status"] == "error"
+    assert result["failed_step"] == 0
+    assert len(result["steps"]) == 1
+    assert backend.calls == []
+
+
+def test_macro_steps_are_validated_before_anything_runs(backend):
+    result = desktop_automation.run_macro("notepad", [
+        {"action": "type", "text": "x"},
+        {"action": "press"},
+    ])
+
+    assert result == {"status": "error", "message": "Step 1: key is required for 'press'"}
+    assert backend.calls == []
+
+
+def test_wait_for_window_times_out():
+    backend = RecordingBackend()
+
+    assert not backend.wait_for_window("Paint", timeout=0.03, poll_interval=0.01)
+    backend.add_window("Untitled - Paint")
+    assert backend.wait_for_window("Paint", timeout=0.03, poll_interval=0.01)
+
+
+def test_auto_strategy_depends_on_the_text_and_app(monkeypatch):
+    monkeypatch.setattr(desktop_automation.settings, "TYPING_PASTE_MIN_CHARS", 10)
+    monkeypatch.setattr(desktop_automation.settings, "TYPING_PER_KEY_APPS", ["paint"])
+
+    assert desktop_automation.choose_typing_strategy("short") == "batched"
+    assert desktop_automation.choose_typing_strategy("a much longer text") == "paste"
+    assert desktop_automation.choose_typing_strategy("café") == "paste"
+    assert desktop_automation.choose_typing_strategy("a much longer text", "Paint") == "per_key"
+
+
+def test_paste_restores_the_previous_clipboard(backend):
+    backend.clipboard = "user data"
+
+    result = desktop_automation.type_text("pasted text", strategy="paste")
+
+    assert result["strategy"] == "paste"
+    assert backend.clipboard == "user data"
+    assert [c["action"] for c in backend.calls] == ["set_clipboard", "hotkey", "set_clipboard"]
+
+
+def test_ascii_text_is_typed_when_the_clipboard_fails(backend, monkeypatch):
+    def no_clipboard(text):
+        raise RuntimeError("no clipboard")
+
+    monkeypatch.setattr(backend, "set_clipboard", no_clipboard)
+
+    result = desktop_automation.type_text("plain", strategy="paste")
+
+    assert result["strategy"] == "batched" and "fallback" in result
+    assert backend.calls[-1] == {"action": "write", "text": "plain", "interval": 0.0}
+
+
+def test_pause_applies_only_for_the_call(backend):
+    seen = []
+    write = backend.write
+
+    def recording_write(text, interval=0.0):
+        seen.append(backend.pause)
+        write(text, interval)
+
+    backend.write = recording_write
+
+    desktop_automation.type_text("x", strategy="batched", pause=0.01)
+
+    assert seen == [0.01]
+    assert backend.pause == 0.0
+
+
+def test_unknown_strategy_is_an_error(backend):
+    result = desktop_automation.type_text("x", strategy="telepathy")
+
+    assert result["status"] == "error"
+    assert backend.calls == []
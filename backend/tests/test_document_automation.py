@@ -0,0 +1,178 @@
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("cv2")
+pytest.importorskip("pydantic_settings")
+
+from app.services import document_automation
+from app.services.uploads import DocumentBuffer
+
+
+def make_pdf(*pages: str) -> bytes:
+    """A PDF with one text-layer page per string."""
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_pdf_is_read_from_an_in_memory_buffer():
+    data = make_pdf("first page", "second page")
+    buffer = DocumentBuffer(max_size=len(data), spool_threshold=len(data))
+    buffer.write(data)
+
+    with buffer:
+        text = document_automation.extract_text_from_pdf(buffer)
+
+    assert "first page" in text and "second page" in text
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    monkeypatch.setattr(document_automation.settings, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(document_automation.settings, "PDF_PAGES_PER_TASK", 1)
+    monkeypatch.setattr(document_automation.settings, "PDF_PROCESS_WORKERS", 2)
+    yield
+    document_automation.shutdown_process_pool()
+
+
+def test_large_pdf_pages_are_extracted_on_the_process_pool(process_pool):
+    data = make_pdf("alpha", "bravo", "charlie")
+
+    records = list(document_automation.iter_pdf_pages(data))
+
+    assert sorted(record["page"] for record in records) == [0, 1, 2]
+    assert document_automation.extract_text_from_pdf(data).split() == ["alpha", "bravo", "charlie"]
+
+
+
+def test_shutdown_waits_for_the_pdf_workers_to_exit(process_pool):
+    list(document_automation.iter_pdf_pages(make_pdf("alpha", "bravo")))
+    workers = list(document_automation.get_process_pool()._processes.values())
+
+    document_automation.shutdown_process_pool()
+
+    assert workers and not any(worker.is_alive() for worker in workers)
+
+def test_stream_ends_with_a_summary():
+    records = list(document_automation.stream_text_from_document(make_pdf("one", "two"), "application/pdf"))
+
+    assert [record["page"] for record in records[:-1]] == [0, 1]
+    assert records[-1]["status"] == "success"
+    assert records[-1]["pages"] == 2
+
+
+def test_stream_reports_unsupported_types_as_an_error_record():
+    (record,) = document_automation.stream_text_from_document(b"GIF89a", "image/gif")
+
+    assert record["status"] == "error"
+
+
+def make_scanned_pdf() -> bytes:
+    """A single page that only carries an image, like a scanner's output."""
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 32, 32), False)
+    pix.clear_with(255)
+    doc = fitz.open()
+    doc.new_page().insert_image(fitz.Rect(72, 72, 200, 200), pixmap=pix)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    calls = []
+
+    def ocr_image(image):
+        calls.append(image.shape)
+        return "scanned text"
+
+    monkeypatch.setattr(document_automation, "ocr_image", ocr_image)
+    return calls
+
+
+def test_pages_with_a_text_layer_are_not_ocrd(fake_ocr):
+    (record,) = document_automation.iter_pdf_pages(make_pdf("embedded text"), parallel=False)
+
+    assert record["method"] == "text"
+    assert "embedded text" in record["text"]
+    assert fake_ocr == []
+
+
+def test_pages_without_a_text_layer_are_ocrd(fake_ocr):
+    (record,) = document_automation.iter_pdf_pages(make_scanned_pdf(), parallel=False)
+
+    assert record["method"] == "ocr"
+    assert record["text"] == "scanned text"
+    assert len(fake_ocr) == 1
+
+
+def test_a_few_scanned_pages_are_ocrd_without_the_process_pool(fake_ocr, monkeypatch):
+    def no_pool():
+        raise AssertionError("the process pool was started")
+
+    monkeypatch.setattr(document_automation.settings, "PDF_PARALLEL_MIN_SCANNED_PAGES", 2)
+    monkeypatch.setattr(document_automation, "get_process_pool", no_pool)
+
+    (record,) = document_automation.iter_pdf_pages(make_scanned_pdf())
+
+    assert record["method"] == "ocr" and record["text"] == "scanned text"
+
+
+def test_ocrd_pages_do_not_run_into_the_next_page():
+    assert document_automation.join_page_texts(["last word", "first line\n", "next"]) == "last word\nfirst line\nnext"
+
+
+@pytest.fixture
+def result_store(monkeypatch, tmp_path):
+    from app.services.result_store import ResultStore
+
+    store = ResultStore(str(tmp_path / "results.db"), flush_interval=0.01)
+    monkeypatch.setattr(document_automation, "get_result_store", lambda: store)
+    monkeypatch.setattr(document_automation.settings, "RESULT_CACHE_ENABLED", False)
+    yield store
+    store.close()
+
+
+def test_extracted_pdfs_are_stored_page_by_page(result_store):
+    result = document_automation.extract_text_from_document(
+        make_pdf("alpha page", "bravo page"), "application/pdf", filename="two.pdf"
+    )
+    assert result["status"] == "success"
+    result_store.flush(5)
+
+    (document,) = result_store.list_documents()["documents"]
+    assert document["filename"] == "two.pdf" and document["page_count"] == 2
+    assert [hit["page"] for hit in result_store.search("bravo")["hits"]] == [1]
+
+
+
+def test_cache_hits_are_stored_page_by_page(result_store, monkeypatch):
+    from app.services.result_cache import ResultCache
+
+    monkeypatch.setattr(document_automation.settings, "RESULT_CACHE_ENABLED", True)
+    monkeypatch.setattr(document_automation, "get_result_cache", lambda cache=ResultCache(): cache)
+    data = make_pdf("alpha page", "bravo page")
+    # Extracted while the store was unavailable, so only the cache has it
+    monkeypatch.setattr(document_automation, "get_result_store", lambda: None)
+    document_automation.extract_text_from_document(data, "application/pdf")
+    monkeypatch.setattr(document_automation, "get_result_store", lambda: result_store)
+
+    result = document_automation.extract_text_from_document(data, "application/pdf", filename="two.pdf")
+    result_store.flush(5)
+
+    assert result["cache_hit"] and "page_texts" not in result
+    (document,) = result_store.list_documents()["documents"]
+    assert document["page_count"] == 2
+
+def test_spooled_pdf_is_opened_complete_from_its_path():
+    data = make_pdf("spooled page")
+    buffer = DocumentBuffer(max_size=len(data), spool_threshold=16)
+    buffer.write(data)
+
+    with buffer:
+        assert buffer.spooled
+        with document_automation.open_pdf(buffer) as doc:
+            assert doc.page_count == 1 and not doc.is_repaired
@@ -0,0 +1,88 @@
+import pytest
+
+from app.services.driver_pool import DriverPool
+
+
+def test_release_resets_session_and_reuses_it(driver_factory):
+    pool = DriverPool(driver_factory, size=1)
+    pooled = pool.acquire()
+    pooled.driver.get("https://example.com/account")
+
+    pool.release(pooled)
+
+    assert pooled.driver.url == "about:blank"
+    assert pooled.driver.cookies == {}
+    assert "localStorage.clear()" in pooled.driver.scripts[-1]
+    assert pool.acquire().driver is pooled.driver
+    stats = pool.stats()
+    assert (stats["created"], stats["reused"], stats["leases"]) == (1, 1, 2)
+
+
+def test_acquire_waits_for_a_free_session(driver_factory):
+    pool = DriverPool(driver_factory, size=1)
+    pool.acquire()
+
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+    assert len(driver_factory.drivers) == 1
+
+
+def test_session_is_recycled_after_max_uses(driver_factory):
+    pool = DriverPool(driver_factory, size=1, max_uses=1)
+    first = pool.acquire()
+    pool.release(first)
+
+    second = pool.acquire()
+
+    assert first.driver.quit_called
+    assert second.driver is not first.driver
+    assert pool.stats()["recycled"] == 1
+
+
+def test_unhealthy_idle_session_is_replaced(driver_factory):
+    pool = DriverPool(driver_factory, size=1)
+    first = pool.acquire()
+    pool.release(first)
+    first.driver.crashed = True
+
+    second = pool.acquire()
+
+    assert second.driver is not first.driver
+    assert first.driver.quit_called
+    assert pool.stats()["failed_health_checks"] == 1
+
+
+def test_session_that_cannot_be_reset_is_discarded(driver_factory):
+    pool = DriverPool(driver_factory, size=1)
+    pooled = pool.acquire()
+    pooled.driver.crashed = True
+
+    pool.release(pooled)
+
+    assert pooled.driver.quit_called
+    assert pool.stats()["live"] == 0
+
+
+def test_lease_drops_session_broken_by_the_caller(driver_factory):
+    pool = DriverPool(driver_factory, size=1)
+
+    with pytest.raises(RuntimeError):
+        with pool.lease() as driver:
+            driver.crashed = True
+            raise RuntimeError("page crashed")
+
+    assert driver.quit_called
+    assert pool.stats()["idle"] == 0
+
+
+def test_prewarm_and_close(driver_factory):
+    pool = DriverPool(driver_factory, size=2)
+
+    assert pool.prewarm() == 2
+    assert pool.stats()["idle"] == 2
+
+    pool.close()
+
+    assert all(driver.quit_called for driver in driver_factory.drivers)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
@@ -0,0 +1,145 @@
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from app.services import exports
+from app.services.exports import DesktopOpenSink, DirectorySink, ExportManager, ExportSink, SinkUnavailable
+
+
+class RecordingSink(ExportSink):
+    name = "recording"
+
+    def __init__(self, gate=None, fail=False):
+        self.batches = []
+        self.gate = gate
+        self.fail = fail
+
+    def export(self, records):
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("sink is down")
+        self.batches.append(records)
+        return [{}] * len(records)
+
+
+def record(name, text="text", key="0123456789abcdef"):
+    return {"filename": name, "cache_key": key, "text": text}
+
+
+def test_directory_sink_writes_one_file_per_document_and_prunes(tmp_path):
+    sink = DirectorySink(str(tmp_path), max_files=2)
+
+    sink.export([record("../../etc/passwd", "a", key="k1")])
+    (outcome,) = sink.export([record("scan one.pdf", "b", key="k2")])
+    sink.export([record("third.pdf", "c", key="k3")])
+
+    assert os.path.dirname(outcome["path"]) == str(tmp_path)
+    assert os.path.basename(outcome["path"]) == "scan_one-k2.txt"
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_exports_are_delivered_in_batches():
+    sink = RecordingSink()
+    manager = ExportManager({"recording": sink}, workers=1, batch_size=10, batch_window=0.2)
+    try:
+        for n in range(5):
+            assert manager.submit("recording", record(f"{n}.pdf"))
+        assert manager.flush(5)
+    finally:
+        manager.close()
+
+    assert sum(len(batch) for batch in sink.batches) == 5
+    assert len(sink.batches) < 5
+    assert manager.stats()["sinks"]["recording"]["exported"] == 5
+
+
+def test_a_full_queue_drops_exports():
+    gate = threading.Event()
+    manager = ExportManager({"recording": RecordingSink(gate)}, workers=1, queue_size=1, batch_size=1, batch_window=0)
+    try:
+        accepted = [manager.submit("recording", record(f"{n}.pdf")) for n in range(5)]
+    finally:
+        gate.set()
+        manager.close()
+
+    assert not all(accepted)
+    assert manager.stats()["sinks"]["recording"]["dropped"] == accepted.count(False)
+
+
+def test_failed_batches_are_counted():
+    manager = ExportManager({"recording": RecordingSink(fail=True)}, workers=1, batch_window=0)
+    try:
+        manager.submit("recording", record("a.pdf"))
+        manager.flush(5)
+    finally:
+        manager.close()
+
+    assert manager.stats()["sinks"]["recording"]["failed"] == 1
+    with pytest.raises(SinkUnavailable):
+        manager.submit("fax", record("a.pdf"))
+
+
+@pytest.mark.skipif(shutil.which("true") is None, reason="needs the 'true' command")
+def test_desktop_sink_removes_opened_files_on_close(tmp_path):
+    sink = DesktopOpenSink(str(tmp_path), command=["true"], retention=300)
+
+    (outcome, _) = sink.export([record("a.pdf", "first"), record("b.pdf", "second")])
+    with open(outcome["path"], encoding="utf-8") as f:
+        assert "===== a.pdf =====" in f.read()
+    sink.close()
+
+    assert os.listdir(tmp_path) == []
+
+
+
+def test_desktop_files_are_kept_per_process_and_only_stale_leftovers_removed(tmp_path):
+    for name in ("1", "2"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "left.txt").write_text("x")
+    os.utime(tmp_path / "1" / "left.txt", (0, 0))
+
+    sink = DesktopOpenSink(str(tmp_path), command=["true"], retention=300)
+    (outcome,) = sink.export([record("a.pdf")])
+    try:
+        assert os.path.dirname(outcome["path"]) == str(tmp_path / str(os.getpid()))
+        assert not (tmp_path / "1").exists()
+        assert (tmp_path / "2" / "left.txt").exists()
+    finally:
+        sink.close()
+
+
+def test_desktop_files_expire_without_another_export(tmp_path):
+    sink = DesktopOpenSink(str(tmp_path), command=["true"], retention=0.1)
+    try:
+        (outcome,) = sink.export([record("a.pdf")])
+        deadline = time.monotonic() + 5
+        while os.path.exists(outcome["path"]) and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert not os.path.exists(outcome["path"])
+    finally:
+        sink.close()
+
+def test_requests_pick_a_configured_sink(monkeypatch):
+    def no_manager():
+        raise AssertionError("the export manager was started")
+
+    monkeypatch.setattr(exports.settings, "EXPORT_DEFAULT_SINK", "")
+    monkeypatch.setattr(exports.settings, "EXPORT_WEBHOOK_URL", "")
+    monkeypatch.setattr(exports, "get_export_manager", no_manager)
+
+    assert exports.resolve_sink(None) is None
+    assert exports.resolve_sink("none") is None
+    assert exports.resolve_sink("directory") == "directory"
+    with pytest.raises(SinkUnavailable):
+        exports.resolve_sink("webhook")
+    assert exports.export_result("directory", {"status": "error"}) == {"sink": None, "queued": False}
+
+    monkeypatch.setattr(exports.settings, "EXPORT_WEBHOOK_URL", "http://127.0.0.1:9/hook")
+    assert exports.resolve_sink("webhook") == "webhook"
@@ -0,0 +1,114 @@
+from contextlib import contextmanager
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("bs4")
+pytest.importorskip("selenium")
+
+from app.services import http_engine, web_automation
+from app.services.web_extraction import SEARCH_RESULT_SCHEMA, compile_schema
+from benchmarks.fixture_site import FixtureHandler, FixtureSite
+
+
+@pytest.fixture
+def site():
+    with FixtureSite() as site:
+        yield site
+    http_engine.shutdown_http_adapter()
+    http_engine._verdicts.clear()
+
+
+class FakePool:
+    @contextmanager
+    def lease(self, timeout=None):
+        yield object()
+
+    def reap_idle(self):
+        pass
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    """Stands in for the Selenium flow and records the URLs it was asked to run."""
+    runs = []
+
+    def run(driver, waits, url, *args):
+        runs.append(url)
+        return {"status": "success", "message": "browser run"}
+
+    monkeypatch.setattr(web_automation, "get_driver_pool", lambda profile: FakePool())
+    monkeypatch.setattr(web_automation, "_run_web_interaction", run)
+    return runs
+
+
+def test_login_and_search_over_plain_http(site):
+    result = http_engine.run_http_interaction(f"{site.url}/", "user", "pw", "invoice")
+
+    assert result["status"] == "success" and result["engine"] == "http"
+    assert result["login"]["status"] == "success"
+    assert result["search"]["results_count"] == 10
+
+
+def test_missing_form_needs_a_browser(site):
+    # The login page has no search form
+    with pytest.raises(http_engine.NeedsBrowser):
+        http_engine.run_http_interaction(f"{site.url}/login", search_query="invoice")
+
+
+def test_form_fields_are_the_values_a_browser_would_send():
+    soup = http_engine.BeautifulSoup(
+        '<form><input name="a" value="1"><input type="checkbox" name="b">'
+        '<input type="checkbox" name="c" checked><select name="d"><option value="x">'
+        '<option value="y" selected></select><input type="submit" name="go"></form>',
+        "html.parser"
+    )
+
+    assert http_engine.form_fields(soup.form) == {"a": "1", "c": "on", "d": "y"}
+
+
+def test_auto_falls_back_to_the_browser_and_remembers_the_host(site, browser):
+    url = f"{site.url}/login"
+
+    first = web_automation.automate_web_interaction(url, search_query="invoice", engine="auto")
+    second = web_automation.automate_web_interaction(url, search_query="invoice", engine="auto")
+
+    assert first["engine"] == "browser" and "fallback_reason" in first
+    assert second["engine"] == "browser" and "fallback_reason" not in second
+    assert browser == [url, url]
+
+
+def test_http_only_runs_report_the_missing_form(site, browser):
+    result = web_automation.automate_web_interaction(f"{site.url}/login", search_query="x", engine="http")
+
+    assert result["status"] == "error" and result["engine"] == "http"
+    assert browser == []
+
+
+def test_auto_search_without_result_nodes_falls_back_to_the_browser(site, browser, monkeypatch):
+    # As if the results were rendered by script
+    monkeypatch.setattr(FixtureHandler, "results_per_query", 0)
+    url = f"{site.url}/search"
+
+    http_only = web_automation.automate_web_interaction(url, search_query="invoice", engine="http")
+    auto = web_automation.automate_web_interaction(url, search_query="invoice", engine="auto")
+
+    assert http_only["status"] == "success" and http_only["search"]["results_count"] == 0
+    assert auto["engine"] == "browser" and "fallback_reason" in auto
+    assert http_engine.host_verdict(url) == "browser"
+
+
+def test_http_extraction_follows_next_page_links(site):
+    schema = compile_schema({**SEARCH_RESULT_SCHEMA, "next_page": "a.next"})
+
+    pages = list(http_engine.iter_http_extraction(f"{site.url}/search?q=invoice", schema, limit=25, max_pages=5))
+
+    assert [len(page["records"]) for page in pages] == [10, 10, 5]
+    assert pages[0]["records"][0] == {"title": "Result 0 for invoice", "link": f"{site.url}/item/0"}
+
+
+def test_pages_without_items_need_a_browser_when_required(site):
+    schema = compile_schema(SEARCH_RESULT_SCHEMA)
+
+    with pytest.raises(http_engine.NeedsBrowser):
+        list(http_engine.iter_http_extraction(f"{site.url}/login", schema, require_items=True))
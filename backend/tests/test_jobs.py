@@ -0,0 +1,114 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from app.services.jobs import FAILED, SUCCEEDED, JobManager, report_progress
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(workers={"web": 1, "document": 2}, history_size=3)
+    yield manager
+    manager.shutdown()
+
+
+def test_job_runs_in_the_background_and_keeps_its_progress(manager):
+    gate = threading.Event()
+
+    def work(n):
+        report_progress("Halfway", step=1)
+        gate.wait(5)
+        return n * 2
+
+    job = manager.submit("web", work, 21)
+    assert not job.done
+    gate.set()
+
+    assert job.future.result(5) == 42
+    assert job.status == SUCCEEDED
+    assert job.to_dict()["result"] == 42
+    events = [(e["event"], e.get("status") or e.get("message")) for e in job.events_since(0)]
+    assert events == [("status", "queued"), ("status", "running"), ("progress", "Halfway"), ("status", "succeeded")]
+
+
+def test_failed_job_records_the_error(manager):
+    def fail():
+        raise RuntimeError("boom")
+
+    job = manager.submit("document", fail)
+
+    with pytest.raises(RuntimeError):
+        job.future.result(5)
+    assert job.status == FAILED
+    assert job.to_dict()["error"] == "boom"
+
+
+def test_run_awaits_the_result_off_the_event_loop(manager):
+    caller = threading.current_thread()
+    result = asyncio.run(manager.run("web", lambda: threading.current_thread() is not caller))
+
+    assert result is True
+
+
+def test_a_busy_kind_does_not_block_another(manager):
+    gate = threading.Event()
+    manager.submit("web", gate.wait, 5)
+
+    job = manager.submit("document", lambda: "done")
+
+    assert job.future.result(5) == "done"
+    gate.set()
+
+
+def test_history_keeps_the_newest_jobs(manager):
+    jobs = [manager.submit("document", lambda: None) for _ in range(3)]
+    for job in jobs:
+        job.future.result(5)
+
+    newest = manager.submit("document", lambda: None)
+
+    assert manager.get(jobs[0].id) is None
+    assert manager.get(newest.id) is newest
+
+
+def test_unknown_kind_is_rejected(manager):
+    with pytest.raises(ValueError):
+        manager.submit("fax", lambda: None)
+
+
+def test_upload_is_released_when_the_job_cannot_be_queued(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("multipart")
+    from fastapi.testclient import TestClient
+
+    from app.api.endpoints import document
+    from app.main import app
+    from app.services.uploads import DocumentBuffer
+
+    buffer = DocumentBuffer(max_size=1024, spool_threshold=4)
+    buffer.write(b"spooled upload")
+    spool_path = buffer.path
+
+    class BrokenJobs:
+        def pending(self, kind):
+            return 0
+
+        def submit(self, kind, fn, **kwargs):
+            raise RuntimeError("job manager is shutting down")
+
+    async def read_validated_upload(file):
+        return buffer
+
+    monkeypatch.setattr(document, "get_job_manager", BrokenJobs)
+    monkeypatch.setattr(document, "read_validated_upload", read_validated_upload)
+
+    response = TestClient(app, raise_server_exceptions=False).post(
+        "/api/document/extract-text/jobs", files={"file": ("a.png", b"x" * 10, "image/png")}
+    )
+
+    assert response.status_code == 500
+    assert not os.path.exists(spool_path) and buffer.path is None
@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from app.services import lazy
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_lazy_module_imports_on_first_attribute_access(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    proxy = lazy.lazy_module("colorsys")
+
+    assert lazy.loaded("colorsys") is None
+    assert "not loaded" in repr(proxy)
+
+    assert proxy.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert lazy.loaded("colorsys") is not None
+    assert "colorsys" in lazy.import_seconds()
+
+
+def test_importing_the_app_does_not_load_heavy_dependencies():
+    pytest.importorskip("fastapi")
+    script = (
+        "import json, sys; import app.main; "
+        "print(json.dumps(sorted(m for m in ('cv2', 'fitz', 'pytesseract', 'selenium', 'webdriver_manager', "
+        "'cryptography', 'sqlite3') "
+        "if m in sys.modules)))"
+    )
+
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True, timeout=60
+    ).stdout
+
+    assert json.loads(output.strip().splitlines()[-1]) == []
+
+
+def test_ocr_stats_do_not_start_the_ocr_pool(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.services import ocr_engine
+
+    monkeypatch.setattr(ocr_engine.settings, "DOCUMENT_AUTOMATION_ENABLED", True)
+    ocr_engine.shutdown_ocr_pool()
+
+    response = TestClient(app).get("/api/admin/ocr")
+
+    assert response.status_code == 200
+    assert response.json() == {"initialized": False}
+    assert ocr_engine._ocr_pool is None
@@ -0,0 +1,76 @@
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from app.services import metrics
+from app.services.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_counter_and_gauge_render_one_series_per_label_set():
+    registry = Registry()
+    counter = registry.register(Counter("jobs_total", "Jobs.", ("kind",)))
+    gauge = registry.register(Gauge("queue_depth", "Queued jobs."))
+    counter.inc(kind="web")
+    counter.inc(2, kind="web")
+    counter.inc(kind='say "hi"')
+    gauge.inc(3)
+    gauge.dec()
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE jobs_total counter" in lines
+    assert 'jobs_total{kind="web"} 3' in lines
+    assert 'jobs_total{kind="say \\"hi\\""} 1' in lines
+    assert "queue_depth 2" in lines
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 5.0):
+        histogram.observe(value)
+
+    lines = histogram.render()
+
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_count 4" in lines
+    assert "latency_seconds_sum 6.25" in lines
+
+
+def _series(metric, stage):
+    return [line for line in metric.render() if f'stage="{stage}"' in line]
+
+
+def test_instrument_counts_error_results(monkeypatch):
+    monkeypatch.setattr(metrics.settings, "METRICS_ENABLED", True)
+
+    @metrics.instrument("unit_lookup")
+    def lookup(ok):
+        return {"status": "success" if ok else "error"}
+
+    lookup(True)
+    lookup(False)
+
+    assert _series(metrics.STAGE_ERRORS, "unit_lookup") == ['automation_stage_errors_total{stage="unit_lookup"} 1']
+    assert 'automation_stage_duration_seconds_count{stage="unit_lookup"} 2' in metrics.STAGE_DURATION.render()
+    assert _series(metrics.STAGE_IN_FLIGHT, "unit_lookup") == ['automation_stage_in_flight{stage="unit_lookup"} 0']
+
+
+def test_timed_counts_exceptions(monkeypatch):
+    monkeypatch.setattr(metrics.settings, "METRICS_ENABLED", True)
+
+    with pytest.raises(RuntimeError):
+        with metrics.timed("unit_raise"):
+            raise RuntimeError("boom")
+
+    assert _series(metrics.STAGE_ERRORS, "unit_raise") == ['automation_stage_errors_total{stage="unit_raise"} 1']
+
+
+def test_nothing_is_recorded_when_disabled(monkeypatch):
+    monkeypatch.setattr(metrics.settings, "METRICS_ENABLED", False)
+
+    with metrics.timed("unit_disabled"):
+        pass
+
+    assert _series(metrics.STAGE_DURATION, "unit_disabled") == []
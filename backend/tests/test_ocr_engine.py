@@ -0,0 +1,177 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pytesseract")
+pytest.importorskip("pydantic_settings")
+
+from app.services import ocr_engine
+from app.services.ocr_engine import OcrEngine, OcrEnginePool
+
+
+class FakeEngine(OcrEngine):
+    name = "fake"
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = 0
+        self.closed = False
+
+    def recognize(self, image):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("engine crashed")
+        return f"{image.shape[1]}x{image.shape[0]}"
+
+    def close(self):
+        self.closed = True
+
+
+IMAGE = np.zeros((4, 8), dtype=np.uint8)
+
+
+def test_engines_are_created_once_and_reused():
+    created = []
+    pool = OcrEnginePool(lambda: created.append(FakeEngine()) or created[-1], size=2)
+
+    assert [pool.recognize(IMAGE) for _ in range(3)] == ["8x4"] * 3
+
+    assert len(created) == 1 and created[0].calls == 3
+    assert pool.stats()["created"] == 1 and pool.stats()["calls"] == 3
+
+
+def test_an_engine_that_raises_is_discarded():
+    engines = [FakeEngine(fail=True), FakeEngine()]
+    pool = OcrEnginePool(lambda: engines.pop(0), size=1)
+
+    with pytest.raises(RuntimeError):
+        pool.recognize(IMAGE)
+    assert pool.recognize(IMAGE) == "8x4"
+
+    stats = pool.stats()
+    assert stats["errors"] == 1 and stats["created"] == 2 and stats["engines"] == 1
+
+
+def test_concurrent_recognitions_are_bounded_by_the_pool_size():
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+    gate = threading.Event()
+
+    class SlowEngine(FakeEngine):
+        def recognize(self, image):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            gate.wait(0.05)
+            with lock:
+                running -= 1
+            return "done"
+
+    pool = OcrEnginePool(SlowEngine, size=2)
+    threads = [threading.Thread(target=pool.recognize, args=(IMAGE,)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert peak <= 2
+    assert pool.stats()["calls"] == 6
+
+
+def test_prewarm_and_close():
+    engines = []
+    pool = OcrEnginePool(lambda: engines.append(FakeEngine()) or engines[-1], size=3)
+
+    assert pool.prewarm() == 3
+    pool.close()
+
+    assert all(engine.closed for engine in engines)
+    assert pool.stats()["engines"] == 0
+
+
+def test_pool_size_fits_the_thread_limit(monkeypatch):
+    monkeypatch.setattr(ocr_engine.os, "cpu_count", lambda: 8)
+
+    monkeypatch.setenv("OMP_THREAD_LIMIT", "2")
+    assert ocr_engine.effective_pool_size(6) == 4
+    assert ocr_engine.effective_pool_size(3) == 3
+
+    monkeypatch.setenv("OMP_THREAD_LIMIT", "0")
+    assert ocr_engine.effective_pool_size(6) == 6
+    assert ocr_engine.ocr_thread_budget(3) == 2
+
+
+@pytest.fixture
+def worker_settings(monkeypatch):
+    """Restores the module state that configuring a worker or an engine failure changes."""
+    monkeypatch.setenv("OMP_THREAD_LIMIT", os.environ.get("OMP_THREAD_LIMIT", "1"))
+    monkeypatch.setattr(ocr_engine, "_worker_pool_size", None)
+    monkeypatch.setattr(ocr_engine, "_tesserocr_failed", False)
+    ocr_engine.shutdown_ocr_pool()
+    yield
+    ocr_engine.shutdown_ocr_pool()
+    ocr_engine.engine_version.cache_clear()
+
+
+def test_workers_split_the_cpus(monkeypatch, worker_settings):
+    monkeypatch.setattr(ocr_engine.os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(ocr_engine, "_OMP_LIMIT_FROM_ENV", False)
+    assert ocr_engine.worker_thread_budget(4) == 2
+
+    ocr_engine.configure_worker_process(1, ocr_engine.worker_thread_budget(4))
+
+    assert os.environ["OMP_THREAD_LIMIT"] == "2"
+    assert ocr_engine.get_ocr_pool().size == 1
+
+
+def test_an_explicit_thread_limit_is_left_alone(monkeypatch, worker_settings):
+    monkeypatch.setattr(ocr_engine, "_OMP_LIMIT_FROM_ENV", True)
+    monkeypatch.setenv("OMP_THREAD_LIMIT", "3")
+
+    ocr_engine.configure_worker_process(1, ocr_engine.worker_thread_budget(4))
+
+    assert os.environ["OMP_THREAD_LIMIT"] == "3"
+
+
+def test_a_failing_tesserocr_engine_falls_back_to_pytesseract(monkeypatch, worker_settings):
+    class BrokenTesserocr:
+        class PyTessBaseAPI:
+            def __init__(self, **kwargs):
+                raise RuntimeError("Failed to init API, possibly an invalid tessdata path")
+
+    monkeypatch.setattr(ocr_engine.settings, "OCR_ENGINE", "auto")
+    monkeypatch.setattr(ocr_engine, "_load_tesserocr", lambda: BrokenTesserocr)
+    assert ocr_engine.engine_name() == "tesserocr"
+
+    engine = ocr_engine.create_engine()
+
+    assert isinstance(engine, ocr_engine.PytesseractEngine)
+    assert ocr_engine.engine_name() == "pytesseract"
+
+
+def test_importing_leaves_the_thread_limit_alone():
+    env = {key: value for key, value in os.environ.items() if key != "OMP_THREAD_LIMIT"}
+    output = subprocess.run(
+        [sys.executable, "-c", "import os; import app.services.ocr_engine; print('OMP_THREAD_LIMIT' in os.environ)"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+
+    assert output.splitlines()[-1] == "False"
+
+
+def test_the_pool_sets_the_thread_limit_before_it_is_sized(monkeypatch, worker_settings):
+    monkeypatch.delenv("OMP_THREAD_LIMIT")
+    monkeypatch.setattr(ocr_engine.os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(ocr_engine.settings, "OCR_POOL_SIZE", 4)
+
+    pool = ocr_engine.get_ocr_pool()
+
+    assert os.environ["OMP_THREAD_LIMIT"] == "2"
+    assert pool.size == 4
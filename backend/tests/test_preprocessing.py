@@ -0,0 +1,67 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("pydantic_settings")
+
+from app.services.preprocessing import Pipeline
+
+
+def grey_page() -> np.ndarray:
+    img = np.full((60, 80), 200, dtype=np.uint8)
+    img[20:40, 10:70] = 30
+    return img
+
+
+def test_default_preset_binarizes():
+    img, timings = Pipeline.preset("default").run(grey_page())
+
+    assert set(np.unique(img)) == {0, 255}
+    assert [t["stage"] for t in timings] == ["otsu"]
+
+
+def test_encoded_images_are_decoded_to_greyscale():
+    ok, png = cv2.imencode(".png", cv2.cvtColor(grey_page(), cv2.COLOR_GRAY2BGR))
+    assert ok
+
+    img, timings = Pipeline.preset("default").run(png.tobytes())
+
+    assert img.ndim == 2
+    assert timings[0]["stage"] == "decode"
+
+
+def test_stages_that_would_not_change_the_image_are_skipped():
+    pipeline = Pipeline([("downscale", {"target_dpi": 300}), ("morph", {"ksize": 1}), ("otsu", {})])
+
+    _, timings = pipeline.run(grey_page(), dpi=150)
+
+    assert [(t["stage"], t["skipped"]) for t in timings] == [
+        ("downscale", True), ("morph", True), ("otsu", False)
+    ]
+
+
+def test_downscale_reduces_to_the_target_dpi():
+    img, _ = Pipeline([("downscale", {"target_dpi": 150})]).run(grey_page(), dpi=300)
+
+    assert img.shape == (30, 40)
+
+
+def test_read_only_input_is_not_modified():
+    source = grey_page()
+    source.flags.writeable = False
+
+    Pipeline.preset("default").run(source)
+
+    assert source[0, 0] == 200
+
+
+def test_unknown_stages_and_presets_are_rejected():
+    with pytest.raises(ValueError):
+        Pipeline([("sharpen", {})])
+    with pytest.raises(ValueError):
+        Pipeline.preset("ultra")
+
+
+def test_describe_is_stable_for_cache_keys():
+    assert Pipeline.preset("fast").describe() == Pipeline.preset("fast").describe()
+    assert Pipeline.preset("fast").describe() != Pipeline.preset("default").describe()
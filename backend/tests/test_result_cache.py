@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from app.services.result_cache import ResultCache, make_cache_key
+
+
+def result(text: str):
+    return {"status": "success", "extracted_text": text}
+
+
+def test_key_depends_on_content_and_parameters():
+    key = make_cache_key(b"document", {"preset": "default"})
+
+    assert key == make_cache_key(memoryview(b"document"), {"preset": "default"})
+    assert key != make_cache_key(b"document", {"preset": "fast"})
+    assert key != make_cache_key(b"other", {"preset": "default"})
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResultCache(memory_entries=2)
+    cache.put("a", result("a"))
+    cache.put("b", result("b"))
+    cache.get("a")
+
+    cache.put("c", result("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == result("a")
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    ResultCache(memory_entries=1, disk_dir=str(tmp_path), disk_max_bytes=1024 * 1024).put("abcd", result("kept"))
+
+    cache = ResultCache(memory_entries=1, disk_dir=str(tmp_path), disk_max_bytes=1024 * 1024)
+
+    assert cache.get("abcd") == result("kept")
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_evicts_past_its_size_limit(tmp_path):
+    cache = ResultCache(memory_entries=1, disk_dir=str(tmp_path), disk_max_bytes=150)
+    for key in ("k1", "k2", "k3"):
+        cache.put(key, result(key * 20))
+
+    stats = cache.stats()
+    assert stats["disk_bytes"] <= 150
+    assert stats["disk_evictions"] >= 1
+    assert cache.get("k3") == result("k3" * 20)
+
+
+
+def test_workers_share_the_disk_tier_and_its_size_limit(tmp_path):
+    # Two worker processes pointed at the same directory
+    first = ResultCache(memory_entries=1, disk_dir=str(tmp_path), disk_max_bytes=150, sweep_interval=0)
+    second = ResultCache(memory_entries=1, disk_dir=str(tmp_path), disk_max_bytes=150, sweep_interval=0)
+    first.put("k1", result("k1" * 20))
+
+    assert second.get("k1") == result("k1" * 20)
+    second.put("k2", result("k2" * 20))
+    second.put("k3", result("k3" * 20))
+
+    sizes = [path.stat().st_size for path in tmp_path.rglob("*.json")]
+    assert sum(sizes) <= 150
+    assert first.get("k3") == result("k3" * 20)
+
+def test_concurrent_misses_share_one_computation():
+    cache = ResultCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return result("slow")
+
+    outcomes = []
+    first = threading.Thread(target=lambda: outcomes.append(cache.get_or_compute("k", compute)))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=lambda: outcomes.append(cache.get_or_compute("k", compute)))
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert len(calls) == 1
+    assert sorted(hit for _, hit in outcomes) == [False, True]
+    assert cache.stats()["merged"] + cache.stats()["memory_hits"] == 1
+
+
+def test_errors_are_not_cached():
+    cache = ResultCache()
+
+    value, hit = cache.get_or_compute("k", lambda: {"status": "error", "message": "bad scan"})
+
+    assert not hit and value["status"] == "error"
+    assert cache.get("k") is None
+
+
+def test_invalidate(tmp_path):
+    cache = ResultCache(disk_dir=str(tmp_path), disk_max_bytes=1024 * 1024)
+    cache.put("k1", result("1"))
+    cache.put("k2", result("2"))
+
+    assert cache.invalidate("k1") == 1
+    assert cache.invalidate("missing") == 0
+    assert cache.invalidate() == 1
+    assert cache.get("k2") is None
@@ -0,0 +1,92 @@
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from app.services.result_store import ResultStore, to_match_query
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"), batch_size=8, flush_interval=0.01)
+    yield store
+    store.close()
+
+
+def result(text):
+    return {"status": "success", "extracted_text": text, "characters_extracted": len(text)}
+
+
+def test_queries_cannot_be_syntax_errors():
+    assert to_match_query('invoice "net total" acc* AND (') == '"invoice" "net total" "acc"* "AND" "("'
+    assert to_match_query('  "" ') == ""
+
+
+def test_pages_are_stored_and_searchable(store):
+    store.submit("k1", "h1", result("ignored"), ["first page about invoices", "second page about receipts"],
+                 {"filename": "scan.pdf", "content_type": "application/pdf", "source": "upload"})
+    assert store.flush(5)
+
+    (hit,) = store.search("receipts")["hits"]
+    assert hit["page"] == 1 and hit["filename"] == "scan.pdf"
+    assert "[receipts]" in hit["snippet"]
+
+    document = store.get_document(hit["document_id"])
+    assert document["page_count"] == 2 and document["metadata"] == {"source": "upload"}
+    assert store.get_page(hit["document_id"], 0)["text"] == "first page about invoices"
+
+
+def test_without_page_texts_the_whole_text_is_one_page(store):
+    store.submit("k1", "h1", result("single page text"))
+    store.flush(5)
+
+    (document,) = store.list_documents()["documents"]
+    assert document["page_count"] == 1
+
+
+def test_a_document_seen_again_only_bumps_times_seen(store):
+    for _ in range(3):
+        store.submit("k1", "h1", result("repeated text"), ["repeated text"])
+    store.flush(5)
+
+    (document,) = store.list_documents()["documents"]
+    assert document["times_seen"] == 3
+    assert len(store.search("repeated")["hits"]) == 1
+    assert store.stats()["duplicates"] == 2
+
+
+def test_recent_search_pages_with_a_cursor(store):
+    for n in range(5):
+        store.submit(f"k{n}", f"h{n}", result(f"common term {n}"), [f"common term {n}"])
+    store.flush(5)
+
+    first = store.search("common", limit=2, sort="recent")
+    second = store.search("common", limit=2, sort="recent", before=first["next_before"])
+
+    assert [h["page_id"] for h in first["hits"]] == [5, 4]
+    assert [h["page_id"] for h in second["hits"]] == [3, 2]
+    assert second["has_more"]
+    with pytest.raises(ValueError):
+        store.search("common", sort="oldest")
+
+
+def test_documents_are_listed_newest_first_with_a_cursor(store):
+    for n in range(3):
+        store.submit(f"k{n}", f"h{n}", result("text"), ["text"])
+    store.flush(5)
+
+    first = store.list_documents(limit=2)
+    second = store.list_documents(limit=2, before=first["next_before"])
+
+    assert [d["cache_key"] for d in first["documents"]] == ["k2", "k1"]
+    assert [d["cache_key"] for d in second["documents"]] == ["k0"] and second["next_before"] is None
+
+
+def test_a_full_queue_drops_instead_of_blocking(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"), queue_size=1, flush_interval=1.0)
+    try:
+        accepted = [store.submit(f"k{n}", "h", result("x")) for n in range(20)]
+    finally:
+        store.close()
+
+    assert not all(accepted)
+    assert store.stats()["dropped"] == accepted.count(False)
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("cryptography")
+
+from app.services.session_cache import SessionCache, capture_state, origin_of, restore_state
+
+ORIGIN = "https://example.test"
+COOKIES = [{"name": "sid", "value": "abc", "path": "/", "domain": "example.test", "extra": "dropped"}]
+
+
+def make_cache(tmp_path=None, secret="test-secret", **kwargs):
+    return SessionCache(secret=secret, ttl=3600, disk_dir=str(tmp_path) if tmp_path else "", **kwargs)
+
+
+def test_session_round_trip():
+    cache = make_cache()
+    cache.put(ORIGIN, "alice", "pw", COOKIES, {"token": "t"})
+
+    state = cache.get(ORIGIN, "alice", "pw")
+
+    assert state["cookies"] == COOKIES and state["local_storage"] == {"token": "t"}
+    assert cache.get(ORIGIN, "bob", "pw") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_a_changed_password_never_reuses_the_session():
+    cache = make_cache()
+    cache.put(ORIGIN, "alice", "old password", COOKIES, {})
+
+    assert cache.get(ORIGIN, "alice", "new password") is None
+
+
+def test_persisted_sessions_are_encrypted_and_survive_a_restart(tmp_path):
+    make_cache(tmp_path).put(ORIGIN, "alice", "pw", COOKIES, {})
+
+    (name,) = os.listdir(tmp_path)
+    with open(tmp_path / name, "rb") as f:
+        assert b"alice" not in f.read() and "alice" not in name
+    assert make_cache(tmp_path).get(ORIGIN, "alice", "pw")["cookies"] == COOKIES
+
+
+def test_sessions_written_with_another_secret_are_not_used(tmp_path):
+    make_cache(tmp_path, secret="old-secret").put(ORIGIN, "alice", "pw", COOKIES, {})
+
+    assert make_cache(tmp_path, secret="new-secret").get(ORIGIN, "alice", "pw") is None
+
+
+def test_memory_entries_are_bounded():
+    cache = make_cache(max_entries=1)
+    cache.put(ORIGIN, "alice", "pw", COOKIES, {})
+    cache.put(ORIGIN, "bob", "pw", COOKIES, {})
+
+    assert cache.get(ORIGIN, "alice", "pw") is None
+    assert cache.stats()["entries"] == 1
+
+
+class StateDriver:
+    def __init__(self):
+        self.cookies = list(COOKIES)
+        self.storage = {"token": "t"}
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+    def delete_all_cookies(self):
+        self.cookies = []
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def execute_script(self, script, *args):
+        if args:
+            self.storage.update(args[0])
+            return None
+        return dict(self.storage)
+
+
+def test_capture_and_restore_state():
+    state = capture_state(StateDriver())
+    driver = StateDriver()
+    driver.cookies, driver.storage = [], {}
+
+    restore_state(driver, state)
+
+    assert driver.cookies == [{k: v for k, v in COOKIES[0].items() if k != "extra"}]
+    assert driver.storage == {"token": "t"}
+    assert origin_of("HTTPS://Example.test/login?next=/") == ORIGIN
@@ -0,0 +1,75 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pydantic_settings")
+
+from app.services import tiling
+from app.services.tiling import find_text_bands, merge_tile_texts, overlapping_boundaries, plan_tiles
+
+
+def test_text_bands_are_separated_by_blank_rows():
+    ink = np.zeros(50, dtype=int)
+    ink[5:10] = 3
+    ink[12:15] = 3
+    ink[30:40] = 3
+
+    assert find_text_bands(ink, min_gap=4) == [(5, 15), (30, 40)]
+
+
+def test_lines_repeated_across_an_overlap_are_dropped_once():
+    texts = ["intro\nshared line\n", "shared line\nrest"]
+
+    assert merge_tile_texts(texts, [True]) == "intro\nshared line\nrest"
+
+
+def test_blank_lines_are_kept_but_ignored_when_matching_an_overlap():
+    texts = ["intro\n\nshared\n\nline\n\n", "shared\nline\n\nrest"]
+
+    assert merge_tile_texts(texts, [True]) == "intro\n\nshared\n\nline\n\nrest"
+
+
+def test_repeated_lines_at_a_gap_cut_are_kept():
+    texts = ["Total\n1", "1\nTotal"]
+
+    assert merge_tile_texts(texts, [False]) == "Total\n1\n1\nTotal"
+    assert merge_tile_texts(texts) == "Total\n1\n1\nTotal"
+
+
+def test_overlapping_boundaries():
+    assert overlapping_boundaries([(0, 100), (90, 200), (200, 300)]) == [True, False]
+
+
+def test_tiles_are_cut_between_text_bands():
+    ink = np.zeros(100, dtype=int)
+    ink[10:30] = 5
+    ink[50:70] = 5
+    ink[80:95] = 5
+
+    tiles = plan_tiles(ink, tile_height=40, overlap=4, min_gap=2)
+
+    assert tiles == [(8, 40), (40, 75), (75, 97)]
+    assert overlapping_boundaries(tiles) == [False, False]
+
+
+def test_tall_bands_are_cut_with_an_overlap():
+    ink = np.full(100, 5, dtype=int)
+
+    tiles = plan_tiles(ink, tile_height=40, overlap=4, min_gap=2)
+
+    assert tiles[0][0] == 0 and tiles[-1][1] == 100
+    assert all(bottom > next_top for (_, bottom), (next_top, _) in zip(tiles, tiles[1:]))
+
+
+def test_tiles_are_recognised_in_reading_order(monkeypatch):
+    monkeypatch.setattr(tiling.settings, "OCR_TILE_HEIGHT", 40)
+    monkeypatch.setattr(tiling.settings, "OCR_TILE_OVERLAP", 4)
+    monkeypatch.setattr(tiling.settings, "OCR_TILE_MIN_GAP", 2)
+    image = np.full((100, 10), 255, dtype=np.uint8)
+    image[10:30] = 0
+    image[50:70] = 0
+    image[80:95] = 0
+
+    text = tiling.ocr_tiled(image, lambda tile: f"rows {tile.shape[0]}")
+
+    assert text.splitlines() == ["rows 32", "rows 35", "rows 22"]
+    tiling.shutdown_tile_executor()
@@ -0,0 +1,109 @@
+import json
+import logging
+import queue
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from app.services import tracing
+from app.services.jobs import JobManager
+from app.services.logs import JsonFormatter, NonBlockingQueueHandler, TraceContextFilter
+
+
+@pytest.fixture
+def trace():
+    token = tracing.start_trace("GET /unit")
+    current = tracing.current_trace()
+    yield current
+    tracing.end_trace(token, 200)
+
+
+def test_spans_nest_under_the_enclosing_span(trace):
+    with tracing.span("outer") as attrs:
+        attrs["pages"] = 2
+        with tracing.span("inner"):
+            pass
+
+    # Spans are ordered by start time
+    outer, inner = trace.to_dict()["spans"]
+    assert outer["name"] == "outer" and outer["attrs"] == {"pages": 2}
+    assert inner["parent_id"] == outer["span_id"]
+    assert outer["parent_id"] is None
+
+
+def test_failed_spans_record_the_error(trace):
+    with pytest.raises(ValueError):
+        with tracing.span("parse"):
+            raise ValueError("bad input")
+
+    (record,) = trace.to_dict()["spans"]
+    assert record["status"] == "error" and record["attrs"]["error"] == "bad input"
+
+
+def test_spans_outside_a_trace_are_ignored():
+    with tracing.span("orphan") as attrs:
+        attrs["ok"] = True
+
+    assert tracing.current_trace() is None
+
+
+def test_invalid_trace_ids_are_replaced():
+    token = tracing.start_trace("GET /unit", trace_id="not valid!")
+    try:
+        assert tracing.current_trace_id() != "not valid!"
+    finally:
+        tracing.end_trace(token, 200)
+
+    token = tracing.start_trace("GET /unit", trace_id="client-trace-0001")
+    try:
+        assert tracing.current_trace_id() == "client-trace-0001"
+    finally:
+        tracing.end_trace(token, 200)
+
+
+def test_trace_store_keeps_the_newest_traces():
+    store = tracing.TraceStore(history_size=2)
+    traces = [tracing.Trace(f"t{i}") for i in range(3)]
+    for item in traces:
+        store.add(item)
+
+    assert store.get(traces[0].id) is None
+    assert [t.name for t in store.list()] == ["t2", "t1"]
+
+
+def test_jobs_stay_on_the_request_trace(trace):
+    manager = JobManager(workers={"web": 1}, history_size=5)
+    try:
+        def work():
+            with tracing.span("background"):
+                return tracing.current_trace_id()
+
+        job = manager.submit("web", work)
+        assert job.future.result(5) == trace.id
+    finally:
+        manager.shutdown()
+
+    assert job.to_dict()["trace_id"] == trace.id
+    assert [s["name"] for s in trace.to_dict()["spans"]] == ["background"]
+
+
+def test_json_lines_carry_the_trace_and_extra_fields(trace):
+    record = logging.LogRecord("app.unit", logging.INFO, __file__, 1, "took %d ms", (12,), None)
+    record.url = "https://example.test"
+    TraceContextFilter().filter(record)
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "took 12 ms"
+    assert entry["trace_id"] == trace.id
+    assert entry["url"] == "https://example.test"
+
+
+def test_a_full_log_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    for i in range(3):
+        handler.emit(logging.LogRecord("app.unit", logging.INFO, __file__, 1, f"line {i}", None, None))
+
+    assert handler.dropped == 2
+    assert handler.queue.get_nowait().msg == "line 0"
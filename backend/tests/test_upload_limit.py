@@ -0,0 +1,89 @@
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("multipart")
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.main import UploadLimitMiddleware
+
+DETAIL = "File size exceeds maximum allowed size of 100 bytes"
+
+
+def chunked_upload(size: int, chunk: int = 64):
+    """A multipart body sent without Content-Length, as a streaming client would."""
+    yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="a.pdf"\r\n'
+    yield b"Content-Type: application/pdf\r\n\r\n"
+    for start in range(0, size, chunk):
+        yield b"x" * min(chunk, size - start)
+    yield b"\r\n--b--\r\n"
+
+
+MULTIPART = {"content-type": "multipart/form-data; boundary=b"}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def passthrough(request, call_next):
+        # Like the app's own tracing and metrics middleware
+        return await call_next(request)
+
+    @app.post("/api/document/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    @app.post("/other")
+    async def other(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(UploadLimitMiddleware, max_body=400, path_prefix="/api/document/", detail=DETAIL)
+    return TestClient(app)
+
+
+def test_small_uploads_pass(client):
+    response = client.post("/api/document/upload", files={"file": ("a.txt", b"x" * 50)})
+
+    assert response.status_code == 200 and response.json() == {"size": 50}
+
+
+def test_declared_oversized_body_is_refused(client):
+    response = client.post("/api/document/upload", files={"file": ("a.txt", b"x" * 1000)})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": DETAIL}
+
+
+def test_other_paths_are_not_limited(client):
+    response = client.post("/other", files={"file": ("a.txt", b"x" * 1000)})
+
+    assert response.status_code == 200
+
+
+def test_small_chunked_uploads_pass(client):
+    response = client.post("/api/document/upload", content=chunked_upload(50), headers=MULTIPART)
+
+    assert response.status_code == 200 and response.json() == {"size": 50}
+
+
+def test_chunked_oversized_body_is_cut_off(client):
+    response = client.post("/api/document/upload", content=chunked_upload(1000), headers=MULTIPART)
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": DETAIL}
+
+
+def test_the_app_refuses_oversized_chunked_uploads():
+    from app.main import app, settings
+
+    response = TestClient(app).post(
+        "/api/document/extract-text",
+        content=chunked_upload(settings.MAX_UPLOAD_SIZE + settings.UPLOAD_MULTIPART_OVERHEAD + 1, chunk=64 * 1024),
+        headers=MULTIPART
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE} bytes"
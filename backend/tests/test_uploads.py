@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from app.services.uploads import DocumentBuffer, UploadTooLarge
+
+
+def test_small_document_stays_in_memory():
+    with DocumentBuffer(max_size=100, spool_threshold=10) as buffer:
+        buffer.write(b"12345")
+
+        assert not buffer.spooled
+        assert buffer.getvalue() == b"12345"
+
+
+def test_spooled_document_is_readable_through_path_after_flush():
+    data = b"x" * 64 + b"y" * 64
+    with DocumentBuffer(max_size=1024, spool_threshold=32) as buffer:
+        buffer.write(data[:16])
+        buffer.write(data[16:])
+
+        assert buffer.spooled
+        buffer.flush()
+        with open(buffer.path, "rb") as f:
+            assert f.read() == data
+        assert bytes(buffer.view()) == data
+
+
+def test_write_past_max_size_is_rejected():
+    with DocumentBuffer(max_size=8, spool_threshold=4) as buffer:
+        buffer.write(b"1234")
+        with pytest.raises(UploadTooLarge):
+            buffer.write(b"56789")
+        assert buffer.size == 4
+
+
+def test_close_removes_spool_file():
+    buffer = DocumentBuffer(max_size=1024, spool_threshold=4)
+    buffer.write(b"123456")
+    path = buffer.path
+
+    buffer.close()
+
+    assert not os.path.exists(path)
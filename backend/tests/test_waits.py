@@ -0,0 +1,113 @@
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("selenium")
+
+from selenium.common.exceptions import TimeoutException
+
+from app.services import waits
+from app.services.waits import WaitEngine, WaitRecorder
+
+
+class ScriptDriver:
+    """Answers every ``execute_script`` with the next of ``values`` (the last one repeats)."""
+
+    def __init__(self, *values, url="https://example.test/page"):
+        self.values = list(values)
+        self.current_url = url
+
+    def execute_script(self, script, *args):
+        return self.values.pop(0) if len(self.values) > 1 else self.values[0]
+
+
+def test_timeout_adapts_once_a_host_has_enough_samples():
+    recorder = WaitRecorder(default_timeout=10.0, min_timeout=2.0, max_timeout=30.0, factor=3.0, min_samples=5)
+    for _ in range(4):
+        recorder.record("example.test", "element_present", 1.0)
+    assert recorder.timeout_for("example.test", "element_present") == 10.0
+
+    recorder.record("example.test", "element_present", 1.0)
+
+    assert recorder.timeout_for("example.test", "element_present") == 3.0
+    assert recorder.timeout_for("other.test", "element_present") == 10.0
+
+
+def test_adaptive_timeout_is_clamped():
+    recorder = WaitRecorder(min_timeout=2.0, max_timeout=30.0, factor=3.0, min_samples=1)
+    recorder.record("fast.test", "url_change", 0.01)
+    recorder.record("slow.test", "url_change", 20.0)
+
+    assert recorder.timeout_for("fast.test", "url_change") == 2.0
+    assert recorder.timeout_for("slow.test", "url_change") == 30.0
+
+
+def test_met_condition_is_timed_and_recorded():
+    recorder = WaitRecorder()
+    engine = WaitEngine(ScriptDriver(False, False, True), recorder=recorder, poll_frequency=0.01)
+
+    assert engine.until("ready", "custom", lambda d: d.execute_script("ready"))
+
+    (timing,) = engine.timings
+    assert timing["step"] == "ready" and timing["ok"] and timing["host"] == "example.test"
+    assert recorder.stats()["example.test"]["custom"]["samples"] == 1
+
+
+def test_required_wait_raises_on_timeout():
+    engine = WaitEngine(ScriptDriver(False), recorder=WaitRecorder(), poll_frequency=0.01)
+
+    with pytest.raises(TimeoutException):
+        engine.until("ready", "custom", lambda d: d.execute_script("ready"), timeout=0.05)
+    assert engine.timings[0]["ok"] is False
+
+
+def test_optional_wait_returns_none_on_timeout():
+    engine = WaitEngine(ScriptDriver(False), recorder=WaitRecorder(), poll_frequency=0.01)
+
+    assert engine.until("ready", "custom", lambda d: False, timeout=0.05, required=False) is None
+
+
+def test_step_override_wins_over_the_adaptive_timeout():
+    engine = WaitEngine(ScriptDriver(False), recorder=WaitRecorder(), timeouts={"login": 0.05}, poll_frequency=0.01)
+
+    assert engine.until("login", "custom", lambda d: False, required=False) is None
+    assert engine.timings[0]["timeout"] == 0.05
+
+
+def test_dom_stable_waits_for_the_quiet_period():
+    # Milliseconds since the last mutation, as reported by the page
+    engine = WaitEngine(ScriptDriver(0, 100, 350), recorder=WaitRecorder(), poll_frequency=0.01)
+
+    assert engine.dom_stable("settle", quiet_period=0.3, timeout=1.0)
+    assert engine.timings[0]["condition"] == "dom_stable"
+
+
+def test_timeouts_are_recorded_and_counted():
+    recorder = WaitRecorder(min_samples=2)
+    recorder.record_timeout("busy.test", "dom_stable")
+    assert not recorder.keeps_timing_out("busy.test", "dom_stable")
+
+    recorder.record_timeout("busy.test", "dom_stable")
+
+    assert recorder.keeps_timing_out("busy.test", "dom_stable")
+    assert recorder.stats()["busy.test"]["dom_stable"]["timeouts"] == 2
+    recorder.record("busy.test", "dom_stable", 0.5)
+    assert not recorder.keeps_timing_out("busy.test", "dom_stable")
+
+
+def test_best_effort_settle_is_bounded_by_the_grace_period(monkeypatch):
+    monkeypatch.setattr(waits.settings, "WAIT_SETTLE_GRACE", 0.05)
+    engine = WaitEngine(ScriptDriver(0), recorder=WaitRecorder(default_timeout=10.0), poll_frequency=0.01)
+
+    assert engine.dom_stable("page_load", quiet_period=0.1, required=False) is None
+    assert engine.timings[0]["timeout"] == pytest.approx(0.15)
+
+
+def test_best_effort_settle_is_cut_short_on_hosts_that_never_settle():
+    recorder = WaitRecorder(min_samples=2)
+    for _ in range(2):
+        recorder.record_timeout("example.test", "dom_stable")
+    engine = WaitEngine(ScriptDriver(0), recorder=recorder, poll_frequency=0.01)
+
+    engine.dom_stable("page_load", quiet_period=0.1, required=False)
+
+    assert engine.timings[0]["timeout"] == pytest.approx(0.11)
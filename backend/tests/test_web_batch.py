@@ -0,0 +1,163 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("selenium")
+
+from app.services import web_batch
+
+FAST = "http://fast.test/"
+SLOW = "http://slow.test/"
+QUEUED = "http://queued.test/"
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+class FakeWebAutomation:
+    """Records each run and how many ran at once per host."""
+
+    def __init__(self):
+        self.calls = []
+        self.running = {}
+        self.peak = {}
+        self._lock = threading.Lock()
+
+    def automate_web_interaction(self, url, **scenario):
+        host = web_batch.target_host(url)
+        with self._lock:
+            self.calls.append(url)
+            self.running[host] = self.running.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.running[host])
+        threading.Event().wait(0.02)
+        with self._lock:
+            self.running[host] -= 1
+        if "broken" in url:
+            raise RuntimeError("connection refused")
+        return {"status": "success", "url": url}
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    fake = FakeWebAutomation()
+    monkeypatch.setattr(web_batch, "web_automation", fake)
+    return fake
+
+
+def test_targets_are_interleaved_by_host():
+    targets = ["http://a.test/1", "http://a.test/2", "http://b.test/1", "http://a.test/3"]
+
+    assert [index for index, _ in web_batch.interleave_by_host(targets)] == [0, 2, 1, 3]
+
+
+
+def test_concurrency_is_capped_by_the_limit_and_the_targets(monkeypatch):
+    monkeypatch.setattr(web_batch.settings, "WEB_BATCH_CONCURRENCY", 4)
+    monkeypatch.setattr(web_batch.settings, "WEB_BATCH_MAX_CONCURRENCY", 8)
+
+    assert web_batch.effective_concurrency(None, 100) == 4
+    assert web_batch.effective_concurrency(50, 100) == 8
+    assert web_batch.effective_concurrency(50, 3) == 3
+
+def test_every_target_gets_a_record_and_a_summary_comes_last(fake):
+    targets = ["http://a.test/1", "http://b.test/1", "http://broken.test/"]
+
+    *records, summary = web_batch.iter_batch(targets, {"search_query": "x"}, concurrency=3)
+
+    assert sorted(r["index"] for r in records) == [0, 1, 2]
+    failed = next(r for r in records if r["url"] == "http://broken.test/")
+    assert failed["status"] == "error" and failed["result"]["message"] == "connection refused"
+    assert (summary["succeeded"], summary["failed"]) == (2, 1)
+
+
+def test_identical_targets_share_one_run(fake):
+    targets = ["http://a.test/1", "http://a.test/1", " http://a.test/1 "]
+
+    *records, summary = web_batch.iter_batch(targets, {}, concurrency=3)
+
+    assert fake.calls.count("http://a.test/1") + fake.calls.count(" http://a.test/1 ") == 1
+    assert len(records) == 3
+    assert summary["deduplicated"] == 2
+
+
+def test_runs_per_host_are_limited(fake):
+    targets = [f"http://a.test/{i}" for i in range(4)] + [f"http://b.test/{i}" for i in range(4)]
+
+    list(web_batch.iter_batch(targets, {}, concurrency=8, per_host_limit=2))
+
+    assert fake.peak["a.test"] <= 2 and fake.peak["b.test"] <= 2
+
+
+class GatedWebAutomation:
+    """Records each run; the slow target blocks until ``gate`` is set."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.calls = []
+
+    def automate_web_interaction(self, url, **scenario):
+        self.calls.append(url)
+        if url == SLOW:
+            self.gate.wait(5)
+        return {"status": "success", "url": url}
+
+
+@pytest.fixture
+def gated(monkeypatch):
+    fake = GatedWebAutomation()
+    monkeypatch.setattr(web_batch, "web_automation", fake)
+    yield fake
+    fake.gate.set()
+    wait_for(lambda: not web_batch._in_flight and not web_batch._references)
+
+
+def start_batch(targets):
+    """Submit every target and consume the first (fast) record."""
+    batch = web_batch.iter_batch(targets, {}, concurrency=1)
+    assert next(batch)["url"] == FAST
+    return batch
+
+
+def test_closing_a_batch_cancels_its_queued_targets(gated):
+    batch = start_batch([FAST, SLOW, QUEUED])
+
+    batch.close()
+    gated.gate.set()
+    wait_for(lambda: not web_batch._in_flight)
+
+    assert QUEUED not in gated.calls
+
+
+def test_closing_a_batch_keeps_targets_another_batch_joined(gated):
+    first = start_batch([FAST, SLOW, QUEUED])
+    records = []
+    second = threading.Thread(target=lambda: records.extend(web_batch.iter_batch([QUEUED], {})))
+    second.start()
+    wait_for(lambda: 2 in web_batch._references.values())
+
+    first.close()
+    gated.gate.set()
+    second.join(5)
+
+    assert not second.is_alive()
+    record, summary = records
+    assert record["status"] == "success"
+    assert record["deduplicated"]
+    assert summary["deduplicated"] == 1
+    assert gated.calls.count(QUEUED) == 1
+
+
+def test_unfinished_targets_time_out(gated, monkeypatch):
+    monkeypatch.setattr(web_batch.settings, "WEB_BATCH_TIMEOUT", 0.1)
+
+    record, summary = list(web_batch.iter_batch([SLOW], {}))
+
+    assert record["status"] == "error"
+    assert record["result"]["message"].startswith("Timed out")
+    assert summary["failed"] == 1
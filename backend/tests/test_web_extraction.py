@@ -0,0 +1,95 @@
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from app.services.web_extraction import SEARCH_RESULT_SCHEMA, compile_schema, iter_pages, type_records
+
+SCHEMA = compile_schema({
+    "item": ".search-result",
+    "fields": {
+        "title": "a",
+        "link": {"selector": "a", "attr": "href", "type": "url"},
+        "score": {"selector": ".score", "type": "float"},
+        "tags": {"selector": ".tag", "all": True},
+    },
+    "next_page": "a.next",
+})
+
+
+def test_schemas_are_validated_and_defaults_filled_in():
+    assert SCHEMA["fields"]["title"] == {"selector": "a", "attr": "text", "type": "str", "all": False}
+    with pytest.raises(ValueError):
+        compile_schema({"fields": {"title": "a"}})
+    with pytest.raises(ValueError):
+        compile_schema({"item": "li", "fields": {}})
+    with pytest.raises(ValueError):
+        compile_schema({"item": "li", "fields": {"n": {"type": "decimal"}}})
+    assert compile_schema(SEARCH_RESULT_SCHEMA)["next_page"] is None
+
+
+def test_raw_strings_are_typed():
+    schema = compile_schema({"item": "li", "fields": {
+        "count": {"type": "int"}, "price": {"type": "float"}, "sold": {"type": "bool"},
+        "link": {"type": "url"}, "sizes": {"type": "int", "all": True},
+    }})
+    raw = [{"count": "1,204", "price": "n/a", "sold": "No", "link": "/item/1", "sizes": ["1", "x"]}]
+
+    (record,) = type_records(schema, raw, "https://shop.test/list")
+
+    assert record == {
+        "count": 1204, "price": None, "sold": False,
+        "link": "https://shop.test/item/1", "sizes": [1, None],
+    }
+
+
+def test_html_is_extracted_like_the_page_script():
+    bs4 = pytest.importorskip("bs4")
+    from app.services.web_extraction import extract_soup
+
+    soup = bs4.BeautifulSoup(
+        '<div class="search-result"><a href="/item/1">First  result</a><span class="score">0.9</span>'
+        '<i class="tag">new</i><i class="tag">sale</i></div>'
+        '<div class="search-result"><a href="/item/2">Second</a></div>'
+        '<a class="next" href="?page=2">Next</a>',
+        "html.parser"
+    )
+
+    page = extract_soup(soup, "https://example.test/search", SCHEMA, limit=1)
+
+    assert page["total"] == 2
+    assert page["records"] == [{
+        "title": "First result", "link": "https://example.test/item/1", "score": 0.9, "tags": ["new", "sale"]
+    }]
+    assert page["next_url"] == "https://example.test/search?page=2"
+
+
+def fake_pages(sizes):
+    followed = []
+
+    def extract(remaining):
+        count = sizes[len(followed)]
+        if remaining is not None:
+            count = min(count, remaining)
+        return {"records": [{}] * count, "has_next": len(followed) + 1 < len(sizes)}
+
+    def follow(page):
+        followed.append(page["page"])
+        return True
+
+    return extract, follow
+
+
+def test_pages_stop_at_the_limit():
+    extract, follow = fake_pages([10, 10, 10])
+
+    pages = list(iter_pages(extract, follow, limit=15, max_pages=5))
+
+    assert [len(p["records"]) for p in pages] == [10, 5]
+
+
+def test_pages_stop_at_max_pages_or_the_last_page():
+    extract, follow = fake_pages([2, 2, 2])
+    assert [p["page"] for p in iter_pages(extract, follow, max_pages=2)] == [1, 2]
+
+    extract, follow = fake_pages([2, 2])
+    assert [p["page"] for p in iter_pages(extract, follow, max_pages=5)] == [1, 2]